@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Background flow.yaml saver for auto-click-system.
+
+編輯器存檔改在背景 thread 做 YAML 序列化與寫檔，GUI thread 只負責拍快照：
+- 連續的存檔請求會合併（coalesce）：寫檔期間再送來的請求只保留最新的一份
+- 寫檔採「暫存檔 + os.replace」，中途當機也不會留下寫一半的 flow.yaml
+- 以 generation 編號回報結果，GUI 端可判斷「已儲存」是否對應最新的編輯
+- debounce（延遲合併）由呼叫端負責（編輯器用 QTimer）
+- `DocSnapshotter`：存檔快照只重新複製有編輯過的 flow
+
+callback 在 worker thread 執行；GUI 端請用 Qt signal 轉回。
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from auto_click_flowio import dumps_doc, write_text_atomic
+
+
+def dump_yaml(doc: Any) -> str:
+    """Serialize a flow document (libyaml CSafeDumper when available)."""
+    return dumps_doc(doc)
+
+
+class BackgroundSaver:
+    """Serialize + write documents on one background thread.
+
+    `submit()` takes a snapshot the caller will not mutate afterwards (e.g. a
+    deep copy). Only the newest pending snapshot is written.
+
+    before_write: optional barrier run on the worker before each write
+                  (e.g. wait for queued preview PNGs).
+    """
+
+    def __init__(
+        self,
+        serialize: Callable[[Any], str] = dump_yaml,
+        writer: Callable[[str, str], None] = write_text_atomic,
+        before_write: Optional[Callable[[], None]] = None,
+        on_saving: Optional[Callable[[int, str], None]] = None,
+        on_done: Optional[Callable[[int, str], None]] = None,
+        on_error: Optional[Callable[[int, str, Exception], None]] = None,
+    ):
+        self._serialize = serialize
+        self._writer = writer
+        self.before_write = before_write
+        self.on_saving = on_saving
+        self.on_done = on_done
+        self.on_error = on_error
+        self._cond = threading.Condition()
+        self._pending: Optional[Tuple[int, str, Any]] = None
+        self._busy = False
+        self._closed = False
+        self._generation = 0
+        self.saved_generation = 0
+        self._thread = threading.Thread(target=self._worker, name="yaml-saver", daemon=True)
+        self._thread.start()
+
+    @property
+    def busy(self) -> bool:
+        """True while a snapshot is queued or being written."""
+        with self._cond:
+            return self._busy or self._pending is not None
+
+    def submit(self, path: str, snapshot: Any) -> int:
+        """Queue a snapshot for writing; returns its generation number."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("BackgroundSaver is closed")
+            self._generation += 1
+            self._pending = (self._generation, path, snapshot)
+            self._cond.notify_all()
+            return self._generation
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every submitted snapshot has been written (or failed)."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._busy and self._pending is None, timeout=timeout)
+
+    def close(self, wait: bool = True) -> None:
+        if wait:
+            self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            self._thread.join()
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None or self._closed)
+                if self._pending is None:
+                    return
+                gen, path, snap = self._pending
+                self._pending = None
+                self._busy = True
+            try:
+                self._emit(self.on_saving, gen, path)
+                text = self._serialize(snap)
+                if self.before_write is not None:
+                    self.before_write()
+                self._writer(path, text)
+            except Exception as e:
+                self._emit(self.on_error, gen, path, e)
+            else:
+                with self._cond:
+                    self.saved_generation = max(self.saved_generation, gen)
+                self._emit(self.on_done, gen, path)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    @staticmethod
+    def _emit(cb, *args) -> None:
+        if cb is None:
+            return
+        try:
+            cb(*args)
+        except Exception:
+            pass
+
+
+def copy_plain(obj: Any) -> Any:
+    """Copy nested dicts/lists of a YAML document; scalars are shared (they are immutable)."""
+    if isinstance(obj, dict):
+        return {k: copy_plain(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [copy_plain(v) for v in obj]
+    return obj
+
+
+class DocSnapshotter:
+    """Build save snapshots, re-copying only flows marked as edited.
+
+    快照一樣是獨立的副本（背景 thread 序列化時 GUI 可以繼續改），但沒改過的 flow
+    直接重用上一次的副本，大專案存檔時 GUI thread 只複製有變動的 flow。
+
+    Flows are tracked by identity (the cache keeps a reference to the live dict), so a
+    replaced flow dict is never confused with an old one. Cached copies are shared
+    between snapshots and must be treated as read-only.
+    """
+
+    def __init__(self):
+        self._cache: Dict[int, Tuple[Any, Any]] = {}  # id(flow) -> (flow, copy)
+        self.copied = 0
+        self.reused = 0
+
+    def mark(self, flow: Any) -> None:
+        """Invalidate the cached copy of one flow dict (call after editing it)."""
+        if flow is not None:
+            self._cache.pop(id(flow), None)
+
+    def mark_all(self) -> None:
+        self._cache.clear()
+
+    def snapshot(self, doc: Dict[str, Any], flows: Sequence[Any]) -> Dict[str, Any]:
+        """Copy `doc` with `flows` as its flow list (top-level keys are always copied)."""
+        out = {k: copy_plain(v) for k, v in doc.items() if k != "flows"}
+        cache: Dict[int, Tuple[Any, Any]] = {}
+        copies: List[Any] = []
+        for f in flows:
+            hit = self._cache.get(id(f))
+            if hit is not None and hit[0] is f:
+                self.reused += 1
+                c = hit[1]
+            else:
+                self.copied += 1
+                c = copy_plain(f)
+            cache[id(f)] = (f, c)
+            copies.append(c)
+        self._cache = cache  # drops flows that were deleted / not persisted
+        out["flows"] = copies
+        return out
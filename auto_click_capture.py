@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Screen capture service for auto-click-system.
+
+長駐的截圖服務：只開一次 mss backend，之後每次截圖都重複使用。
+
+背景（Windows RDP / HighDPI）：
+- 每次 `with mss.mss()` 都會重新建立 DC / bitmap，RDP 下每次要數十 ms。
+- 錄製點擊、校正預覽（每 200 ms）、截錨點圖都會截圖，setup 成本直接變成錄製延遲。
+
+設計：
+- `ScreenCapture.grab(rect)`：截指定區域（螢幕座標）→ numpy BGR
+- `ScreenCapture.grab_full()`：截整個虛擬桌面（monitors[0]）→ numpy BGR
+- `ScreenCapture.grab_preview()`：只截 preview_crop_plan 算出的裁切框，再在本地補邊
+- mss 的 handle 綁定建立它的 thread，所以 backend 以 thread-local 方式保存。
+- 內建延遲統計（`stats.snapshot()`），方便在 step log / benchmark 中觀察。
+- `FrameChangeDetector`：以整張畫面的 checksum 判斷是否完全相同，校正預覽用來略過沒變的畫面。
+- `frame_delta`：兩張畫面中變化超過容差（預設 ±8，吸收游標閃爍 / RDP 壓縮雜訊）的像素比例；
+  anchor 輪詢（AnchorLocator.wait）與 stable 等待模式用它判斷畫面是否改變。
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover
+    np = None
+
+try:
+    import cv2  # type: ignore
+except Exception:  # pragma: no cover
+    cv2 = None
+
+try:
+    import mss  # type: ignore
+except Exception:  # pragma: no cover
+    mss = None
+
+from auto_click_core import PreviewCropPlan, clamp, preview_crop_plan
+
+
+def finish_preview(crop, plan: PreviewCropPlan, crosshair: bool = True):
+    """Pad a cropped region to plan.size×plan.size and draw the center crosshair."""
+    if cv2 is None:
+        raise RuntimeError("opencv-python not available")
+    size = int(plan.size)
+    if plan.pad_left or plan.pad_top or plan.pad_right or plan.pad_bottom:
+        crop = cv2.copyMakeBorder(
+            crop,
+            top=plan.pad_top,
+            bottom=plan.pad_bottom,
+            left=plan.pad_left,
+            right=plan.pad_right,
+            borderType=cv2.BORDER_CONSTANT,
+            value=(0, 0, 0),
+        )
+
+    # Safety: enforce exact size
+    if crop.shape[0] != size or crop.shape[1] != size:
+        crop = cv2.resize(crop, (size, size), interpolation=cv2.INTER_NEAREST)
+
+    if crosshair:
+        # Draw a red cross at preview center for visual verification
+        c = size // 2
+        L = max(6, int(size * 0.12))
+        red = (0, 0, 255)  # BGR
+        crop = np.ascontiguousarray(crop)
+        cv2.line(crop, (c - L, c), (c + L, c), red, 2)
+        cv2.line(crop, (c, c - L), (c, c + L), red, 2)
+    return crop
+
+
+def frame_delta(a, b, tol: int = 8) -> float:
+    """Fraction of pixels that changed between two frames of the same shape.
+
+    A pixel counts as changed when any channel differs by more than `tol`
+    (absorbs cursor blink / ClearType / RDP compression noise). Frames of
+    different shapes are reported as fully changed (1.0).
+    """
+    if a is None or b is None or a.shape != b.shape:
+        return 1.0
+    if a.size == 0:
+        return 0.0
+    diff = cv2.absdiff(a, b) if cv2 is not None else np.abs(a.astype(np.int16) - b.astype(np.int16))
+    if diff.ndim == 3:
+        diff = diff.max(axis=2)
+    return float(np.count_nonzero(diff > tol)) / float(diff.shape[0] * diff.shape[1])
+
+
+def frame_fingerprint(img) -> Tuple[Any, ...]:
+    """Exact fingerprint of a frame: (shape, crc32 of the pixels). Any 1-bit change alters it."""
+    return tuple(img.shape), zlib.crc32(memoryview(np.ascontiguousarray(img)).cast("B"))
+
+
+class FrameChangeDetector:
+    """Remembers the last fingerprint per key and reports whether a new frame differs.
+
+    Used by the calibration preview to skip re-rendering identical frames. Exact
+    (checksum) comparison; for noise-tolerant "did enough change" checks use
+    frame_delta (AnchorLocator.wait, wait_until_stable). Not thread-safe; use one per loop.
+    """
+
+    def __init__(self):
+        self._last: Dict[Any, Tuple[Any, ...]] = {}
+        self.changes = 0
+        self.skips = 0
+
+    def changed(self, img, key: Any = None) -> bool:
+        """True for the first frame of `key` or when its fingerprint differs from the last one."""
+        fp = frame_fingerprint(img)
+        if self._last.get(key) == fp:
+            self.skips += 1
+            return False
+        self._last[key] = fp
+        self.changes += 1
+        return True
+
+    def reset(self, key: Any = None) -> None:
+        self._last.pop(key, None)
+
+    def clear(self) -> None:
+        self._last.clear()
+
+
+class CaptureStats:
+    """Grab latency counters (milliseconds)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.count = 0
+            self.total_ms = 0.0
+            self.last_ms = 0.0
+            self.max_ms = 0.0
+
+    def add(self, ms: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total_ms += ms
+            self.last_ms = ms
+            if ms > self.max_ms:
+                self.max_ms = ms
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            avg = self.total_ms / self.count if self.count else 0.0
+            return {
+                "count": self.count,
+                "avg_ms": avg,
+                "last_ms": self.last_ms,
+                "max_ms": self.max_ms,
+                "total_ms": self.total_ms,
+            }
+
+
+class ScreenCapture:
+    """Long-lived capture session (mss + numpy + opencv).
+
+    Coordinates passed to `grab()` are screen coordinates, clamped into the
+    virtual desktop. `grab_full()` returns an image whose (0,0) is the
+    virtual desktop origin (`virtual_rect()[0:2]`).
+
+    `backend_factory` exists for tests; by default it is `mss.mss`.
+    """
+
+    def __init__(self, backend_factory: Optional[Callable[[], Any]] = None):
+        self._factory = backend_factory
+        self._local = threading.local()
+        self._backends_lock = threading.Lock()
+        self._backends: list = []
+        self.stats = CaptureStats()
+
+    # ----------------------- backend -----------------------
+
+    def _backend(self):
+        sct = getattr(self._local, "sct", None)
+        if sct is not None:
+            return sct
+        factory = self._factory
+        if factory is None:
+            if mss is None or np is None or cv2 is None:
+                raise RuntimeError("Missing deps: mss + numpy + opencv-python are required")
+            factory = mss.mss
+        sct = factory()
+        self._local.sct = sct
+        self._local.buffers = {}
+        with self._backends_lock:
+            self._backends.append(sct)
+        return sct
+
+    def close(self) -> None:
+        """Close all backends opened by this session (any thread)."""
+        with self._backends_lock:
+            backends, self._backends = self._backends, []
+        for sct in backends:
+            try:
+                sct.close()
+            except Exception:
+                pass
+        self._local = threading.local()
+
+    def release_thread(self) -> None:
+        """Close the calling thread's backend (call before a worker thread exits)."""
+        sct = getattr(self._local, "sct", None)
+        if sct is None:
+            return
+        self._local.sct = None
+        self._local.buffers = {}
+        with self._backends_lock:
+            self._backends = [b for b in self._backends if b is not sct]
+        try:
+            sct.close()
+        except Exception:
+            pass
+
+    def refresh(self) -> None:
+        """Drop cached backends so monitor layout changes are picked up."""
+        self.close()
+
+    def virtual_rect(self) -> Tuple[int, int, int, int]:
+        """Return the virtual desktop as (left, top, width, height)."""
+        mon0 = self._backend().monitors[0]
+        return (
+            int(mon0.get("left", 0)),
+            int(mon0.get("top", 0)),
+            int(mon0["width"]),
+            int(mon0["height"]),
+        )
+
+    # ----------------------- grab -----------------------
+
+    def _to_bgr(self, raw, reuse: bool):
+        w, h = int(raw.width), int(raw.height)
+        # Zero-copy view over the BGRA bytes mss already holds.
+        bgra = np.frombuffer(raw.bgra if hasattr(raw, "bgra") else raw.raw, dtype=np.uint8).reshape(h, w, 4)
+        if not reuse:
+            return cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR)
+        buffers = self._local.buffers
+        dst = buffers.get((h, w))
+        if dst is None:
+            dst = np.empty((h, w, 3), dtype=np.uint8)
+            buffers[(h, w)] = dst
+        cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=dst)
+        return dst
+
+    def grab(self, rect: Tuple[int, int, int, int], reuse: bool = False):
+        """Capture (left, top, width, height) as numpy BGR.
+
+        reuse=True writes into a per-thread buffer of the same shape; the
+        returned array is overwritten by the next reuse grab of that size.
+        Use it only for frames that are consumed immediately (live preview).
+        """
+        start = time.perf_counter()
+        sct = self._backend()
+        l0, t0, w0, h0 = self.virtual_rect()
+
+        # clamp within virtual screen
+        left, top, width, height = [int(v) for v in rect]
+        left = clamp(left, l0, l0 + w0 - 1)
+        top = clamp(top, t0, t0 + h0 - 1)
+        width = clamp(width, 1, l0 + w0 - left)
+        height = clamp(height, 1, t0 + h0 - top)
+
+        raw = sct.grab({"left": left, "top": top, "width": width, "height": height})  # BGRA
+        bgr = self._to_bgr(raw, reuse)
+        self.stats.add((time.perf_counter() - start) * 1000.0)
+        return bgr
+
+    def grab_full(self, reuse: bool = False):
+        """Capture the whole virtual desktop. Returns (bgr, pixel_w, pixel_h)."""
+        start = time.perf_counter()
+        sct = self._backend()
+        mon = sct.monitors[0]  # virtual screen
+        raw = sct.grab(mon)  # BGRA
+        bgr = self._to_bgr(raw, reuse)
+        self.stats.add((time.perf_counter() - start) * 1000.0)
+        return bgr, int(mon["width"]), int(mon["height"])
+
+    def grab_preview(
+        self,
+        click_x: int,
+        click_y: int,
+        size: int,
+        dx: int = 0,
+        dy: int = 0,
+        mode: str = "region",
+        crosshair: bool = True,
+    ):
+        """Capture a size×size preview centered at (click_x+dx, click_y+dy).
+
+        click_x/click_y are pixel coordinates relative to the virtual desktop
+        origin (same space as grab_full()).
+
+        mode="region" grabs only the clamped crop rect and pads locally, so the
+        cost scales with the preview size; mode="fullscreen" grabs the whole
+        desktop first (legacy behavior).
+        """
+        if mode == "fullscreen":
+            full, fw, fh = self.grab_full()
+        else:
+            vl, vt, fw, fh = self.virtual_rect()
+
+        plan = preview_crop_plan(
+            click_x=int(click_x),
+            click_y=int(click_y),
+            screen_w=int(fw),
+            screen_h=int(fh),
+            size=int(size),
+            dx=int(dx),
+            dy=int(dy),
+        )
+
+        if mode == "fullscreen":
+            crop = full[plan.top : plan.bottom, plan.left : plan.right]
+        else:
+            crop = self.grab((vl + plan.left, vt + plan.top, plan.crop_w, plan.crop_h))
+        return finish_preview(crop, plan, crosshair=crosshair)
+
+
+_shared: Optional[ScreenCapture] = None
+_shared_lock = threading.Lock()
+
+
+def shared_capture() -> ScreenCapture:
+    """Process-wide capture session (created on first use)."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ScreenCapture()
+        return _shared
+
+
+def close_shared_capture() -> None:
+    global _shared
+    with _shared_lock:
+        if _shared is not None:
+            _shared.close()
+            _shared = None
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Clipboard paste for `type` steps (mode: paste).
+
+`pyautogui.write()` 每個字都要送一次按鍵（預設每字 20 ms），而且遇到輸入法（IME）
+或中文/日文等 CJK 文字會打錯或打不出來。paste 模式改成：
+1) 記下目前剪貼簿內容
+2) 把要輸入的文字放上剪貼簿，送 Ctrl+V（macOS：Command+V）
+3) 稍等目標程式讀取剪貼簿後，還原原本的剪貼簿內容
+
+整段文字一次貼上，長文字也只要幾十 ms，且不受輸入法狀態影響。
+
+需求：pyperclip（`py -m pip install pyperclip`）；沒有安裝時（have_clipboard() 為 False）paste 步驟改用 write 輸入。
+限制：只還原「文字」剪貼簿；原本若是圖片/檔案，貼上後不會還原。
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from typing import Callable, Optional, Sequence
+
+try:
+    import pyperclip  # type: ignore
+except Exception:  # pragma: no cover
+    pyperclip = None
+
+TYPE_MODES = ("write", "paste")  # type step: per-key pyautogui.write / clipboard Ctrl+V
+
+# the target app reads the clipboard asynchronously after Ctrl+V; restoring too
+# early would paste the old clipboard content instead
+PASTE_RESTORE_DELAY_S = 0.15
+
+
+def have_clipboard() -> bool:
+    """True when a clipboard backend (pyperclip) is installed; callers type with write() otherwise."""
+    return pyperclip is not None
+
+
+def paste_keys() -> Sequence[str]:
+    return ("command", "v") if sys.platform == "darwin" else ("ctrl", "v")
+
+
+def paste_text(
+    text: str,
+    hotkey: Optional[Callable[..., None]] = None,
+    restore: bool = True,
+    restore_delay_s: float = PASTE_RESTORE_DELAY_S,
+    copy: Optional[Callable[[str], None]] = None,
+    paste: Optional[Callable[[], str]] = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> None:
+    """Type `text` by pasting it from the clipboard, then restore the previous clipboard.
+
+    hotkey: function that presses a key chord (default: pyautogui.hotkey)
+    copy / paste: clipboard setter / getter (default: pyperclip)
+    """
+    if not text:
+        return
+    if copy is None or paste is None:
+        if pyperclip is None:
+            raise RuntimeError("paste mode requires pyperclip (py -m pip install pyperclip)")
+        copy = copy or pyperclip.copy
+        paste = paste or pyperclip.paste
+    if hotkey is None:
+        import pyautogui  # type: ignore
+
+        hotkey = pyautogui.hotkey
+
+    previous: Optional[str] = None
+    if restore:
+        try:
+            previous = paste()
+        except Exception:
+            previous = None
+    copy(text)
+    try:
+        hotkey(*paste_keys())
+    finally:
+        if restore and previous is not None and previous != text:
+            sleep(restore_delay_s)
+            try:
+                copy(previous)
+            except Exception:
+                pass
@@ -12,13 +12,33 @@
 
 from __future__ import annotations
 
+from collections import OrderedDict
 from dataclasses import dataclass
+from typing import Any, Callable, Hashable
 
 
 def clamp(v: int, lo: int, hi: int) -> int:
     return max(lo, min(hi, v))
 
 
+# double-click: two presses of the same button at most this far apart in time / distance
+# (Windows default double-click time is 500 ms; SM_CXDOUBLECLK is 4 px)
+DOUBLE_CLICK_INTERVAL_S = 0.5
+DOUBLE_CLICK_DISTANCE_PX = 4
+
+
+def is_double_click(
+    dt_s: float,
+    dx: int,
+    dy: int,
+    same_button: bool = True,
+    interval_s: float = DOUBLE_CLICK_INTERVAL_S,
+    distance_px: int = DOUBLE_CLICK_DISTANCE_PX,
+) -> bool:
+    """Whether a second press (dt_s after the first, moved by dx/dy) completes a double-click."""
+    return bool(same_button) and 0 <= dt_s <= interval_s and abs(dx) <= distance_px and abs(dy) <= distance_px
+
+
 @dataclass(frozen=True)
 class PreviewCropPlan:
     """Plan for cropping a preview image.
@@ -111,3 +131,114 @@ def preview_crop_plan(
         pad_right=pad_right,
         pad_bottom=pad_bottom,
     )
+
+
+def search_window_rect(
+    rect_x: int,
+    rect_y: int,
+    rect_w: int,
+    rect_h: int,
+    margin: int,
+    screen_w: int,
+    screen_h: int,
+) -> tuple[int, int, int, int]:
+    """Expand a rect by `margin` on every side and clamp it to the screen.
+
+    Used to build the anchor search window around `anchor.capture_rect`.
+    Returns (x, y, w, h); w/h are at least 1.
+    """
+
+    if screen_w <= 0 or screen_h <= 0:
+        raise ValueError("screen_w/screen_h must be > 0")
+    m = max(0, int(margin))
+    left = clamp(int(rect_x) - m, 0, screen_w - 1)
+    top = clamp(int(rect_y) - m, 0, screen_h - 1)
+    right = clamp(int(rect_x) + int(rect_w) + m, left + 1, screen_w)
+    bottom = clamp(int(rect_y) + int(rect_h) + m, top + 1, screen_h)
+    return left, top, right - left, bottom - top
+
+
+class LruCache:
+    """Small least-recently-used cache (used for editor thumbnails).
+
+    Not thread-safe: meant to be used from a single (GUI) thread.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be > 0")
+        self.maxsize = int(maxsize)
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        try:
+            v = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return v
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Return the cached value, or build it with factory() and cache it (None is not cached)."""
+        v = self.get(key)
+        if v is None:
+            v = factory()
+            if v is not None:
+                self.put(key, v)
+        return v
+
+    def discard(self, pred: Callable[[Hashable], bool]) -> int:
+        """Drop entries whose key matches pred; returns the number removed."""
+        keys = [k for k in self._data if pred(k)]
+        for k in keys:
+            del self._data[k]
+        return len(keys)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class LatestValue:
+    """Single-slot "latest value wins" mailbox between threads (no lock, no queue).
+
+    A producer thread (e.g. the pynput mouse listener) overwrites the slot; a consumer
+    (e.g. a GUI QTimer) reads only the newest value. Rebinding one attribute to a new
+    tuple is atomic in CPython, so readers always see a consistent (version, value) pair.
+
+    Intended for a single writer; `version` lets readers skip unchanged values.
+    """
+
+    __slots__ = ("_cell",)
+
+    def __init__(self, initial: Any = None):
+        self._cell = (0, initial)
+
+    def set(self, value: Any) -> None:
+        self._cell = (self._cell[0] + 1, value)
+
+    def get(self) -> Any:
+        return self._cell[1]
+
+    def snapshot(self) -> "tuple[int, Any]":
+        """Return (version, value); version is 0 until the first set()."""
+        return self._cell
+
+    @property
+    def version(self) -> int:
+        return self._cell[0]
@@ -34,6 +34,7 @@ project/
 
 from __future__ import annotations
 
+import copy
 import os
 import sys
 import time
@@ -57,7 +58,7 @@ except Exception as e:  # pragma: no cover
     raise SystemExit(1) from e
 
 # GUI
-from PySide6.QtCore import Qt, QPoint, QRect, QSize, QObject, Signal, Slot, QTimer
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt, QPoint, QRect, QSize, QObject, Signal, Slot, QTimer
 from PySide6.QtGui import QColor, QCursor, QGuiApplication, QIcon, QImage, QPainter, QPen, QPixmap
 from PySide6.QtWidgets import (
     QApplication,
@@ -73,6 +74,7 @@ from PySide6.QtWidgets import (
     QPlainTextEdit,
     QPushButton,
     QSpinBox,
+    QTableView,
     QTableWidget,
     QTableWidgetItem,
     QVBoxLayout,
@@ -127,6 +129,25 @@ PREVIEW_CROP_SIZE = 120
 PREVIEW_CROP_HALF = PREVIEW_CROP_SIZE // 2
 DEFAULT_PREVIEW_DISPLAY_SIZE = 180
 
+# preview capture mode (global._editor.preview_capture)
+# - region: grab only the clamped crop rect from preview_crop_plan (cost scales with preview size)
+# - fullscreen: grab the whole virtual desktop, then crop (legacy behavior)
+PREVIEW_CAPTURE_MODES = ("region", "fullscreen")
+DEFAULT_PREVIEW_CAPTURE_MODE = "region"
+
+# background PNG writer (preview / anchor images)
+PNG_WRITER_WORKERS = 2
+PNG_WRITER_QUEUE_SIZE = 64
+
+# steps table thumbnails: LRU entries keyed by (path, mtime, size, display size)
+THUMB_CACHE_SIZE = 512
+
+# flow.yaml saves are coalesced for this long, then written on a background thread
+AUTOSAVE_DEBOUNCE_MS = 500
+
+# calibration preview refresh (~30 FPS); unchanged frames are skipped by checksum
+CALIB_PREVIEW_INTERVAL_MS = 33
+
 
 def now_utc_iso() -> str:
     return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
@@ -149,10 +170,57 @@ def clamp(v: int, lo: int, hi: int) -> int:
 
 # Pure logic (unit-testable)
 try:
-    from auto_click_core import preview_crop_plan  # type: ignore
+    from auto_click_core import LruCache, preview_crop_plan  # type: ignore
 except Exception:  # pragma: no cover
+    LruCache = None
     preview_crop_plan = None
 
+try:
+    from auto_click_locate import AnchorLocator  # type: ignore
+except Exception:  # pragma: no cover
+    AnchorLocator = None
+
+try:
+    from auto_click_pngwriter import PngWriterPool  # type: ignore
+except Exception:  # pragma: no cover
+    PngWriterPool = None
+
+from auto_click_core import DOUBLE_CLICK_INTERVAL_S, LatestValue, is_double_click  # noqa: E402
+from auto_click_flowdoc import (  # noqa: E402
+    DEFAULT_VIRTUAL_FLOW_SLOTS,
+    FlowDocument,
+    persisted_flows,
+)
+from auto_click_flowio import load_doc  # noqa: E402
+
+try:
+    from auto_click_autosave import BackgroundSaver, DocSnapshotter, dump_yaml, write_text_atomic  # type: ignore
+except Exception:  # pragma: no cover
+    BackgroundSaver = None
+    DocSnapshotter = None
+    dump_yaml = None
+    write_text_atomic = None
+
+try:
+    from auto_click_journal import (  # type: ignore
+        journal_path_for,
+        load_with_journal,
+        open_journal,
+        set_doc_journal_seq,
+    )
+except Exception:  # pragma: no cover
+    journal_path_for = None
+
+try:
+    from auto_click_capture import FrameChangeDetector, close_shared_capture, shared_capture  # type: ignore
+except Exception:  # pragma: no cover
+    FrameChangeDetector = None
+    close_shared_capture = None
+    shared_capture = None
+
+# a recorded press waits this long for a second press (double-click) before it becomes a step
+DOUBLE_CLICK_COMMIT_MS = int(DOUBLE_CLICK_INTERVAL_S * 1000)
+
 
 def capture_preview_30x30(x: int, y: int):
     """以 click 為中心裁 30×30。
@@ -185,23 +253,6 @@ def pil_to_qpixmap(img):
     return QPixmap.fromImage(qimg)
 
 
-def bgr_to_qpixmap(bgr):
-    """Convert numpy BGR uint8 image to QPixmap."""
-    if np is None:
-        raise RuntimeError("numpy not available")
-    if bgr is None:
-        raise RuntimeError("image is None")
-    h, w = bgr.shape[:2]
-    if bgr.ndim == 2:
-        rgb = np.stack([bgr, bgr, bgr], axis=2)
-    else:
-        # Ensure contiguous (channel-reverse produces a view that may confuse QImage on some platforms)
-        rgb = np.ascontiguousarray(bgr[:, :, ::-1])
-    qimg = QImage(rgb.data, w, h, int(rgb.strides[0]), QImage.Format.Format_RGB888)
-    qimg = qimg.copy()
-    return QPixmap.fromImage(qimg)
-
-
 def write_png(path: str, bgr_img) -> None:
     """Write BGR image to PNG reliably (supports non-ASCII paths on Windows).
 
@@ -217,28 +268,11 @@ def write_png(path: str, bgr_img) -> None:
         f.write(buf.tobytes())
 
 
-def capture_region_bgr(left: int, top: int, width: int, height: int):
-    """Capture a screen region as numpy BGR using mss."""
-    if mss is None or np is None or cv2 is None:
-        raise RuntimeError("Missing deps: mss + numpy + opencv-python are required")
-
-    with mss.mss() as sct:
-        mon0 = sct.monitors[0]
-        # clamp within virtual screen
-        l0 = int(mon0.get("left", 0))
-        t0 = int(mon0.get("top", 0))
-        w0 = int(mon0.get("width"))
-        h0 = int(mon0.get("height"))
-
-        left = clamp(int(left), l0, l0 + w0 - 1)
-        top = clamp(int(top), t0, t0 + h0 - 1)
-        width = clamp(int(width), 1, l0 + w0 - left)
-        height = clamp(int(height), 1, t0 + h0 - top)
-
-        raw = sct.grab({"left": left, "top": top, "width": width, "height": height})  # BGRA
-        arr = np.array(raw, dtype=np.uint8)
-        bgr = cv2.cvtColor(arr, cv2.COLOR_BGRA2BGR)
-        return bgr
+def capture_region_bgr(left: int, top: int, width: int, height: int, reuse: bool = False):
+    """Capture a screen region as numpy BGR using the shared mss session."""
+    if shared_capture is None:
+        raise RuntimeError("auto_click_capture not available")
+    return shared_capture().grab((left, top, width, height), reuse=reuse)
 
 
 def capture_fullscreen_bgr():
@@ -248,17 +282,28 @@ def capture_fullscreen_bgr():
     - Do NOT use Qt-based screen capture.
     - Prefer mss + numpy + opencv for stable pixel-perfect capture.
 
+    Uses the long-lived capture session (auto_click_capture) instead of
+    opening a new mss context per call.
+
     Returns (bgr, pixel_w, pixel_h)
     """
-    if mss is None or np is None or cv2 is None:
-        raise RuntimeError("Missing deps: mss + numpy + opencv-python are required")
+    if shared_capture is None:
+        raise RuntimeError("auto_click_capture not available")
+    return shared_capture().grab_full()
 
-    with mss.mss() as sct:
-        mon = sct.monitors[0]  # virtual screen
-        raw = sct.grab(mon)  # BGRA
-        arr = np.array(raw, dtype=np.uint8)
-        bgr = cv2.cvtColor(arr, cv2.COLOR_BGRA2BGR)
-        return bgr, int(mon["width"]), int(mon["height"])
+
+def capture_preview_bgr(
+    click_x: int,
+    click_y: int,
+    size: int = PREVIEW_CROP_SIZE,
+    dx: int = 0,
+    dy: int = 0,
+    mode: str = DEFAULT_PREVIEW_CAPTURE_MODE,
+):
+    """Capture a size×size preview (with crosshair) centered at click+dx/dy."""
+    if shared_capture is None:
+        raise RuntimeError("auto_click_capture not available")
+    return shared_capture().grab_preview(click_x, click_y, size=size, dx=dx, dy=dy, mode=mode)
 
 
 @dataclass
@@ -389,12 +434,73 @@ class UiEvents(QObject):
     """Thread-safe bridge: pynput callbacks run on background threads.
 
     Use Qt signals to marshal events back to the GUI thread.
+    Mouse moves are NOT signalled (they can arrive at 1000 Hz); the listener
+    overwrites AutoClickEditor._mouse_pos (a LatestValue) and GUI code reads it.
     """
 
     sig_f9 = Signal()
     sig_f10 = Signal()
-    sig_click = Signal(int, int, str, bool)  # x, y, button_name, pressed
-    sig_move = Signal(int, int)  # x, y (raw listener coords)
+    sig_click = Signal(int, int, str, bool, float)  # x, y, button_name, pressed, perf_counter()
+    sig_png_written = Signal(str)  # path
+    sig_png_failed = Signal(str, str)  # path, error
+    sig_save_state = Signal(int, str, str)  # generation, saving/saved/error, detail
+
+
+class CalibPreviewView(QWidget):
+    """Live BGR frame view with a crosshair overlay, built for ~30 FPS updates.
+
+    - One persistent numpy buffer wrapped by one QImage (Format_BGR888, no channel swap)
+    - A frame is copied into the buffer only when FrameChangeDetector (exact checksum) sees a
+      change; identical frames cost one checksum and no repaint
+    - Scaling happens in paintEvent (QPainter.drawImage) and the crosshair is drawn on top,
+      so no per-frame QPixmap / rescaled copy is built
+    """
+
+    def __init__(self, size_px: int = 300, parent=None):
+        super().__init__(parent)
+        self.setFixedSize(int(size_px), int(size_px))
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent, True)
+        self._buf = None
+        self._qimg: Optional[QImage] = None
+        # exact checksum: the preview should show even 1-px changes under the cursor
+        self._changes = FrameChangeDetector() if FrameChangeDetector is not None else None
+        self.frames_uploaded = 0
+        self.frames_skipped = 0
+        self._pen = QPen(QColor(255, 0, 0, 200))
+        self._pen.setWidth(2)
+
+    def set_bgr_image(self, bgr) -> bool:
+        """Show a BGR (or gray) uint8 frame; returns False if it was identical to the last one."""
+        if np is None or bgr is None:
+            return False
+        if bgr.ndim == 2:
+            bgr = np.repeat(bgr[:, :, None], 3, axis=2)
+        frame = np.ascontiguousarray(bgr[:, :, :3])
+        if self._changes is not None and not self._changes.changed(frame) and self._buf is not None:
+            self.frames_skipped += 1
+            return False
+        if self._buf is None or self._buf.shape != frame.shape:
+            h, w = frame.shape[:2]
+            self._buf = np.empty((h, w, 3), dtype=np.uint8)
+            # QImage only wraps the buffer; self._buf keeps it alive
+            self._qimg = QImage(self._buf.data, w, h, int(self._buf.strides[0]), QImage.Format.Format_BGR888)
+        np.copyto(self._buf, frame)
+        self.frames_uploaded += 1
+        self.update()
+        return True
+
+    def paintEvent(self, event):
+        p = QPainter(self)
+        r = self.rect()
+        if self._qimg is None:
+            p.fillRect(r, QColor(0, 0, 0))
+        else:
+            p.drawImage(r, self._qimg)
+        p.setPen(self._pen)
+        cx, cy = r.width() // 2, r.height() // 2
+        p.drawLine(0, cy, r.width(), cy)
+        p.drawLine(cx, 0, cx, r.height())
+        p.end()
 
 
 class CalibPreviewWindow(QWidget):
@@ -412,25 +518,11 @@ class CalibPreviewWindow(QWidget):
         self.resize(self.size_px + 16, self.size_px + 16)
 
         layout = QVBoxLayout(self)
-        self.lbl = QLabel()
-        self.lbl.setFixedSize(self.size_px, self.size_px)
-        self.lbl.setStyleSheet("background: #000;")
-        layout.addWidget(self.lbl)
-
-    def set_bgr_image(self, bgr):
-        # Convert to QPixmap and draw crosshair
-        pm = bgr_to_qpixmap(bgr)
-        pm = pm.scaled(self.size_px, self.size_px, Qt.AspectRatioMode.IgnoreAspectRatio)
-        p = QPainter(pm)
-        p.setRenderHint(QPainter.RenderHint.Antialiasing, True)
-        pen = QPen(QColor(255, 0, 0, 200))
-        pen.setWidth(2)
-        p.setPen(pen)
-        c = self.size_px // 2
-        p.drawLine(0, c, self.size_px, c)
-        p.drawLine(c, 0, c, self.size_px)
-        p.end()
-        self.lbl.setPixmap(pm)
+        self.view = CalibPreviewView(self.size_px)
+        layout.addWidget(self.view)
+
+    def set_bgr_image(self, bgr) -> bool:
+        return self.view.set_bgr_image(bgr)
 
 
 class StepLogWindow(QWidget):
@@ -474,6 +566,306 @@ class StepLogWindow(QWidget):
         self.txt.verticalScrollBar().setValue(self.txt.verticalScrollBar().maximum())
 
 
+class ThumbnailCache:
+    """Scaled thumbnail icons for the steps table.
+
+    Key = (abs path, mtime_ns, file size, display size): a rewritten PNG or a
+    new display size misses the cache instead of showing a stale image.
+    """
+
+    def __init__(self, maxsize: int = THUMB_CACHE_SIZE):
+        self._lru = LruCache(maxsize) if LruCache is not None else None
+
+    def icon(self, abs_path: str, display_size: int) -> Optional[QIcon]:
+        try:
+            st = os.stat(abs_path)
+        except OSError:
+            return None
+        key = (abs_path, st.st_mtime_ns, st.st_size, int(display_size))
+
+        def load() -> Optional[QIcon]:
+            pm = QPixmap(abs_path)
+            if pm.isNull():
+                return None
+            pm2 = pm.scaled(display_size, display_size, Qt.AspectRatioMode.KeepAspectRatio)
+            return QIcon(pm2)
+
+        if self._lru is None:
+            return load()
+        return self._lru.get_or_create(key, load)
+
+    def clear(self) -> None:
+        if self._lru is not None:
+            self._lru.clear()
+
+
+class StepsTableModel(QAbstractTableModel):
+    """Model over the current flow's steps (+ A1/A2 anchor rows).
+
+    The flow dict is the source of truth; the view only asks for visible rows,
+    and thumbnails are loaded lazily through ThumbnailCache.
+
+    Columns (editable: 8 delay_s, 11 type_purpose, 12 type_content):
+    """
+
+    HEADERS = [
+        "#",
+        "動作",
+        "click.x",
+        "click.y",
+        "offset.x",
+        "offset.y",
+        "button",
+        "clicks",
+        "下一步延遲(s)",
+        "截圖(preview)",
+        "preview 路徑",
+        "type_purpose",
+        "type_content",
+    ]
+    COL_DELAY = 8
+    COL_THUMB = 9
+    COL_PATH = 10
+    COL_PURPOSE = 11
+    COL_TEXT = 12
+
+    edited = Signal()  # steps changed through the model (append/remove/move/setData)
+    step_edited = Signal(int, dict)  # step index, changed fields (setData)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.project_dir: Optional[str] = None
+        self.flow: Optional[Dict[str, Any]] = None
+        self.display_size = DEFAULT_PREVIEW_DISPLAY_SIZE
+        self.thumbs = ThumbnailCache()
+
+    # ----------------------- source -----------------------
+
+    def set_source(self, project_dir: Optional[str], flow: Optional[Dict[str, Any]], display_size: Optional[int] = None):
+        """Point the model at another flow (full reset)."""
+        self.beginResetModel()
+        self.project_dir = project_dir
+        self.flow = flow
+        if display_size is not None:
+            self.display_size = int(display_size)
+        self.endResetModel()
+
+    def reserved_rows(self) -> int:
+        """A1 (anchor image) + A2 (basepoint preview) when the flow has an anchor."""
+        if self.flow is None or not self.project_dir:
+            return 0
+        return 2 if isinstance(self.flow.get("anchor"), dict) else 0
+
+    def steps(self) -> List[Dict[str, Any]]:
+        if self.flow is None:
+            return []
+        steps = self.flow.get("steps")
+        if not isinstance(steps, list):
+            steps = list(steps or [])
+            self.flow["steps"] = steps
+        return steps
+
+    def step_index(self, row: int) -> Optional[int]:
+        """Map a table row to an index into steps (None for anchor rows / out of range)."""
+        idx = row - self.reserved_rows()
+        if 0 <= idx < len(self.steps()):
+            return idx
+        return None
+
+    def row_of_step(self, idx: int) -> int:
+        return idx + self.reserved_rows()
+
+    # ----------------------- edits -----------------------
+
+    def append_step(self, step: Dict[str, Any]) -> None:
+        steps = self.steps()
+        row = self.row_of_step(len(steps))
+        self.beginInsertRows(QModelIndex(), row, row)
+        steps.append(step)
+        self.endInsertRows()
+        self.edited.emit()
+
+    def remove_step(self, idx: int) -> None:
+        steps = self.steps()
+        if not (0 <= idx < len(steps)):
+            return
+        row = self.row_of_step(idx)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        steps.pop(idx)
+        self.endRemoveRows()
+        self._renumber(row)
+        self.edited.emit()
+
+    def move_step(self, idx: int, new_idx: int) -> bool:
+        """Swap a step with its neighbour (new_idx = idx ± 1)."""
+        steps = self.steps()
+        if abs(new_idx - idx) != 1 or not (0 <= idx < len(steps)) or not (0 <= new_idx < len(steps)):
+            return False
+        src = self.row_of_step(idx)
+        # Qt move semantics: destination is the row *before which* the row is inserted
+        dst = self.row_of_step(new_idx) + (1 if new_idx > idx else 0)
+        self.beginMoveRows(QModelIndex(), src, src, QModelIndex(), dst)
+        steps[idx], steps[new_idx] = steps[new_idx], steps[idx]
+        self.endMoveRows()
+        self._renumber(min(src, self.row_of_step(new_idx)))
+        self.edited.emit()
+        return True
+
+    def _renumber(self, first_row: int) -> None:
+        last = self.rowCount() - 1
+        if first_row <= last:
+            self.dataChanged.emit(self.index(first_row, 0), self.index(last, 0))
+
+    def thumbnail_written(self, abs_path: str) -> None:
+        """A PNG finished writing: repaint the rows showing it."""
+        if self.flow is None or not self.project_dir:
+            return
+        target = os.path.normcase(os.path.abspath(abs_path))
+        for row in range(self.rowCount()):
+            rel = self._image_rel(row)
+            if rel and os.path.normcase(os.path.abspath(os.path.join(self.project_dir, rel))) == target:
+                ix = self.index(row, self.COL_THUMB)
+                self.dataChanged.emit(ix, ix, [Qt.ItemDataRole.DecorationRole])
+
+    # ----------------------- Qt model API -----------------------
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return self.reserved_rows() + len(self.steps())
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            if 0 <= section < len(self.HEADERS):
+                return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def _image_rel(self, row: int) -> str:
+        reserved = self.reserved_rows()
+        if row < reserved:
+            anch = self.flow.get("anchor") or {}
+            return str(anch.get("image" if row == 0 else "basepoint_preview") or "")
+        idx = self.step_index(row)
+        if idx is None:
+            return ""
+        st = self.steps()[idx]
+        return str(st.get("preview") or "") if isinstance(st, dict) else ""
+
+    def _text(self, row: int, col: int) -> str:
+        reserved = self.reserved_rows()
+        if row < reserved:
+            if col == 0:
+                return "A1" if row == 0 else "A2"
+            if col == 1:
+                return "anchor_image" if row == 0 else "anchor_basepoint"
+            if col == self.COL_PATH:
+                return self._image_rel(row)
+            return ""
+
+        idx = self.step_index(row)
+        if idx is None:
+            return ""
+        st = self.steps()[idx]
+        if not isinstance(st, dict):
+            return ""
+        if col == 0:
+            return str(idx + 1)
+        if col == 1:
+            if st.get("action") == "type" and st.get("mode") == "paste":
+                return "type (paste)"
+            return str(st.get("action"))
+        if col in (2, 3):
+            # UI-only metadata (do not affect execution)
+            ed = st.get("_editor") if isinstance(st.get("_editor"), dict) else {}
+            cxy = ed.get("click_xy")
+            if isinstance(cxy, dict):
+                return str(cxy.get("x" if col == 2 else "y", ""))
+            return ""
+        if col in (4, 5):
+            off = st.get("offset")
+            if isinstance(off, dict):
+                return str(off.get("x" if col == 4 else "y", ""))
+            return ""
+        if col == 6:
+            return str(st.get("button", ""))
+        if col == 7:
+            return str(st.get("clicks", ""))
+        if col == self.COL_DELAY:
+            return str(st.get("delay_s", ""))
+        if col == self.COL_PATH:
+            return str(st.get("preview", ""))
+        if col in (self.COL_PURPOSE, self.COL_TEXT) and st.get("action") == "type":
+            return str(st.get("purpose" if col == self.COL_PURPOSE else "text", ""))
+        return ""
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            if col == self.COL_THUMB:
+                return ""
+            return self._text(row, col)
+        if role == Qt.ItemDataRole.DecorationRole and col == self.COL_THUMB:
+            rel = self._image_rel(row)
+            if not rel or not self.project_dir:
+                return None
+            return self.thumbs.icon(os.path.join(self.project_dir, rel), self.display_size)
+        return None
+
+    def flags(self, index):
+        f = super().flags(index)
+        if not index.isValid():
+            return f
+        idx = self.step_index(index.row())
+        if idx is None:
+            return f
+        col = index.column()
+        if col == self.COL_DELAY or (
+            col in (self.COL_PURPOSE, self.COL_TEXT) and (self.steps()[idx] or {}).get("action") == "type"
+        ):
+            f |= Qt.ItemFlag.ItemIsEditable
+        return f
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole) -> bool:
+        # Write-back edits (delay_s, type fields)
+        if role != Qt.ItemDataRole.EditRole or not index.isValid():
+            return False
+        idx = self.step_index(index.row())
+        if idx is None:
+            return False
+        st = self.steps()[idx]
+        if not isinstance(st, dict):
+            return False
+        col = index.column()
+        text = "" if value is None else str(value)
+        try:
+            if col == self.COL_DELAY:
+                v = text.strip()
+                delay = int(float(v)) if v else DEFAULT_DELAY_S
+                if delay < 0:
+                    delay = 0
+                changed = {"delay_s": delay}
+            elif col == self.COL_PURPOSE and st.get("action") == "type":
+                changed = {"purpose": text}
+            elif col == self.COL_TEXT and st.get("action") == "type":
+                changed = {"text": text}
+            else:
+                return False
+        except Exception:
+            return False
+        st.update(changed)
+        self.dataChanged.emit(index, index)
+        self.step_edited.emit(idx, changed)
+        self.edited.emit()
+        return True
+
+
 class AutoClickEditor(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -490,8 +882,8 @@ class AutoClickEditor(QMainWindow):
         self.project_dir: Optional[str] = None
         self.yaml_path: Optional[str] = None
 
-        # data
-        self.data: Dict[str, Any] = self._new_doc()
+        # data (assigning self.data also rebuilds self.flows, the indexed flow view)
+        self.data = self._new_doc()
         self.current_flow_id: Optional[str] = None
 
         # recording
@@ -500,6 +892,12 @@ class AutoClickEditor(QMainWindow):
         self.record_insert_mode = False
         self.expect_anchor_click = False
         self.anchor_click_xy: Optional[Dict[str, int]] = None
+        # first press of a possible double-click, committed by _flush_pending_click
+        self._pending_click: Optional[Dict[str, Any]] = None
+        self._pending_click_timer = QTimer()
+        self._pending_click_timer.setSingleShot(True)
+        self._pending_click_timer.setInterval(DOUBLE_CLICK_COMMIT_MS)
+        self._pending_click_timer.timeout.connect(self._flush_pending_click)
 
         # pending operations (wait for F9)
         # - 'capture_anchor': after user presses capture button, wait for F9 then take screenshot and select ROI
@@ -519,13 +917,16 @@ class AutoClickEditor(QMainWindow):
         self.preview_adjust_dx: int = 0
         self.preview_adjust_dy: int = 0
         self.preview_display_size: int = DEFAULT_PREVIEW_DISPLAY_SIZE
+        self.preview_capture_mode: str = DEFAULT_PREVIEW_CAPTURE_MODE
+        self.virtual_flow_slots: int = DEFAULT_VIRTUAL_FLOW_SLOTS
 
         # Calibration mode state (optional; does NOT affect recording coordinates in this mode)
         self.calib_mode = False
-        self._last_move_xy: Optional[tuple[int, int]] = None
+        # latest raw listener cursor position (x, y); written by the pynput thread
+        self._mouse_pos = LatestValue()
         self.calib_window = CalibPreviewWindow(size_px=300)
         self._calib_timer = QTimer()
-        self._calib_timer.setInterval(200)  # 5 FPS
+        self._calib_timer.setInterval(CALIB_PREVIEW_INTERVAL_MS)
         self._calib_timer.timeout.connect(self._on_calib_tick)
         self._calib_debug_dumped = False
 
@@ -538,21 +939,66 @@ class AutoClickEditor(QMainWindow):
         self._events.sig_f9.connect(self._on_f9_gui)
         self._events.sig_f10.connect(self._on_f10_gui)
         self._events.sig_click.connect(self._on_click_gui)
-        self._events.sig_move.connect(self._on_move_gui)
+        self._events.sig_png_written.connect(self._on_png_written_gui)
+        self._events.sig_png_failed.connect(self._on_png_failed_gui)
+
+        # background PNG writer (keeps imencode/file IO off the GUI thread)
+        self._png_writer = None
+        if PngWriterPool is not None and cv2 is not None:
+            self._png_writer = PngWriterPool(
+                workers=PNG_WRITER_WORKERS,
+                max_queue=PNG_WRITER_QUEUE_SIZE,
+                on_done=self._events.sig_png_written.emit,
+                on_error=lambda path, e: self._events.sig_png_failed.emit(path, str(e)),
+            )
+        # anchor locator (cached templates; created on first use)
+        self._locator = None
+
+        # flow.yaml saves: debounced on the GUI thread, serialized/written in the background
+        self._events.sig_save_state.connect(self._on_save_state_gui)
+        self._saver = None
+        if BackgroundSaver is not None:
+            self._saver = BackgroundSaver(
+                before_write=self._wait_png_writes_bg,
+                on_saving=lambda gen, path: self._events.sig_save_state.emit(gen, "saving", path),
+                on_done=lambda gen, path: self._events.sig_save_state.emit(gen, "saved", path),
+                on_error=lambda gen, path, e: self._events.sig_save_state.emit(gen, "error", str(e)),
+            )
+        self._edit_gen = 0  # bumped on every edit
+        # save snapshots re-copy only the flows edited since the previous snapshot
+        self._snapshots = DocSnapshotter() if DocSnapshotter is not None else None
+        self._save_gens: Dict[int, int] = {}  # saver generation -> edit generation it contains
+        self._save_timer = QTimer()
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(AUTOSAVE_DEBOUNCE_MS)
+        self._save_timer.timeout.connect(self._save_now)
+        self._save_journal_seq: Dict[int, int] = {}  # saver generation -> journal seq it contains
+
+        # append-only edit journal (flow.journal.jsonl), opened per loaded flow.yaml
+        self._journal = None
 
         # step log window (small always-on-top)
         self.step_log = StepLogWindow()
 
         self._build_ui()
+        self.steps_model.edited.connect(self._mark_dirty)
+        self.steps_model.step_edited.connect(lambda idx, fields: self._journal_append("edit", index=idx, fields=fields))
+        self._set_save_state("saved")
         self._update_ui_state()
 
-    def _new_doc(self) -> Dict[str, Any]:
-        # Default: create 50 empty flows (flow1..flow50)
-        flows = []
-        for i in range(1, 51):
-            fid = f"flow{i}"
-            flows.append({"id": fid, "title": fid, "anchor": None, "steps": [], "show_desktop": False, "export": (i == 1)})
+    @property
+    def data(self) -> Dict[str, Any]:
+        return self._data
+
+    @data.setter
+    def data(self, doc: Dict[str, Any]) -> None:
+        self._data = doc
+        self.flows = FlowDocument(doc)
+        self._mark_all_flows_edited()
 
+    def _new_doc(self) -> Dict[str, Any]:
+        # No flows up front: flow1..flow<virtual_flow_slots> are shown as virtual rows
+        # and materialized on first use (see auto_click_flowdoc).
         return {
             "version": 0,
             "meta": {
@@ -564,7 +1010,7 @@ class AutoClickEditor(QMainWindow):
                 "confidence": DEFAULT_CONFIDENCE,
                 "grayscale": DEFAULT_GRAYSCALE,
             },
-            "flows": flows,
+            "flows": [],
         }
 
     def _build_ui(self):
@@ -668,23 +1114,19 @@ class AutoClickEditor(QMainWindow):
 
         # Steps table
         # 欄位要讓使用者能「驗證錄製結果」：含座標、截圖、與下一步延遲秒數。
-        self.steps_table = QTableWidget(0, 13)
-        self._updating_steps_table = False
-        self.steps_table.setHorizontalHeaderLabels([
-            "#",
-            "動作",
-            "click.x",
-            "click.y",
-            "offset.x",
-            "offset.y",
-            "button",
-            "clicks",
-            "下一步延遲(s)",
-            "截圖(preview)",
-            "preview 路徑",
-            "type_purpose",
-            "type_content",
-        ])
+        # Model/view: only visible rows are rendered; thumbnails come from an LRU cache.
+        self.steps_model = StepsTableModel(self)
+        self.steps_table = QTableView()
+        self.steps_table.setModel(self.steps_model)
+        self.steps_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.steps_table.setSelectionMode(QTableView.SelectionMode.SingleSelection)
+        vh = self.steps_table.verticalHeader()
+        # fixed row height keeps scrolling O(visible rows)
+        vh.setSectionResizeMode(vh.ResizeMode.Fixed)
+        vh.setDefaultSectionSize(DEFAULT_PREVIEW_DISPLAY_SIZE + 12)
+        self.steps_table.setIconSize(QSize(DEFAULT_PREVIEW_DISPLAY_SIZE, DEFAULT_PREVIEW_DISPLAY_SIZE))
+        # resizeColumnsToContents() only samples this many rows
+        self.steps_table.horizontalHeader().setResizeContentsPrecision(50)
         layout.addWidget(self.steps_table)
 
         row4 = QHBoxLayout()
@@ -705,12 +1147,15 @@ class AutoClickEditor(QMainWindow):
         self.btn_move_step_down.clicked.connect(self.on_move_step_down)
         self.btn_insert_type.clicked.connect(self.on_insert_type)
         self.btn_insert_hotkey.clicked.connect(self.on_insert_hotkey)
-        self.steps_table.itemChanged.connect(self._on_steps_table_item_changed)
 
         # hint
         self.lbl_hint = QLabel("提示：錄製中按 F9 可暫停/恢復（PAUSED 不會寫入 YAML）")
         layout.addWidget(self.lbl_hint)
 
+        # save state indicator (dirty / saving / saved)
+        self.lbl_save_state = QLabel("")
+        self.statusBar().addPermanentWidget(self.lbl_save_state)
+
     # ----------------------- project / yaml -----------------------
 
     def _load_editor_settings_from_doc(self):
@@ -722,10 +1167,16 @@ class AutoClickEditor(QMainWindow):
             dx = int(ed.get("preview_dx") or 0)
             dy = int(ed.get("preview_dy") or 0)
             ds = int(ed.get("preview_display_size") or DEFAULT_PREVIEW_DISPLAY_SIZE)
+            mode = str(ed.get("preview_capture") or DEFAULT_PREVIEW_CAPTURE_MODE)
+            if mode not in PREVIEW_CAPTURE_MODES:
+                mode = DEFAULT_PREVIEW_CAPTURE_MODE
 
             self.preview_adjust_dx = dx
             self.preview_adjust_dy = dy
             self.preview_display_size = ds
+            self.preview_capture_mode = mode
+            slots = ed.get("virtual_flow_slots")
+            self.virtual_flow_slots = max(0, int(DEFAULT_VIRTUAL_FLOW_SLOTS if slots is None else slots))
 
             # widgets may not exist during early init
             if hasattr(self, "spin_preview_dx"):
@@ -761,6 +1212,8 @@ class AutoClickEditor(QMainWindow):
         ed["preview_dx"] = int(self.preview_adjust_dx)
         ed["preview_dy"] = int(self.preview_adjust_dy)
         ed["preview_display_size"] = int(self.preview_display_size)
+        ed["preview_capture"] = str(self.preview_capture_mode)
+        ed["virtual_flow_slots"] = int(self.virtual_flow_slots)
 
         # recording calibration removed: raw listener coords are used for recording
 
@@ -798,6 +1251,7 @@ class AutoClickEditor(QMainWindow):
         self._load_project_dir(d)
 
     def _load_project_dir(self, d: str):
+        self._flush_saves()
         self.project_dir = d
         ensure_dir(os.path.join(d, "anchors"))
         ensure_dir(os.path.join(d, "previews"))
@@ -807,8 +1261,7 @@ class AutoClickEditor(QMainWindow):
         self.yaml_path = os.path.join(d, "flow.yaml")
         if os.path.exists(self.yaml_path):
             try:
-                with open(self.yaml_path, "r", encoding="utf-8") as f:
-                    self.data = yaml.safe_load(f) or self._new_doc()
+                self.data = load_doc(self.yaml_path) or self._new_doc()
                 self._load_editor_settings_from_doc()
                 self.statusBar().showMessage(f"已載入：{self.yaml_path}", 5000)
             except Exception as e:
@@ -819,13 +1272,15 @@ class AutoClickEditor(QMainWindow):
             self._persist_editor_settings_to_doc()
             # write initial file
             try:
-                with open(self.yaml_path, "w", encoding="utf-8") as f:
-                    yaml.safe_dump(self.data, f, allow_unicode=True, sort_keys=False)
+                write_text_atomic(self.yaml_path, dump_yaml(self.data))
                 self.statusBar().showMessage(f"已建立：{self.yaml_path}", 5000)
             except Exception as e:
                 QMessageBox.warning(self, "建立失敗", f"無法建立 flow.yaml：{self.yaml_path}\n{e}")
 
         self.current_flow_id = None
+        self._edit_gen = 0
+        self._set_save_state("saved")
+        self._open_journal()
         self._refresh_flow_list()
         self._refresh_steps_table()
 
@@ -852,9 +1307,12 @@ class AutoClickEditor(QMainWindow):
         p, _ = QFileDialog.getOpenFileName(self, "開啟 flow.yaml", self.project_dir or "", "YAML (*.yaml *.yml)")
         if not p:
             return
-        with open(p, "r", encoding="utf-8") as f:
-            self.data = yaml.safe_load(f) or self._new_doc()
+        self._flush_saves()
+        self.data = load_doc(p) or self._new_doc()
         self.yaml_path = p
+        self._edit_gen = 0
+        self._set_save_state("saved")
+        self._open_journal()
         self._load_editor_settings_from_doc()
         self.current_flow_id = None
         self._refresh_flow_list()
@@ -862,46 +1320,208 @@ class AutoClickEditor(QMainWindow):
         self._update_ui_state()
 
     def on_save_yaml(self):
+        """Save now (non-modal): serialization and the write happen in the background."""
         if not self._require_project():
             return
-        if not self.yaml_path:
-            self.yaml_path = os.path.join(self.project_dir, "flow.yaml")
+        self._save_now()
+        try:
+            self.statusBar().showMessage(f"儲存中：{self.yaml_path}", 3000)
+        except Exception:
+            pass
 
-        # persist UI-only settings before saving
-        self._persist_editor_settings_to_doc()
+    def _save_yaml_quiet(self):
+        """Schedule a save without dialogs (used for checkbox persistence).
 
-        # write
-        with open(self.yaml_path, "w", encoding="utf-8") as f:
-            yaml.safe_dump(self.data, f, allow_unicode=True, sort_keys=False)
-        QMessageBox.information(self, "已儲存", f"已儲存：{self.yaml_path}")
+        Bursts of calls are coalesced into one background write.
+        """
+        if not self.project_dir:
+            return
+        self._mark_dirty()
+        self._save_timer.start()
 
-    def _save_yaml_quiet(self):
-        """Save YAML without popping dialogs (used for checkbox persistence)."""
+    def _save_now(self):
+        """Snapshot self.data and hand it to the background saver."""
+        self._save_timer.stop()
         if not self.project_dir:
             return
         if not self.yaml_path:
             self.yaml_path = os.path.join(self.project_dir, "flow.yaml")
+        # persist UI-only settings before saving
         try:
             self._persist_editor_settings_to_doc()
         except Exception:
             pass
-        with open(self.yaml_path, "w", encoding="utf-8") as f:
-            yaml.safe_dump(self.data, f, allow_unicode=True, sort_keys=False)
+        journal_seq = None
+        if self._journal is not None:
+            # everything journaled so far is contained in this snapshot
+            journal_seq = self._journal.last_seq
+            set_doc_journal_seq(self.data, journal_seq)
+        # untouched virtual slots (flowN without anchor/steps) are not written
+        flows = persisted_flows(self.flows, self.virtual_flow_slots)
+        if self._snapshots is not None:
+            snapshot = self._snapshots.snapshot(self.data, flows)
+        else:
+            snapshot = copy.deepcopy(dict(self.data, flows=flows))
+        if self._saver is None:
+            self._flush_png_writes()
+            try:
+                write_text_atomic(self.yaml_path, dump_yaml(snapshot))
+            except Exception as e:
+                self._set_save_state("error", str(e))
+                return
+            self._set_save_state("saved")
+            self._compact_journal(journal_seq)
+            return
+        gen = self._saver.submit(self.yaml_path, snapshot)
+        self._save_gens[gen] = self._edit_gen
+        if journal_seq is not None:
+            self._save_journal_seq[gen] = journal_seq
+        self._set_save_state("saving")
+
+    def _flush_saves(self, timeout: Optional[float] = 30.0) -> None:
+        """Barrier: write any debounced save now and wait for the background writer."""
+        self._flush_pending_click()
+        if not hasattr(self, "_save_timer"):
+            return
+        if self._save_timer.isActive():
+            self._save_now()
+        if self._saver is not None:
+            self._saver.flush(timeout=timeout)
+
+    # ----------------------- journal -----------------------
+
+    def _open_journal(self) -> None:
+        """Replay flow.journal.jsonl over the freshly loaded doc and start appending to it."""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if journal_path_for is None or not self.yaml_path or not isinstance(self.data, dict):
+            return
+        jp = journal_path_for(self.yaml_path)
         try:
-            self.statusBar().showMessage(f"已儲存：{self.yaml_path}", 3000)
+            applied, _last = load_with_journal(self.data, jp)
+        except Exception as e:
+            applied = 0
+            self._show_message(f"journal 重播失敗：{e}")
+        self.flows.invalidate()
+        self._mark_all_flows_edited()
+        self._journal = open_journal(self.data, jp)
+        if applied:
+            # recovered edits that never made it into flow.yaml: persist them
+            self._show_message(f"已從 journal 復原 {applied} 筆未存檔的編輯：{jp}")
+            self._save_yaml_quiet()
+
+    def _journal_append(self, op: str, flow_id: Optional[str] = None, **fields: Any) -> None:
+        if self._journal is None:
+            return
+        fid = flow_id or self.current_flow_id
+        if not fid:
+            return
+        self._mark_flow_edited(self._get_flow(fid))
+        try:
+            self._journal.append(op, fid, **fields)
+        except Exception as e:
+            try:
+                self.step_log.append_line(f"[{now_utc_iso()}] journal append failed: {e}")
+            except Exception:
+                pass
+
+    def _journal_anchor(self, flow_id: Optional[str] = None) -> None:
+        fid = flow_id or self.current_flow_id
+        f = self._get_flow(fid) if fid else None
+        if isinstance(f, dict):
+            self._journal_append("set_flow", fid, fields={"anchor": copy.deepcopy(f.get("anchor"))})
+
+    def _compact_journal(self, upto_seq: Optional[int]) -> None:
+        if self._journal is None or upto_seq is None:
+            return
+        try:
+            self._journal.compact(upto_seq)
         except Exception:
             pass
 
+    def _wait_png_writes_bg(self) -> None:
+        # Runs on the saver thread: YAML must not reference previews that are not on disk yet.
+        if self._png_writer is not None:
+            self._png_writer.flush(timeout=30.0)
+
+    def _mark_dirty(self, flow: Optional[Dict[str, Any]] = None) -> None:
+        """Record an edit. `flow`: the flow dict that changed (default: current flow / steps table flow)."""
+        if flow is not None:
+            self._mark_flow_edited(flow)
+        else:
+            self._mark_flow_edited(self._get_flow(self.current_flow_id) if self.current_flow_id else None)
+            self._mark_flow_edited(getattr(getattr(self, "steps_model", None), "flow", None))
+        self._edit_gen += 1
+        self._set_save_state("dirty")
+
+    def _mark_flow_edited(self, flow: Optional[Dict[str, Any]]) -> None:
+        snaps = getattr(self, "_snapshots", None)
+        if snaps is not None and isinstance(flow, dict):
+            snaps.mark(flow)
+
+    def _mark_all_flows_edited(self) -> None:
+        snaps = getattr(self, "_snapshots", None)
+        if snaps is not None:
+            snaps.mark_all()
+
+    def _set_save_state(self, state: str, detail: str = "") -> None:
+        text = {
+            "dirty": "● 未儲存",
+            "saving": "儲存中…",
+            "saved": "已儲存",
+            "error": "儲存失敗",
+        }.get(state, state)
+        self.save_state = state
+        try:
+            self.lbl_save_state.setText(text)
+            self.lbl_save_state.setToolTip(detail or (self.yaml_path or ""))
+            color = {"dirty": "#b36b00", "error": "#c00000"}.get(state, "")
+            self.lbl_save_state.setStyleSheet(f"color: {color};" if color else "")
+        except Exception:
+            pass
+
+    @Slot(int, str, str)
+    def _on_save_state_gui(self, gen: int, state: str, detail: str):
+        edit_gen = self._save_gens.get(gen)
+        if state == "saving":
+            if self.save_state != "dirty" or edit_gen == self._edit_gen:
+                self._set_save_state("saving")
+            return
+        # the saver writes generations in order and drops superseded ones without a
+        # callback, so this result also settles every older generation
+        for g in [g for g in self._save_gens if g <= gen]:
+            self._save_gens.pop(g, None)
+        seqs = [self._save_journal_seq.pop(g) for g in [g for g in self._save_journal_seq if g <= gen]]
+        journal_seq = max(seqs) if seqs else None
+        if state == "saved":
+            self._compact_journal(journal_seq)
+        if state == "error":
+            self._set_save_state("error", detail)
+            try:
+                self.statusBar().showMessage(f"儲存失敗：{detail}", 8000)
+            except Exception:
+                pass
+            return
+        # saved: only "clean" if nothing changed after this snapshot and no newer save is queued
+        if edit_gen == self._edit_gen and not self._save_timer.isActive() and not self._save_gens:
+            self._set_save_state("saved")
+            try:
+                self.statusBar().showMessage(f"已儲存：{detail}", 3000)
+            except Exception:
+                pass
+
     def on_export_script(self):
         if not self._require_project():
             return
 
-        # 1) Save flow.yaml first
+        # 1) Save flow.yaml first (launchers read it at run time)
         self.on_save_yaml()
+        self._flush_saves()
 
         # 2) Collect flows marked for export (default True if missing)
         flow_ids: List[str] = []
-        for f in self._flows():
+        for f in self.flows:
             if not isinstance(f, dict):
                 continue
             if bool(f.get("export") if "export" in f else True):
@@ -913,15 +1533,16 @@ class AutoClickEditor(QMainWindow):
             QMessageBox.warning(self, "無需匯出", "沒有任何流程勾選『匯出』")
             return
 
-        # 3) Export combined pyautogui script with timestamp
+        # 3) Export a launcher with timestamp (steps are loaded from flow.yaml at run time
+        #    by auto_click_runtime, so edits to flow.yaml do not require re-exporting)
         ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
         out_name = f"run_{len(flow_ids)}flows_{ts}.py"
         out_path = os.path.join(self.project_dir, out_name)
 
         try:
-            from tools.generate_pyautogui_script import generate_multiple  # type: ignore
+            from tools.generate_pyautogui_script import generate_launcher  # type: ignore
 
-            generate_multiple(
+            generate_launcher(
                 project_dir=self.project_dir,
                 flow_ids=flow_ids,
                 out_path=out_path,
@@ -940,26 +1561,17 @@ class AutoClickEditor(QMainWindow):
 
     # ----------------------- flows -----------------------
 
-    def _flows(self) -> List[Dict[str, Any]]:
-        return list(self.data.get("flows") or [])
-
-    def _set_flows(self, flows: List[Dict[str, Any]]):
-        self.data["flows"] = flows
-
     def _get_flow(self, flow_id: str) -> Optional[Dict[str, Any]]:
-        for f in self._flows():
-            if f.get("id") == flow_id:
-                return f
-        return None
+        return self.flows.get(flow_id)
 
     def _ensure_flow(self, flow_id: str) -> Dict[str, Any]:
-        f = self._get_flow(flow_id)
+        """Return flow_id, materializing it (e.g. a virtual slot) on first use."""
+        f = self.flows.get(flow_id)
         if f is not None:
             return f
-        f = {"id": flow_id, "title": flow_id, "anchor": None, "steps": [], "show_desktop": False, "export": False}
-        flows = self._flows()
-        flows.append(f)
-        self._set_flows(flows)
+        # the first flow of a document is exported by default (as flow1 used to be)
+        f = self.flows.ensure(flow_id, export=len(self.flows) == 0)
+        self._refresh_flow_list()
         return f
 
     def _refresh_flow_list(self):
@@ -970,10 +1582,9 @@ class AutoClickEditor(QMainWindow):
         self.flows_table.blockSignals(True)
         self.flows_table.setRowCount(0)
 
-        for f in self._flows():
-            row = self.flows_table.rowCount()
-            self.flows_table.insertRow(row)
-
+        virtual_ids = self.flows.virtual_ids(self.virtual_flow_slots)
+        self.flows_table.setRowCount(len(self.flows) + len(virtual_ids))
+        for row, f in enumerate(self.flows):
             fid = str(f.get("id") or "")
             item_id = QTableWidgetItem(fid)
             item_id.setFlags(item_id.flags() & ~Qt.ItemFlag.ItemIsEditable)
@@ -992,6 +1603,28 @@ class AutoClickEditor(QMainWindow):
             item_ex.setCheckState(Qt.CheckState.Checked if export_val else Qt.CheckState.Unchecked)
             self.flows_table.setItem(row, 2, item_ex)
 
+        # virtual slots: empty rows that become real flows on first use
+        virtual_fg = QColor(140, 140, 140)
+        for row, fid in enumerate(virtual_ids, start=len(self.flows)):
+            item_id = QTableWidgetItem(fid)
+            item_id.setFlags(item_id.flags() & ~Qt.ItemFlag.ItemIsEditable)
+            item_id.setForeground(virtual_fg)
+            item_id.setToolTip("空的流程欄位（擷取錨點或錄製後才會建立並存檔）")
+            self.flows_table.setItem(row, 0, item_id)
+            for col in (1, 2):
+                it = QTableWidgetItem("")
+                it.setFlags(Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsUserCheckable | Qt.ItemFlag.ItemIsSelectable)
+                it.setCheckState(Qt.CheckState.Unchecked)
+                self.flows_table.setItem(row, col, it)
+
+        # keep the current flow selected (quietly) when rows shift
+        if self.current_flow_id:
+            for r in range(self.flows_table.rowCount()):
+                it = self.flows_table.item(r, 0)
+                if it and it.text() == self.current_flow_id:
+                    self.flows_table.setCurrentCell(r, 0)
+                    break
+
         self.flows_table.blockSignals(False)
 
         # 欄寬：流程欄位預設放大
@@ -1021,13 +1654,20 @@ class AutoClickEditor(QMainWindow):
             return
         flow_id = id_item.text()
         f = self._get_flow(flow_id)
-        if not isinstance(f, dict):
-            return
+        created = not isinstance(f, dict)
+        if created:
+            # toggling a virtual slot materializes it
+            f = self.flows.ensure(flow_id)
+            f["export"] = False
 
         if col == 1:
             f["show_desktop"] = item.checkState() == Qt.CheckState.Checked
         elif col == 2:
             f["export"] = item.checkState() == Qt.CheckState.Checked
+        self._mark_flow_edited(f)
+        if created:
+            # the new flow was appended after the real flows: rebuild rows so row == flow index
+            self._refresh_flow_list()
 
         # Save immediately (so next open restores state) without dialogs
         try:
@@ -1052,13 +1692,12 @@ class AutoClickEditor(QMainWindow):
             return
         flow_id = flow_id.strip()
         self._ensure_flow(flow_id)
+        self._mark_dirty()
         self._refresh_flow_list()
         # select newly added row
-        for r in range(self.flows_table.rowCount()):
-            it = self.flows_table.item(r, 0)
-            if it and it.text() == flow_id:
-                self.flows_table.setCurrentCell(r, 0)
-                break
+        row = self.flows.index_of(flow_id)
+        if row >= 0:
+            self.flows_table.setCurrentCell(row, 0)
 
     def on_del_flow(self):
         row = self.flows_table.currentRow() if hasattr(self, "flows_table") else -1
@@ -1068,10 +1707,13 @@ class AutoClickEditor(QMainWindow):
         if not it:
             return
         flow_id = it.text()
+        if flow_id not in self.flows:
+            return
         if QMessageBox.question(self, "刪除流程", f"確定刪除流程 {flow_id}？") != QMessageBox.StandardButton.Yes:
             return
-        flows = [f for f in self._flows() if f.get("id") != flow_id]
-        self._set_flows(flows)
+        self.flows.remove(flow_id)
+        self._journal_append("delete_flow", flow_id)
+        self._mark_dirty()
         self.current_flow_id = None
         self._refresh_flow_list()
         self._refresh_steps_table()
@@ -1081,26 +1723,29 @@ class AutoClickEditor(QMainWindow):
         row = self.flows_table.currentRow() if hasattr(self, "flows_table") else -1
         if row <= 0:
             return
-        flows = self._flows()
-        if row >= len(flows):
+        if not self.flows.move(row, row - 1):
             return
-        flows[row - 1], flows[row] = flows[row], flows[row - 1]
-        self._set_flows(flows)
+        self._journal_move_flow(row - 1)
+        self._mark_dirty()
         self._refresh_flow_list()
         self.flows_table.setCurrentCell(row - 1, 0)
         self._update_ui_state()
 
     def on_flow_down(self):
         row = self.flows_table.currentRow() if hasattr(self, "flows_table") else -1
-        flows = self._flows()
-        if row < 0 or row >= len(flows) - 1:
+        if row < 0 or not self.flows.move(row, row + 1):
             return
-        flows[row + 1], flows[row] = flows[row], flows[row + 1]
-        self._set_flows(flows)
+        self._journal_move_flow(row + 1)
+        self._mark_dirty()
         self._refresh_flow_list()
         self.flows_table.setCurrentCell(row + 1, 0)
         self._update_ui_state()
 
+    def _journal_move_flow(self, to: int) -> None:
+        f = self.flows[to]
+        if isinstance(f, dict):
+            self._journal_append("move_flow", str(f.get("id")), to=to)
+
     def on_rename_flow(self, item):
         # Double-click rename
         if item is None:
@@ -1114,31 +1759,30 @@ class AutoClickEditor(QMainWindow):
             return
         if new_id == old_id:
             return
-        if self._get_flow(new_id) is not None:
+        if new_id in self.flows:
             QMessageBox.warning(self, "名稱重複", f"已存在流程ID：{new_id}")
             return
 
-        f = self._get_flow(old_id)
-        if not isinstance(f, dict):
-            return
         # NOTE: We only rename the id/title in YAML.
         # If this flow already has assets (anchor/preview filenames), those paths are not renamed automatically.
-        f["id"] = new_id
-        f["title"] = new_id
+        self.flows.ensure(old_id)
+        if self.flows.rename(old_id, new_id) is None:
+            return
+        self._journal_append("rename_flow", old_id, to=new_id)
+        self._mark_dirty()
 
         self.current_flow_id = new_id
         self._refresh_flow_list()
         # re-select
-        for r in range(self.flows_table.rowCount()):
-            it = self.flows_table.item(r, 0)
-            if it and it.text() == new_id:
-                self.flows_table.setCurrentCell(r, 0)
-                break
+        row = self.flows.index_of(new_id)
+        if row >= 0:
+            self.flows_table.setCurrentCell(row, 0)
         self._refresh_steps_table()
         self._update_ui_state()
 
     def on_flow_selected(self, idx: int):
         # idx is the selected row index in flows_table
+        self._flush_pending_click()
         if idx < 0 or not hasattr(self, "flows_table"):
             self.current_flow_id = None
             self._refresh_steps_table()
@@ -1155,7 +1799,7 @@ class AutoClickEditor(QMainWindow):
         # Load per-flow anchor basepoint if available
         self.anchor_click_xy = None
         try:
-            f = self._ensure_flow(self.current_flow_id)
+            f = self._get_flow(self.current_flow_id) or {}
             anch = f.get("anchor")
             if isinstance(anch, dict) and isinstance(anch.get("anchor_click_xy"), dict):
                 p = anch.get("anchor_click_xy")
@@ -1267,7 +1911,7 @@ class AutoClickEditor(QMainWindow):
         out_name = f"{flow_id}_anchor.png"
         out_abs = os.path.join(anchors_dir, out_name)
         try:
-            write_png(out_abs, crop)
+            self._write_png_async(out_abs, crop)
         except Exception as e:
             QMessageBox.warning(self, "存檔失敗", f"無法儲存錨點圖：{out_abs}\n{e}")
             return
@@ -1279,6 +1923,8 @@ class AutoClickEditor(QMainWindow):
             "click_in_image": {"x": w // 2, "y": h // 2},
             "capture_rect": {"x": x, "y": y, "w": w, "h": h},
         }
+        self._journal_anchor(flow_id)
+        self._mark_dirty()
         self._show_message(f"已截取錨點圖：{safe_relpath(out_abs, self.project_dir)}；下一步請設定錨點基準點")
         self._refresh_steps_table()
         self._update_ui_state()
@@ -1326,11 +1972,12 @@ class AutoClickEditor(QMainWindow):
             return
 
         # Determine cursor position (raw listener coords) from last move
-        if self._last_move_xy is None:
+        last_xy = self._mouse_pos.get()
+        if last_xy is None:
             self.pending_action = None
             QMessageBox.warning(self, "無法取得游標座標", "尚未偵測到滑鼠移動，請先移動滑鼠再按 F9")
             return
-        px, py = self._listener_xy_to_pixel(self._last_move_xy[0], self._last_move_xy[1])
+        px, py = self._listener_xy_to_pixel(last_xy[0], last_xy[1])
 
         self.anchor_click_xy = {"x": int(px), "y": int(py)}
         anch["anchor_click_xy"] = {"x": int(px), "y": int(py)}
@@ -1345,46 +1992,18 @@ class AutoClickEditor(QMainWindow):
 
         # Capture a basepoint preview screenshot (PREVIEW_CROP_SIZE) and save
         try:
-            full2, fw, fh = capture_fullscreen_bgr()
-            if preview_crop_plan is not None:
-                plan = preview_crop_plan(
-                    click_x=int(px),
-                    click_y=int(py),
-                    screen_w=int(fw),
-                    screen_h=int(fh),
-                    size=int(PREVIEW_CROP_SIZE),
-                    dx=0,
-                    dy=0,
-                )
-                crop = full2[plan.top : plan.bottom, plan.left : plan.right]
-                if plan.pad_left or plan.pad_top or plan.pad_right or plan.pad_bottom:
-                    crop = cv2.copyMakeBorder(
-                        crop,
-                        top=plan.pad_top,
-                        bottom=plan.pad_bottom,
-                        left=plan.pad_left,
-                        right=plan.pad_right,
-                        borderType=cv2.BORDER_CONSTANT,
-                        value=(0, 0, 0),
-                    )
-                if crop.shape[0] != PREVIEW_CROP_SIZE or crop.shape[1] != PREVIEW_CROP_SIZE:
-                    crop = cv2.resize(crop, (PREVIEW_CROP_SIZE, PREVIEW_CROP_SIZE), interpolation=cv2.INTER_NEAREST)
-
-                # draw red crosshair
-                c = int(PREVIEW_CROP_SIZE) // 2
-                L = max(6, int(PREVIEW_CROP_SIZE * 0.12))
-                cv2.line(crop, (c - L, c), (c + L, c), (0, 0, 255), 2)
-                cv2.line(crop, (c, c - L), (c, c + L), (0, 0, 255), 2)
-
-                prevs = os.path.join(self.project_dir, "previews") if self.project_dir else None
-                if prevs:
-                    ensure_dir(prevs)
-                    name = f"{self.current_flow_id}_anchor_basepoint.png"
-                    abs_p = os.path.join(prevs, name)
-                    write_png(abs_p, crop)
-                    anch["basepoint_preview"] = os.path.join("previews", name)
+            crop = capture_preview_bgr(int(px), int(py), size=int(PREVIEW_CROP_SIZE), mode=self.preview_capture_mode)
+            prevs = os.path.join(self.project_dir, "previews") if self.project_dir else None
+            if prevs:
+                ensure_dir(prevs)
+                name = f"{self.current_flow_id}_anchor_basepoint.png"
+                abs_p = os.path.join(prevs, name)
+                self._write_png_async(abs_p, crop)
+                anch["basepoint_preview"] = os.path.join("previews", name)
         except Exception:
             pass
+        self._journal_anchor()
+        self._mark_dirty()
 
         self.pending_action = None
 
@@ -1506,25 +2125,39 @@ class AutoClickEditor(QMainWindow):
             return
 
         anchor_path = os.path.join(self.project_dir, anchor_rel)
+        # anchor image may still be queued on the background writer
+        self._flush_png_writes()
         if not os.path.exists(anchor_path):
             self.pending_action = None
             QMessageBox.warning(self, "找不到錨點圖", f"{anchor_rel}")
             return
 
-        if pyautogui is None:
+        use_locator = AnchorLocator is not None and shared_capture is not None and cv2 is not None
+        if not use_locator and pyautogui is None:
             self.pending_action = None
             QMessageBox.warning(self, "缺少 pyautogui", "無法做錨點定位，請先安裝 pyautogui")
             return
 
+        score = None
         try:
             g = self.data.get("global") if isinstance(self.data.get("global"), dict) else {}
             confidence = float(g.get("confidence", DEFAULT_CONFIDENCE))
             grayscale = bool(g.get("grayscale", DEFAULT_GRAYSCALE))
 
-            try:
-                box = pyautogui.locateOnScreen(anchor_path, confidence=confidence, grayscale=grayscale)
-            except TypeError:
-                box = pyautogui.locateOnScreen(anchor_path)
+            if use_locator:
+                # OpenCV matchTemplate: search near capture_rect first, then full screen
+                # (global.locate_mode: auto / full / pyramid)
+                mode = str(g.get("locate_mode") or "auto")
+                if self._locator is None or self._locator.mode != mode:
+                    self._locator = AnchorLocator(capture=shared_capture(), mode=mode)
+                hint = anch.get("capture_rect") if isinstance(anch.get("capture_rect"), dict) else None
+                box = self._locator.locate(anchor_path, confidence, grayscale=grayscale, hint=hint)
+                score = getattr(box, "score", None)
+            else:
+                try:
+                    box = pyautogui.locateOnScreen(anchor_path, confidence=confidence, grayscale=grayscale)
+                except TypeError:
+                    box = pyautogui.locateOnScreen(anchor_path)
             if box is None:
                 raise RuntimeError("anchor not found")
 
@@ -1540,6 +2173,8 @@ class AutoClickEditor(QMainWindow):
 
         self.anchor_click_xy = {"x": int(px), "y": int(py)}
         anch["anchor_click_xy"] = {"x": int(px), "y": int(py)}
+        self._journal_anchor()
+        self._mark_dirty()
 
         self.pending_action = None
         self.record_insert_mode = True
@@ -1554,7 +2189,7 @@ class AutoClickEditor(QMainWindow):
         self._show_step_log()
         try:
             self.step_log.append_line(
-                f"[{now_utc_iso()}] REC insert start anchor_bbox=({ax},{ay},{aw},{ah}) anchor_click_xy=({int(px)},{int(py)})"
+                f"[{now_utc_iso()}] REC insert start anchor_bbox=({ax},{ay},{aw},{ah}) score={score} anchor_click_xy=({int(px)},{int(py)})"
             )
         except Exception:
             pass
@@ -1641,6 +2276,7 @@ class AutoClickEditor(QMainWindow):
         self.step_log.activateWindow()
 
     def on_stop(self):
+        self._flush_pending_click()
         self.recording = False
         self.paused = False
         self.record_insert_mode = False
@@ -1655,89 +2291,47 @@ class AutoClickEditor(QMainWindow):
 
     # ----------------------- steps editing -----------------------
 
-    def _current_steps(self) -> List[Dict[str, Any]]:
-        if not self._require_flow_selected(silent=True):
-            return []
-        f = self._ensure_flow(self.current_flow_id)
-        return list(f.get("steps") or [])
+    def _selected_step_index(self) -> Optional[int]:
+        """Index into steps of the selected table row (None for anchor rows / no selection)."""
+        ix = self.steps_table.currentIndex()
+        if not ix.isValid():
+            return None
+        return self.steps_model.step_index(ix.row())
 
-    def _set_current_steps(self, steps: List[Dict[str, Any]]):
-        f = self._ensure_flow(self.current_flow_id)
-        f["steps"] = steps
+    def _select_step(self, idx: int) -> None:
+        self.steps_table.setCurrentIndex(self.steps_model.index(self.steps_model.row_of_step(idx), 0))
 
     def on_del_step(self):
-        row = self.steps_table.currentRow()
-        if row < 0:
-            return
-
-        # account for reserved rows (anchor image + basepoint preview)
-        reserved = 0
-        try:
-            f = self._ensure_flow(self.current_flow_id) if self.current_flow_id else None
-            anch = f.get("anchor") if isinstance(f, dict) else None
-            if isinstance(anch, dict):
-                reserved = 2
-        except Exception:
-            reserved = 0
-
-        if row < reserved:
-            return
-
-        steps = self._current_steps()
-        idx = row - reserved
-        if idx < 0 or idx >= len(steps):
+        idx = self._selected_step_index()
+        if idx is None:
             return
-        steps.pop(idx)
-        self._set_current_steps(steps)
-        self._refresh_steps_table()
+        self.steps_model.remove_step(idx)
+        self._journal_append("delete", index=idx)
 
     def on_move_step_up(self):
-        row = self.steps_table.currentRow()
-        if row < 0:
-            return
-
-        reserved = 0
-        try:
-            f = self._ensure_flow(self.current_flow_id) if self.current_flow_id else None
-            anch = f.get("anchor") if isinstance(f, dict) else None
-            if isinstance(anch, dict):
-                reserved = 2
-        except Exception:
-            reserved = 0
-
-        idx = row - reserved
-        steps = self._current_steps()
-        if idx <= 0 or idx >= len(steps):
+        idx = self._selected_step_index()
+        if idx is None or idx <= 0:
             return
-
-        steps[idx - 1], steps[idx] = steps[idx], steps[idx - 1]
-        self._set_current_steps(steps)
-        self._refresh_steps_table()
-        self.steps_table.setCurrentCell(row - 1, 0)
+        if self.steps_model.move_step(idx, idx - 1):
+            self._journal_append("move", index=idx, to=idx - 1)
+            self._select_step(idx - 1)
 
     def on_move_step_down(self):
-        row = self.steps_table.currentRow()
-        if row < 0:
-            return
-
-        reserved = 0
-        try:
-            f = self._ensure_flow(self.current_flow_id) if self.current_flow_id else None
-            anch = f.get("anchor") if isinstance(f, dict) else None
-            if isinstance(anch, dict):
-                reserved = 2
-        except Exception:
-            reserved = 0
-
-        idx = row - reserved
-        steps = self._current_steps()
-        if idx < 0 or idx >= len(steps) - 1:
+        idx = self._selected_step_index()
+        if idx is None or idx >= len(self.steps_model.steps()) - 1:
             return
+        if self.steps_model.move_step(idx, idx + 1):
+            self._journal_append("move", index=idx, to=idx + 1)
+            self._select_step(idx + 1)
 
-        steps[idx], steps[idx + 1] = steps[idx + 1], steps[idx]
-        self._set_current_steps(steps)
-        self._refresh_steps_table()
-        self.steps_table.setCurrentCell(row + 1, 0)
+    def _append_step(self, step: Dict[str, Any]) -> None:
+        """Append to the current flow; the table gets one new row (no rebuild)."""
+        f = self._ensure_flow(self.current_flow_id)
+        if self.steps_model.flow is not f:
+            self._refresh_steps_table()
+        # journal first: one small append makes the step crash-safe
+        self._journal_append("add", index=len(self.steps_model.steps()), step=step)
+        self.steps_model.append_step(step)
 
     def on_insert_type(self):
         if not self._require_flow_selected():
@@ -1751,6 +2345,13 @@ class AutoClickEditor(QMainWindow):
         if not ok:
             return
 
+        # paste (clipboard Ctrl+V) is the better default for non-ASCII text: IMEs break per-key typing
+        modes = ["write（逐字輸入）", "paste（剪貼簿貼上；中文/長文字建議）"]
+        default = 1 if any(ord(ch) > 127 for ch in content) else 0
+        mode_label, ok = QInputDialog.getItem(self, "插入文字輸入", "輸入方式", modes, default, False)
+        if not ok:
+            return
+
         step = {
             "action": "type",
             "purpose": purpose,
@@ -1759,10 +2360,9 @@ class AutoClickEditor(QMainWindow):
             "interval_s": 0.02,
             "delay_s": DEFAULT_DELAY_S,
         }
-        steps = self._current_steps()
-        steps.append(step)
-        self._set_current_steps(steps)
-        self._refresh_steps_table()
+        if mode_label == modes[1]:
+            step["mode"] = "paste"
+        self._append_step(step)
 
     def on_insert_hotkey(self):
         if not self._require_flow_selected():
@@ -1772,188 +2372,107 @@ class AutoClickEditor(QMainWindow):
             return
         keys = [k.strip() for k in s.replace("+", ",").split(",") if k.strip()]
         step = {"action": "hotkey", "keys": keys, "delay_s": DEFAULT_DELAY_S}
-        steps = self._current_steps()
-        steps.append(step)
-        self._set_current_steps(steps)
-        self._refresh_steps_table()
-
-    def _on_steps_table_item_changed(self, item: QTableWidgetItem):
-        # Write-back edits (delay_s, type fields)
-        if self._updating_steps_table:
-            return
-        if not self.current_flow_id:
-            return
-
-        row = item.row()
-        col = item.column()
-
-        # reserved rows (anchor image/basepoint)
-        reserved = 0
-        f = self._ensure_flow(self.current_flow_id)
-        anch = f.get("anchor")
-        if isinstance(anch, dict):
-            reserved = 2
-        if row < reserved:
-            return
+        self._append_step(step)
 
-        idx = row - reserved
-        steps = list(f.get("steps") or [])
-        if idx < 0 or idx >= len(steps):
-            return
-
-        st = steps[idx]
-        if not isinstance(st, dict):
-            return
+    def _refresh_steps_table(self):
+        """Re-point the steps model at the current flow (full reset).
 
-        # Column mapping
-        # 8: delay_s
-        # 11: type_purpose
-        # 12: type_content(text)
+        Used when the flow selection / anchor rows / display size change. Recording
+        and step edits update the model incrementally instead.
+        """
+        f = self._get_flow(self.current_flow_id) if self.current_flow_id else None
+        self.steps_model.set_source(self.project_dir, f, self.preview_display_size)
         try:
-            if col == 8:
-                v = item.text().strip()
-                delay = int(float(v)) if v else DEFAULT_DELAY_S
-                if delay < 0:
-                    delay = 0
-                st["delay_s"] = delay
-            elif col == 11:
-                if st.get("action") == "type":
-                    st["purpose"] = item.text()
-            elif col == 12:
-                if st.get("action") == "type":
-                    st["text"] = item.text()
-            else:
-                return
+            # Make rows tall enough for preview thumbnails
+            self.steps_table.verticalHeader().setDefaultSectionSize(self.preview_display_size + 12)
+            # Also set icon size on the table so icons actually render at the requested size
+            self.steps_table.setIconSize(QSize(self.preview_display_size, self.preview_display_size))
         except Exception:
-            return
+            pass
+        self.steps_table.resizeColumnsToContents()
 
-        f["steps"] = steps
-        # Optional: refresh to normalize display
-        self._refresh_steps_table()
+    # ----------------------- image writes -----------------------
 
-    def _refresh_steps_table(self):
-        self._updating_steps_table = True
-        self.steps_table.setRowCount(0)
+    def _write_png_async(self, path: str, bgr_img) -> None:
+        """Queue a PNG write on the background pool (sync fallback when unavailable).
 
-        reserved = 0
-        # Reserved rows: (1) anchor image, (2) anchor basepoint preview
-        if self.current_flow_id:
-            f = self._ensure_flow(self.current_flow_id)
-            anch = f.get("anchor")
-            if isinstance(anch, dict) and self.project_dir:
-                reserved = 2
-
-                # Row 1: anchor image
-                r0 = 0
-                self.steps_table.insertRow(r0)
-                self.steps_table.setItem(r0, 0, QTableWidgetItem("A1"))
-                self.steps_table.setItem(r0, 1, QTableWidgetItem("anchor_image"))
-                # clear other cells
-                for c in range(2, 13):
-                    self.steps_table.setItem(r0, c, QTableWidgetItem(""))
-
-                anchor_rel = str(anch.get("image") or "")
-                self.steps_table.setItem(r0, 10, QTableWidgetItem(anchor_rel))
-                # thumbnail
-                item_prev = QTableWidgetItem("")
-                try:
-                    abs_path = os.path.join(self.project_dir, anchor_rel)
-                    if anchor_rel and os.path.exists(abs_path):
-                        pm = QPixmap(abs_path)
-                        if not pm.isNull():
-                            pm2 = pm.scaled(self.preview_display_size, self.preview_display_size, Qt.AspectRatioMode.KeepAspectRatio)
-                            item_prev.setIcon(QIcon(pm2))
-                except Exception:
-                    pass
-                self.steps_table.setItem(r0, 9, item_prev)
-
-                # Row 2: anchor basepoint preview
-                r1 = 1
-                self.steps_table.insertRow(r1)
-                self.steps_table.setItem(r1, 0, QTableWidgetItem("A2"))
-                self.steps_table.setItem(r1, 1, QTableWidgetItem("anchor_basepoint"))
-                for c in range(2, 13):
-                    self.steps_table.setItem(r1, c, QTableWidgetItem(""))
-
-                bp_rel = str(anch.get("basepoint_preview") or "")
-                self.steps_table.setItem(r1, 10, QTableWidgetItem(bp_rel))
-                item_bp = QTableWidgetItem("")
-                try:
-                    abs_path = os.path.join(self.project_dir, bp_rel)
-                    if bp_rel and os.path.exists(abs_path):
-                        pm = QPixmap(abs_path)
-                        if not pm.isNull():
-                            pm2 = pm.scaled(self.preview_display_size, self.preview_display_size, Qt.AspectRatioMode.KeepAspectRatio)
-                            item_bp.setIcon(QIcon(pm2))
-                except Exception:
-                    pass
-                self.steps_table.setItem(r1, 9, item_bp)
-
-        steps = self._current_steps()
-        for i, st in enumerate(steps):
-            row = i + reserved
-            self.steps_table.insertRow(row)
-            self.steps_table.setItem(row, 0, QTableWidgetItem(str(i + 1)))
-            self.steps_table.setItem(row, 1, QTableWidgetItem(str(st.get("action"))))
+        Failures of background writes are reported to the step log.
+        """
+        if self._png_writer is None:
+            write_png(path, bgr_img)
+            return
+        self._png_writer.submit(path, bgr_img)
 
-            # UI-only metadata (do not affect execution)
-            ed = st.get("_editor") if isinstance(st.get("_editor"), dict) else {}
-            cxy = ed.get("click_xy") if isinstance(ed, dict) else None
-            cx = ""
-            cy = ""
-            if isinstance(cxy, dict):
-                cx = str(cxy.get("x", ""))
-                cy = str(cxy.get("y", ""))
-            self.steps_table.setItem(row, 2, QTableWidgetItem(cx))
-            self.steps_table.setItem(row, 3, QTableWidgetItem(cy))
-
-            ox = ""
-            oy = ""
-            if isinstance(st.get("offset"), dict):
-                ox = str(st["offset"].get("x", ""))
-                oy = str(st["offset"].get("y", ""))
-            self.steps_table.setItem(row, 4, QTableWidgetItem(ox))
-            self.steps_table.setItem(row, 5, QTableWidgetItem(oy))
-            self.steps_table.setItem(row, 6, QTableWidgetItem(str(st.get("button", ""))))
-            self.steps_table.setItem(row, 7, QTableWidgetItem(str(st.get("clicks", ""))))
-            self.steps_table.setItem(row, 8, QTableWidgetItem(str(st.get("delay_s", ""))))
-            prev_path = str(st.get("preview", ""))
-
-            # Preview thumbnail column
-            item_prev = QTableWidgetItem("")
-            # Show thumbnail directly in table (best-effort)
+    def _flush_png_writes(self, timeout: Optional[float] = 30.0) -> None:
+        """Barrier: wait for queued PNG writes (called before saving YAML)."""
+        if self._png_writer is None:
+            return
+        if not self._png_writer.flush(timeout=timeout):
             try:
-                if prev_path and self.project_dir:
-                    abs_path = os.path.join(self.project_dir, prev_path)
-                    if os.path.exists(abs_path):
-                        pm = QPixmap(abs_path)
-                        if not pm.isNull():
-                            pm2 = pm.scaled(self.preview_display_size, self.preview_display_size, Qt.AspectRatioMode.KeepAspectRatio)
-                            item_prev.setIcon(QIcon(pm2))
+                self.step_log.append_line(f"[{now_utc_iso()}] png writer flush timed out (pending={self._png_writer.pending})")
             except Exception:
                 pass
-            self.steps_table.setItem(row, 9, item_prev)
 
-            # Preview path column
-            self.steps_table.setItem(row, 10, QTableWidgetItem(prev_path))
+    @Slot(str)
+    def _on_png_written_gui(self, path: str):
+        # New thumbnail is on disk; repaint only the rows that show it.
+        self.steps_model.thumbnail_written(path)
 
-            # type fields (for action=type)
-            if st.get("action") == "type":
-                self.steps_table.setItem(row, 11, QTableWidgetItem(str(st.get("purpose", ""))))
-                self.steps_table.setItem(row, 12, QTableWidgetItem(str(st.get("text", ""))))
-            else:
-                self.steps_table.setItem(row, 11, QTableWidgetItem(""))
-                self.steps_table.setItem(row, 12, QTableWidgetItem(""))
-
-        self.steps_table.resizeColumnsToContents()
+    @Slot(str, str)
+    def _on_png_failed_gui(self, path: str, err: str):
+        cleared = self._drop_image_refs(path)
         try:
-            # Make rows tall enough for preview thumbnails
-            self.steps_table.verticalHeader().setDefaultSectionSize(self.preview_display_size + 12)
-            # Also set icon size on the table so icons actually render at the requested size
-            self.steps_table.setIconSize(QSize(self.preview_display_size, self.preview_display_size))
+            self._show_step_log()
+            self.step_log.append_line(f"[{now_utc_iso()}] png write failed: {err}")
+            self.step_log.append_line(f"  path={path}")
+            if cleared:
+                self.step_log.append_line(f"  cleared: {', '.join(cleared)}")
         except Exception:
             pass
-        self._updating_steps_table = False
+        if any(c.endswith(" anchor") for c in cleared):
+            QMessageBox.warning(self, "存檔失敗", f"無法儲存錨點圖：{path}\n{err}\n請重新截取錨點圖")
+
+    def _drop_image_refs(self, abs_path: str) -> List[str]:
+        """Clear doc references to an image whose background write failed.
+
+        Paths are written into the doc when the write is queued; without this a
+        failed write leaves a flow pointing at a missing (or stale) file.
+        Returns what was cleared ("flow1 anchor", "flow1 step0003", ...).
+        """
+        if not self.project_dir:
+            return []
+        target = os.path.normcase(os.path.abspath(abs_path))
+
+        def hit(rel: Any) -> bool:
+            return bool(rel) and os.path.normcase(os.path.abspath(os.path.join(self.project_dir, str(rel)))) == target
+
+        cleared: List[str] = []
+        for f in list(self.flows):
+            if not isinstance(f, dict):
+                continue
+            fid = str(f.get("id") or "")
+            n = len(cleared)
+            anch = f.get("anchor")
+            if isinstance(anch, dict) and hit(anch.get("image")):
+                f["anchor"] = None
+                cleared.append(f"{fid} anchor")
+            elif isinstance(anch, dict) and hit(anch.get("basepoint_preview")):
+                anch["basepoint_preview"] = None
+                cleared.append(f"{fid} basepoint_preview")
+            if len(cleared) > n:
+                self._journal_anchor(fid)
+            for i, st in enumerate(f.get("steps") or []):
+                if isinstance(st, dict) and hit(st.get("preview")):
+                    st["preview"] = None
+                    self._journal_append("edit", fid, index=i, fields={"preview": None})
+                    cleared.append(f"{fid} step{i + 1:04d}")
+            if len(cleared) > n:
+                self._mark_dirty(f)
+                if f is self.steps_model.flow:
+                    self._refresh_steps_table()
+        if cleared:
+            self._update_ui_state()
+        return cleared
 
     # ----------------------- listeners -----------------------
 
@@ -2010,13 +2529,14 @@ class AutoClickEditor(QMainWindow):
             except Exception:
                 btn_name = "left"
 
-            self._events.sig_click.emit(int(x), int(y), btn_name, bool(pressed))
+            self._events.sig_click.emit(int(x), int(y), btn_name, bool(pressed), time.perf_counter())
         except Exception:
             pass
 
     def _on_move(self, x, y):
+        # Listener thread: just overwrite the latest position (no Qt event per move).
         try:
-            self._events.sig_move.emit(int(x), int(y))
+            self._mouse_pos.set((int(x), int(y)))
         except Exception:
             pass
 
@@ -2051,6 +2571,7 @@ class AutoClickEditor(QMainWindow):
         # Otherwise, F9 toggles pause/resume while recording
         if not self.recording:
             return
+        self._flush_pending_click()
         self.paused = not self.paused
         try:
             self._show_step_log()
@@ -2072,23 +2593,20 @@ class AutoClickEditor(QMainWindow):
             pass
         self.on_stop()
 
-    @Slot(int, int)
-    def _on_move_gui(self, x: int, y: int):
-        self._last_move_xy = (int(x), int(y))
-
     def _on_calib_tick(self):
         if not self.calib_mode:
             return
-        if self._last_move_xy is None:
+        last_xy = self._mouse_pos.get()
+        if last_xy is None:
             return
-        x, y = self._last_move_xy
+        x, y = last_xy
         try:
             px, py = self._listener_xy_to_pixel(x, y)
             # capture 300x300 around calibrated pixel coords
             half = 150
             left = int(px) - half
             top = int(py) - half
-            bgr = capture_region_bgr(left, top, 300, 300)
+            bgr = capture_region_bgr(left, top, 300, 300, reuse=True)
 
             # Debug: dump first calib frame and basic stats
             try:
@@ -2102,9 +2620,12 @@ class AutoClickEditor(QMainWindow):
                         outp = os.path.join(self.project_dir, "previews", "__calib_debug.png")
                         ensure_dir(os.path.dirname(outp))
                         write_png(outp, bgr)
+                    grab_ms = None
+                    if shared_capture is not None:
+                        grab_ms = round(shared_capture().stats.snapshot()["avg_ms"], 2)
                     self._show_step_log()
                     self.step_log.append_line(
-                        f"[{now_utc_iso()}] calib debug: region=({left},{top},300,300) mean={meanv} dump={outp}"
+                        f"[{now_utc_iso()}] calib debug: region=({left},{top},300,300) mean={meanv} grab_avg_ms={grab_ms} dump={outp}"
                     )
             except Exception:
                 pass
@@ -2118,10 +2639,11 @@ class AutoClickEditor(QMainWindow):
             except Exception:
                 pass
 
-    @Slot(int, int, str, bool)
-    def _on_click_gui(self, x: int, y: int, btn_name: str, pressed: bool):
+    @Slot(int, int, str, bool, float)
+    def _on_click_gui(self, x: int, y: int, btn_name: str, pressed: bool, t: Optional[float] = None):
         if not pressed:
             return
+        t = time.perf_counter() if t is None else float(t)
 
         # Do not record clicks on our own UI (e.g. Stop button, step log window).
         if (self.recording and not self.paused) and self._is_point_in_our_windows(x, y):
@@ -2156,6 +2678,8 @@ class AutoClickEditor(QMainWindow):
                 ix = clamp(int(px - rx), 0, max(0, rw - 1))
                 iy = clamp(int(py - ry), 0, max(0, rh - 1))
                 anch["click_in_image"] = {"x": ix, "y": iy}
+                self._journal_anchor()
+                self._mark_dirty()
                 self.expect_anchor_click = False
 
                 # Auto-start recording after anchor reference point is set.
@@ -2183,83 +2707,103 @@ class AutoClickEditor(QMainWindow):
         if not f.get("anchor") or self.anchor_click_xy is None:
             return
 
-        # build step
         # Convert listener coords -> screenshot pixel coords
         bx, by = self._listener_xy_to_pixel(x, y)
-        ax = int(self.anchor_click_xy["x"])
-        ay = int(self.anchor_click_xy["y"])
 
-        offset = {"x": bx - ax, "y": by - ay}
-
-        clicks = 1  # PoC: no double-click detection
+        # Double-click: the first press is held back (see _flush_pending_click); a second
+        # press of the same button close enough in time/space turns it into clicks: 2
+        # without a second screenshot / preview.
+        pend = self._pending_click
+        if pend is not None:
+            if pend["flow_id"] == self.current_flow_id and is_double_click(
+                t - pend["t"], bx - pend["x"], by - pend["y"], same_button=(btn_name == pend["button"])
+            ):
+                pend["clicks"] = 2
+                self._flush_pending_click()
+                return
+            self._flush_pending_click()
 
-        # preview
         if not self.project_dir:
             return
-        previews_dir = os.path.join(self.project_dir, "previews")
-        ensure_dir(previews_dir)
 
-        steps = list(f.get("steps") or [])
-        step_idx = len(steps) + 1
-        prev_name = f"{self.current_flow_id}_step{step_idx:04d}.png"
-        prev_abs = os.path.join(previews_dir, prev_name)
+        # Preview must show the screen at the first press, so it is captured now and
+        # only written when the step is committed.
+        crop = None
         try:
             # Preview should be based on recorded click coordinates (pixel space):
-            # capture fullscreen, then crop PREVIEW_CROP_SIZE around (bx,by), with user calibration.
-            prev_rel = None
-            full2, fw, fh = capture_fullscreen_bgr()
-
-            if preview_crop_plan is None:
-                raise RuntimeError("preview_crop_plan not available")
-
-            plan = preview_crop_plan(
-                click_x=bx,
-                click_y=by,
-                screen_w=int(fw),
-                screen_h=int(fh),
+            # crop PREVIEW_CROP_SIZE around (bx,by), with user calibration.
+            # Default "region" mode only grabs the clamped crop rect (not the whole desktop).
+            crop = capture_preview_bgr(
+                bx,
+                by,
                 size=int(PREVIEW_CROP_SIZE),
                 dx=int(self.preview_adjust_dx),
                 dy=int(self.preview_adjust_dy),
+                mode=self.preview_capture_mode,
             )
-
-            crop = full2[plan.top : plan.bottom, plan.left : plan.right]
-            if plan.pad_left or plan.pad_top or plan.pad_right or plan.pad_bottom:
-                crop = cv2.copyMakeBorder(
-                    crop,
-                    top=plan.pad_top,
-                    bottom=plan.pad_bottom,
-                    left=plan.pad_left,
-                    right=plan.pad_right,
-                    borderType=cv2.BORDER_CONSTANT,
-                    value=(0, 0, 0),
-                )
-
-            # Safety: enforce exact size
-            if crop.shape[0] != PREVIEW_CROP_SIZE or crop.shape[1] != PREVIEW_CROP_SIZE:
-                crop = cv2.resize(crop, (PREVIEW_CROP_SIZE, PREVIEW_CROP_SIZE), interpolation=cv2.INTER_NEAREST)
-
-            # Draw a red cross at preview center for visual verification
-            try:
-                c = int(PREVIEW_CROP_SIZE) // 2
-                L = max(6, int(PREVIEW_CROP_SIZE * 0.12))
-                thickness = 2
-                red = (0, 0, 255)  # BGR
-                cv2.line(crop, (c - L, c), (c + L, c), red, thickness)
-                cv2.line(crop, (c, c - L), (c, c + L), red, thickness)
-            except Exception:
-                pass
-
-            write_png(prev_abs, crop)
-            prev_rel = os.path.join("previews", prev_name)
         except Exception as e:
-            prev_rel = None
             try:
                 self._show_step_log()
-                self.step_log.append_line(f"[{now_utc_iso()}] preview save failed: {e}")
-                self.step_log.append_line(f"  path={prev_abs}")
+                self.step_log.append_line(f"[{now_utc_iso()}] preview capture failed: {e}")
             except Exception:
                 pass
 
+        self._pending_click = {
+            "flow_id": self.current_flow_id,
+            "x": bx,
+            "y": by,
+            "button": btn_name,
+            "clicks": 1,
+            "t": t,
+            "crop": crop,
+        }
+        self._pending_click_timer.start()
+
+    def _flush_pending_click(self) -> None:
+        """Commit the held-back click (if any) as a step.
+
+        Called when the double-click window expires, on the second press, and before
+        anything that must see every recorded step (stop, pause, flow switch, save).
+        """
+        if not hasattr(self, "_pending_click_timer"):
+            return
+        self._pending_click_timer.stop()
+        pend, self._pending_click = self._pending_click, None
+        if pend is None or not self.project_dir or self.anchor_click_xy is None:
+            return
+        flow_id = pend["flow_id"]
+        if flow_id != self.current_flow_id:
+            return
+        f = self._ensure_flow(flow_id)
+
+        bx, by = int(pend["x"]), int(pend["y"])
+        btn_name = pend["button"]
+        clicks = int(pend["clicks"])
+        ax = int(self.anchor_click_xy["x"])
+        ay = int(self.anchor_click_xy["y"])
+        offset = {"x": bx - ax, "y": by - ay}
+
+        # preview
+        previews_dir = os.path.join(self.project_dir, "previews")
+        ensure_dir(previews_dir)
+
+        steps = list(f.get("steps") or [])
+        step_idx = len(steps) + 1
+        prev_name = f"{flow_id}_step{step_idx:04d}.png"
+        prev_abs = os.path.join(previews_dir, prev_name)
+        prev_rel = None
+        if pend["crop"] is not None:
+            try:
+                self._write_png_async(prev_abs, pend["crop"])
+                prev_rel = os.path.join("previews", prev_name)
+            except Exception as e:
+                try:
+                    self._show_step_log()
+                    self.step_log.append_line(f"[{now_utc_iso()}] preview save failed: {e}")
+                    self.step_log.append_line(f"  path={prev_abs}")
+                except Exception:
+                    pass
+
         step = {
             "action": "click",
             "offset": offset,
@@ -2272,12 +2816,11 @@ class AutoClickEditor(QMainWindow):
             },
         }
 
-        steps.append(step)
-        f["steps"] = steps
+        self._append_step(step)
 
         # Step log
         try:
-            idx = len(steps)
+            idx = len(steps) + 1
             self._show_step_log()
             delay_s = int(step.get("delay_s") or DEFAULT_DELAY_S)
             prev = prev_rel or ""
@@ -2287,8 +2830,7 @@ class AutoClickEditor(QMainWindow):
         except Exception:
             pass
 
-        # UI 更新
-        self._refresh_steps_table()
+        # UI 更新（表格只多一列）
         self._update_ui_state()
 
     # ----------------------- ui helpers -----------------------
@@ -2472,7 +3014,13 @@ class AutoClickEditor(QMainWindow):
 def main() -> int:
     # pyautogui failsafe: moving mouse to top-left triggers exception. Keep default.
     app = QApplication(sys.argv)
+    if close_shared_capture is not None:
+        app.aboutToQuit.connect(close_shared_capture)
     w = AutoClickEditor()
+    # write any pending save before the PNG writer shuts down
+    app.aboutToQuit.connect(w._flush_saves)
+    if w._png_writer is not None:
+        app.aboutToQuit.connect(w._png_writer.close)
     w.resize(1100, 800)
     w.show()
     return app.exec()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Compiled-flow cache (.flowcache/) for auto-click-system.
+
+每次執行 launcher / runtime 都要解析 flow.yaml、解碼 anchor PNG。這裡把編譯結果存成
+不含 pickle 的 `.npz`，下次啟動（warm start）直接載入：
+- 編譯後的 FlowPlan（JSON，已正規化的 steps；專案內的路徑存成相對於 project_dir）
+- 預先解碼好的 anchor template（grayscale=true 時為灰階）
+
+Cache key：
+- flow.yaml 內容的 sha256 + 選取的 flow ids
+- 以及所有引用到的 anchor 圖內容的 sha256（改了圖也會失效）
+
+結構：
+  project/.flowcache/index.json   { "<yaml_sha>:<flow ids>": {"file": "<key>.npz", "images": {rel_path: sha}} }
+  project/.flowcache/<key>.npz     plan_json (uint8) + tmpl_0, tmpl_1, ...
+
+路徑一律相對於 project_dir 存放、載入時再接回目前的 project_dir，所以整個專案資料夾
+（含 .flowcache/）被複製或搬移後，cache 仍然指向「新位置」的 anchor 並以其內容驗證。
+
+Warm start 只需讀 flow.yaml 與 anchor 檔的 bytes 算 hash，不做 YAML 解析與 PNG 解碼。
+cache 讀寫失敗一律退回正常編譯（不影響執行）。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover
+    np = None
+
+from auto_click_flowio import loads_doc
+from auto_click_runtime import FlowPlan, compile_doc, plan_from_dict, plan_to_dict
+
+CACHE_DIR_NAME = ".flowcache"
+CACHE_FORMAT = 3  # bump when CompiledStep / FlowPlan fields or the stored layout change
+MAX_CACHE_ENTRIES = 8
+
+
+def _sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _sha256_file(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return _sha256_bytes(f.read())
+    except OSError:
+        return None
+
+
+def _to_rel(path: str, root: str) -> str:
+    """Path relative to root when it lies inside root (stored with "/"), else absolute."""
+    try:
+        rel = os.path.relpath(path, root)
+    except ValueError:  # different drive (Windows)
+        return path
+    if rel == os.pardir or rel.startswith(os.pardir + os.sep) or os.path.isabs(rel):
+        return path
+    return rel.replace(os.sep, "/")
+
+
+def _to_abs(path: str, root: str) -> str:
+    return path if os.path.isabs(path) else os.path.normpath(os.path.join(root, path))
+
+
+def _portable_plan(plan: FlowPlan, root: str) -> Dict[str, Any]:
+    d = plan_to_dict(plan)
+    d["project_dir"] = "."
+    for f in d["flows"]:
+        f["anchor_path"] = _to_rel(f["anchor_path"], root)
+    return d
+
+
+def _plan_at(d: Dict[str, Any], root: str) -> FlowPlan:
+    d = dict(d, project_dir=root, flows=[dict(f, anchor_path=_to_abs(f["anchor_path"], root)) for f in d["flows"]])
+    return plan_from_dict(d)
+
+
+def _index_key(yaml_sha: str, flow_ids: Optional[Sequence[str]]) -> str:
+    ids = ",".join(str(f) for f in flow_ids) if flow_ids is not None else "*"
+    return f"{yaml_sha}:{ids}"
+
+
+class FlowCache:
+    """Read/write compiled plans + anchor templates under project_dir/.flowcache."""
+
+    def __init__(self, project_dir: str):
+        self.project_dir = os.path.abspath(project_dir)
+        self.dir = os.path.join(self.project_dir, CACHE_DIR_NAME)
+        self.index_path = os.path.join(self.dir, "index.json")
+
+    # ----------------------- index -----------------------
+
+    def _read_index(self) -> Dict[str, Any]:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                idx = json.load(f)
+        except (OSError, ValueError):
+            return {"format": CACHE_FORMAT, "entries": {}}
+        if not isinstance(idx, dict) or idx.get("format") != CACHE_FORMAT or not isinstance(idx.get("entries"), dict):
+            return {"format": CACHE_FORMAT, "entries": {}}
+        return idx
+
+    def _write_index(self, idx: Dict[str, Any]) -> None:
+        tmp = f"{self.index_path}.tmp{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(idx, f, ensure_ascii=False)
+        os.replace(tmp, self.index_path)
+
+    # ----------------------- load / store -----------------------
+
+    def load(self, yaml_bytes: bytes, flow_ids: Optional[Sequence[str]] = None) -> Optional[Tuple[FlowPlan, Dict[str, Any]]]:
+        """Return (plan, templates by anchor path) on a valid hit, else None."""
+        if np is None:
+            return None
+        entry = self._read_index()["entries"].get(_index_key(_sha256_bytes(yaml_bytes), flow_ids))
+        if not isinstance(entry, dict):
+            return None
+        root = self.project_dir
+        for path, sha in (entry.get("images") or {}).items():
+            if _sha256_file(_to_abs(path, root)) != sha:
+                return None
+        try:
+            with np.load(os.path.join(self.dir, str(entry["file"])), allow_pickle=False) as z:
+                meta = json.loads(z["plan_json"].tobytes().decode("utf-8"))
+                plan = _plan_at(meta["plan"], root)
+                templates = {_to_abs(p, root): z[f"tmpl_{i}"] for i, p in enumerate(meta["templates"])}
+        except Exception:
+            return None
+        return plan, templates
+
+    def store(
+        self,
+        yaml_bytes: bytes,
+        flow_ids: Optional[Sequence[str]],
+        plan: FlowPlan,
+        templates: Dict[str, Any],
+    ) -> None:
+        if np is None:
+            return
+        os.makedirs(self.dir, exist_ok=True)
+        yaml_sha = _sha256_bytes(yaml_bytes)
+        root = self.project_dir
+        images = {}
+        for f in plan.flows:
+            sha = _sha256_file(f.anchor_path)
+            if sha is not None:
+                images[_to_rel(f.anchor_path, root)] = sha
+
+        key_src = _index_key(yaml_sha, flow_ids) + "|" + "|".join(f"{p}={s}" for p, s in sorted(images.items()))
+        file_name = _sha256_bytes(key_src.encode("utf-8"))[:32] + ".npz"
+
+        paths: List[str] = list(templates)
+        meta = {"plan": _portable_plan(plan, root), "templates": [_to_rel(p, root) for p in paths]}
+        arrays = {"plan_json": np.frombuffer(json.dumps(meta, ensure_ascii=False).encode("utf-8"), dtype=np.uint8)}
+        for i, p in enumerate(paths):
+            arrays[f"tmpl_{i}"] = np.ascontiguousarray(templates[p])
+
+        out = os.path.join(self.dir, file_name)
+        tmp = f"{out}.tmp{os.getpid()}.npz"
+        np.savez(tmp, **arrays)
+        os.replace(tmp, out)
+
+        idx = self._read_index()
+        entries = idx["entries"]
+        key = _index_key(yaml_sha, flow_ids)
+        entries.pop(key, None)
+        entries[key] = {"file": file_name, "images": images}
+        # keep the newest entries only (dicts keep insertion order)
+        while len(entries) > MAX_CACHE_ENTRIES:
+            old_key = next(iter(entries))
+            old = entries.pop(old_key)
+            if old.get("file") not in {e.get("file") for e in entries.values()}:
+                try:
+                    os.remove(os.path.join(self.dir, str(old.get("file"))))
+                except OSError:
+                    pass
+        self._write_index(idx)
+
+
+def decode_templates(plan: FlowPlan) -> Dict[str, Any]:
+    """Decode each anchor image once (gray or BGR per plan.grayscale); missing files are skipped."""
+    from auto_click_locate import read_image_bgr, to_gray
+
+    out: Dict[str, Any] = {}
+    for f in plan.flows:
+        if f.anchor_path in out or not os.path.exists(f.anchor_path):
+            continue
+        img = read_image_bgr(f.anchor_path)
+        out[f.anchor_path] = to_gray(img) if plan.grayscale else img
+    return out
+
+
+def load_plan_cached(
+    project_dir: str,
+    flow_ids: Optional[Sequence[str]] = None,
+    log=None,
+) -> Tuple[FlowPlan, Dict[str, Any]]:
+    """Load (plan, anchor templates), using project_dir/.flowcache when valid."""
+    yaml_path = os.path.join(project_dir, "flow.yaml")
+    with open(yaml_path, "rb") as f:
+        yaml_bytes = f.read()
+    key_ids = list(flow_ids) if flow_ids is not None else None
+
+    cache = FlowCache(project_dir)
+    hit = cache.load(yaml_bytes, key_ids)
+    if hit is not None:
+        if log is not None:
+            log("flowcache: hit", cache.dir)
+        return hit
+
+    plan = compile_doc(loads_doc(yaml_bytes.decode("utf-8")), project_dir, flow_ids)
+    try:
+        templates = decode_templates(plan)
+    except Exception:
+        templates = {}
+    try:
+        cache.store(yaml_bytes, key_ids, plan, templates)
+    except Exception as e:
+        if log is not None:
+            log("flowcache: store failed:", e)
+    return plan, templates
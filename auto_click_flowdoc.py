@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Indexed view over the `flows` list of a flow.yaml document.
+
+編輯器原本每次找 flow 都線性掃描 `doc["flows"]`，而且 `_flows()` 每次都複製整個 list。
+錄製時每個點擊、表格的每個事件都會呼叫，flow 數量到數百/數千個時就很明顯。
+
+FlowDocument：
+- 直接包住 doc["flows"]（不複製；存檔仍是原本的 dict）
+- 維護 id → flow 與 id → 位置 的索引，查詢 O(1)
+- 上移/下移只交換兩筆並更新兩個位置
+- 外部直接改了 list（例如 journal replay）之後呼叫 `invalidate()`；
+  查詢時若發現索引與 list 不一致也會自動重建
+- 重複的 id 以第一個為準（與原本線性掃描的行為相同）
+
+虛擬 flow 欄位（virtual slots）：
+- 新文件不再預先建立 flow1..flow50；表格仍顯示 `flow1..flow<N>` 的空欄位供選擇，
+  N 由 `global._editor.virtual_flow_slots` 設定（預設 50）
+- 真正用到（擷取 anchor、錄製、勾選欄位）時才建立 flow dict
+- 存檔時略過「空的欄位 flow」（id 是 flowN、沒有 anchor/steps，且 show_desktop/export 都沒勾）；
+  自訂名稱的 flow 一律保留
+
+純 Python，不依賴 Qt。
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+DEFAULT_VIRTUAL_FLOW_SLOTS = 50
+
+_SLOT_RE = re.compile(r"^flow([1-9][0-9]*)$")
+
+
+def slot_id(n: int) -> str:
+    return f"flow{int(n)}"
+
+
+def is_slot_id(flow_id: Any, slots: int) -> bool:
+    m = _SLOT_RE.match(str(flow_id or ""))
+    return bool(m) and int(m.group(1)) <= int(slots)
+
+
+def flow_has_content(f: Any) -> bool:
+    """Anchor, steps, or a checkbox turned on (new_flow defaults both to False)."""
+    if not isinstance(f, dict):
+        return False
+    return bool(f.get("anchor") or f.get("steps") or f.get("show_desktop") or f.get("export"))
+
+
+def is_placeholder_flow(f: Any, slots: int) -> bool:
+    """An untouched virtual slot: flowN (N <= slots) without content (see flow_has_content)."""
+    return isinstance(f, dict) and is_slot_id(f.get("id"), slots) and not flow_has_content(f)
+
+
+def persisted_flows(flows: Iterable[Any], slots: int) -> List[Any]:
+    """Flows worth writing to flow.yaml (placeholder slots are dropped)."""
+    return [f for f in flows if not is_placeholder_flow(f, slots)]
+
+
+def new_flow(flow_id: str, export: bool = False) -> Dict[str, Any]:
+    return {"id": flow_id, "title": flow_id, "anchor": None, "steps": [], "show_desktop": False, "export": bool(export)}
+
+
+class FlowDocument(Sequence):
+    """Read-only Sequence of flow dicts + id index; mutate through the methods below."""
+
+    def __init__(self, doc: Dict[str, Any]):
+        self.doc = doc
+        self._by_id: Optional[Dict[str, Dict[str, Any]]] = None
+        self._pos: Dict[str, int] = {}
+
+    # ----------------------- sequence view -----------------------
+
+    @property
+    def _list(self) -> List[Dict[str, Any]]:
+        flows = self.doc.get("flows")
+        if not isinstance(flows, list):
+            flows = [f for f in (flows or [])]
+            self.doc["flows"] = flows
+            self._by_id = None
+        return flows
+
+    def __len__(self) -> int:
+        return len(self._list)
+
+    def __getitem__(self, i):
+        return self._list[i]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._list)
+
+    def ids(self) -> List[str]:
+        return [str(f.get("id") or "") for f in self._list if isinstance(f, dict)]
+
+    def virtual_ids(self, slots: int) -> List[str]:
+        """Slot ids flow1..flow<slots> that have not been materialized yet."""
+        index = self._index()
+        return [fid for fid in (slot_id(n) for n in range(1, int(slots) + 1)) if fid not in index]
+
+    # ----------------------- index -----------------------
+
+    def invalidate(self) -> None:
+        """Drop the index (call after mutating doc["flows"] directly)."""
+        self._by_id = None
+
+    def _index(self) -> Dict[str, Dict[str, Any]]:
+        if self._by_id is None:
+            by_id: Dict[str, Dict[str, Any]] = {}
+            pos: Dict[str, int] = {}
+            for i, f in enumerate(self._list):
+                if not isinstance(f, dict):
+                    continue
+                fid = f.get("id")
+                if fid is not None and fid not in by_id:
+                    by_id[fid] = f
+                    pos[fid] = i
+            self._by_id = by_id
+            self._pos = pos
+        return self._by_id
+
+    def _fresh(self, flow_id: str) -> Optional[Dict[str, Any]]:
+        f = self._index().get(flow_id)
+        flows = self._list
+        i = self._pos.get(flow_id, -1)
+        if f is not None and 0 <= i < len(flows) and flows[i] is f and f.get("id") == flow_id:
+            return f
+        if f is not None or len(self._by_id or {}) != len(flows):
+            # the list was changed behind our back; rebuild once
+            self._by_id = None
+            return self._index().get(flow_id)
+        return None
+
+    def get(self, flow_id: str) -> Optional[Dict[str, Any]]:
+        return self._fresh(flow_id)
+
+    def __contains__(self, flow_id) -> bool:  # type: ignore[override]
+        return self._fresh(flow_id) is not None
+
+    def index_of(self, flow_id: str) -> int:
+        """Row of flow_id in document order, or -1."""
+        if self._fresh(flow_id) is None:
+            return -1
+        return self._pos[flow_id]
+
+    # ----------------------- mutation -----------------------
+
+    def ensure(self, flow_id: str, export: bool = False) -> Dict[str, Any]:
+        f = self._fresh(flow_id)
+        if f is not None:
+            return f
+        return self.append(new_flow(flow_id, export=export))
+
+    def append(self, flow: Dict[str, Any]) -> Dict[str, Any]:
+        flows = self._list
+        index = self._index()
+        fid = flow.get("id")
+        flows.append(flow)
+        if fid is not None and fid not in index:
+            index[fid] = flow
+            self._pos[fid] = len(flows) - 1
+        return flow
+
+    def remove(self, flow_id: str) -> Optional[Dict[str, Any]]:
+        i = self.index_of(flow_id)
+        if i < 0:
+            return None
+        f = self._list.pop(i)
+        self._by_id = None
+        return f
+
+    def move(self, row: int, to: int) -> bool:
+        """Move the flow at `row` to `to` (adjacent swaps only touch two index entries)."""
+        flows = self._list
+        if not (0 <= row < len(flows) and 0 <= to < len(flows)) or row == to:
+            return False
+        self._index()
+        if abs(row - to) == 1:
+            flows[row], flows[to] = flows[to], flows[row]
+            for i in (row, to):
+                fid = flows[i].get("id") if isinstance(flows[i], dict) else None
+                if fid is not None and self._by_id.get(fid) is flows[i]:
+                    self._pos[fid] = i
+        else:
+            flows.insert(to, flows.pop(row))
+            self._by_id = None
+        return True
+
+    def rename(self, old_id: str, new_id: str) -> Optional[Dict[str, Any]]:
+        """Rename id/title; returns the flow, or None if old_id is missing or new_id is taken."""
+        f = self._fresh(old_id)
+        if f is None or self._fresh(new_id) is not None:
+            return None
+        f["id"] = new_id
+        f["title"] = new_id
+        self._by_id = None
+        return f
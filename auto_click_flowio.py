@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""flow.yaml document I/O for auto-click-system.
+
+編輯器、匯出工具、runtime 共用的 YAML 讀寫層：
+- 有 libyaml 時使用 C 版 `CSafeLoader` / `CSafeDumper`（大型 flow.yaml 讀寫快數倍）
+- 沒有時自動退回純 Python 的 `SafeLoader` / `SafeDumper`（語意相同，只是比較慢）
+- 存檔採「暫存檔 + os.replace」
+
+輸出格式與過去的 `yaml.safe_dump(doc, allow_unicode=True, sort_keys=False)` 相同。
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any, Dict
+
+import yaml
+
+try:
+    from yaml import CSafeDumper as SafeDumper  # type: ignore
+    from yaml import CSafeLoader as SafeLoader  # type: ignore
+
+    HAVE_LIBYAML = True
+except ImportError:  # pragma: no cover - depends on how pyyaml was built
+    from yaml import SafeDumper, SafeLoader  # type: ignore
+
+    HAVE_LIBYAML = False
+
+
+def loads_doc(text: str) -> Dict[str, Any]:
+    """Parse a flow document; an empty file yields {}."""
+    return yaml.load(text, Loader=SafeLoader) or {}
+
+
+def load_doc(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=SafeLoader) or {}
+
+
+def dumps_doc(doc: Any) -> str:
+    return yaml.dump(doc, Dumper=SafeDumper, allow_unicode=True, sort_keys=False)
+
+
+def write_text_atomic(path: str, text: str, encoding: str = "utf-8") -> None:
+    """Write text via temp file + rename (same directory, so os.replace is atomic)."""
+    tmp = f"{path}.tmp{os.getpid()}_{threading.get_ident()}"
+    try:
+        with open(tmp, "w", encoding=encoding, newline="") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except Exception:
+            pass
+        raise
+
+
+def save_doc(path: str, doc: Any) -> None:
+    write_text_atomic(path, dumps_doc(doc))
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Append-only edit journal for auto-click-system (flow.journal.jsonl).
+
+錄製/編輯步驟時，每個變更只 append 一行 JSON，不必重寫整份 flow.yaml：
+- 當機後重新開啟專案，會把 journal 重播（replay）到 flow.yaml 上，不會遺失錄製中的步驟
+- 每筆紀錄有遞增的 `seq`；flow.yaml 存檔時把已包含的最後 seq 寫進
+  `global._editor.journal_seq`，重播時只套用 seq 更大的紀錄（不會重複套用）
+- 存檔成功後 compact：把 seq <= journal_seq 的紀錄刪掉，journal 保持很小
+
+紀錄格式（一行一筆）：
+  {"seq": 1, "op": "add",    "flow": "flow1", "index": 0, "step": {...}}
+  {"seq": 2, "op": "delete", "flow": "flow1", "index": 0}
+  {"seq": 3, "op": "move",   "flow": "flow1", "index": 2, "to": 1}
+  {"seq": 4, "op": "edit",   "flow": "flow1", "index": 1, "fields": {"delay_s": 1}}
+  {"seq": 5, "op": "set_flow", "flow": "flow1", "fields": {"anchor": {...}}}
+  {"seq": 6, "op": "rename_flow", "flow": "flow1", "to": "login"}
+  {"seq": 7, "op": "move_flow",   "flow": "login", "to": 0}     # to = 新的位置（flows list index）
+  {"seq": 8, "op": "delete_flow", "flow": "login"}
+
+最後一行若寫到一半（當機），讀取時會被忽略。
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+FLOW_OPS = ("rename_flow", "move_flow", "delete_flow")
+JOURNAL_OPS = ("add", "delete", "move", "edit", "set_flow") + FLOW_OPS
+
+
+def journal_path_for(yaml_path: str) -> str:
+    """flow.yaml -> flow.journal.jsonl (same directory)."""
+    base, _ext = os.path.splitext(yaml_path)
+    return base + ".journal.jsonl"
+
+
+def read_journal(path: str) -> List[Dict[str, Any]]:
+    """Read journal records; malformed lines (e.g. a torn last write) are skipped."""
+    out: List[Dict[str, Any]] = []
+    try:
+        f = open(path, "r", encoding="utf-8")
+    except FileNotFoundError:
+        return out
+    with f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(rec, dict) and isinstance(rec.get("seq"), int) and rec.get("op") in JOURNAL_OPS:
+                out.append(rec)
+    return out
+
+
+def _find_flow(doc: Dict[str, Any], flow_id: str) -> Dict[str, Any]:
+    flows = doc.get("flows")
+    if not isinstance(flows, list):
+        flows = []
+        doc["flows"] = flows
+    for f in flows:
+        if isinstance(f, dict) and str(f.get("id")) == flow_id:
+            return f
+    f = {"id": flow_id, "title": flow_id, "anchor": None, "steps": [], "show_desktop": False, "export": False}
+    flows.append(f)
+    return f
+
+
+def _flow_pos(doc: Dict[str, Any], flow_id: str) -> int:
+    flows = doc.get("flows")
+    if isinstance(flows, list):
+        for i, f in enumerate(flows):
+            if isinstance(f, dict) and str(f.get("id")) == flow_id:
+                return i
+    return -1
+
+
+def _apply_flow_record(doc: Dict[str, Any], rec: Dict[str, Any]) -> bool:
+    """rename_flow / move_flow / delete_flow (whole flows, addressed by id)."""
+    op = rec.get("op")
+    flow_id = str(rec.get("flow") or "")
+    if op == "rename_flow":
+        to = rec.get("to")
+        if not isinstance(to, str) or not to or _flow_pos(doc, to) >= 0:
+            return False
+        flow = _find_flow(doc, flow_id)  # renaming an unsaved slot materializes it (as the editor does)
+        flow["id"] = to
+        flow["title"] = to
+        return True
+    i = _flow_pos(doc, flow_id)
+    if i < 0:
+        return False
+    flows = doc["flows"]
+    if op == "delete_flow":
+        flows.pop(i)
+        return True
+    if op == "move_flow":
+        to = rec.get("to")
+        if not isinstance(to, int) or not (0 <= to < len(flows)):
+            return False
+        flows.insert(to, flows.pop(i))
+        return True
+    return False
+
+
+def apply_record(doc: Dict[str, Any], rec: Dict[str, Any]) -> bool:
+    """Apply one journal record to doc in place. Returns False if it did not apply."""
+    op = rec.get("op")
+    if op in FLOW_OPS:
+        return _apply_flow_record(doc, rec)
+    flow = _find_flow(doc, str(rec.get("flow") or ""))
+    if op == "set_flow":
+        fields = rec.get("fields")
+        if not isinstance(fields, dict):
+            return False
+        for k, v in fields.items():
+            if k not in ("id", "steps"):
+                flow[k] = copy.deepcopy(v)
+        return True
+
+    steps = flow.get("steps")
+    if not isinstance(steps, list):
+        steps = list(steps or [])
+        flow["steps"] = steps
+    idx = rec.get("index")
+    if not isinstance(idx, int):
+        return False
+
+    if op == "add":
+        step = rec.get("step")
+        if not isinstance(step, dict):
+            return False
+        steps.insert(max(0, min(idx, len(steps))), copy.deepcopy(step))
+        return True
+    if not (0 <= idx < len(steps)):
+        return False
+    if op == "delete":
+        steps.pop(idx)
+        return True
+    if op == "move":
+        to = rec.get("to")
+        if not isinstance(to, int) or not (0 <= to < len(steps)):
+            return False
+        steps.insert(to, steps.pop(idx))
+        return True
+    if op == "edit":
+        fields = rec.get("fields")
+        if not isinstance(fields, dict) or not isinstance(steps[idx], dict):
+            return False
+        steps[idx].update(copy.deepcopy(fields))
+        return True
+    return False
+
+
+def replay(doc: Dict[str, Any], records: Iterable[Dict[str, Any]], after_seq: int = 0) -> Tuple[int, int]:
+    """Apply records with seq > after_seq in seq order.
+
+    Returns (applied_count, last_seq_seen).
+    """
+    applied = 0
+    last = int(after_seq)
+    for rec in sorted(records, key=lambda r: r["seq"]):
+        seq = int(rec["seq"])
+        if seq <= after_seq:
+            continue
+        if apply_record(doc, rec):
+            applied += 1
+        last = max(last, seq)
+    return applied, last
+
+
+def doc_journal_seq(doc: Dict[str, Any]) -> int:
+    g = doc.get("global") if isinstance(doc.get("global"), dict) else {}
+    ed = g.get("_editor") if isinstance(g.get("_editor"), dict) else {}
+    try:
+        return int(ed.get("journal_seq") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def set_doc_journal_seq(doc: Dict[str, Any], seq: int) -> None:
+    g = doc.get("global")
+    if not isinstance(g, dict):
+        g = {}
+        doc["global"] = g
+    ed = g.get("_editor")
+    if not isinstance(ed, dict):
+        ed = {}
+        g["_editor"] = ed
+    ed["journal_seq"] = int(seq)
+
+
+class EditJournal:
+    """Appends seq-numbered edit records to a JSONL file (single writer thread)."""
+
+    def __init__(self, path: str, start_seq: int = 0, fsync: bool = False):
+        self.path = path
+        self.fsync = fsync
+        last = max([int(start_seq)] + [r["seq"] for r in read_journal(path)])
+        self.last_seq = last
+        self._f = None
+
+    def _file(self):
+        if self._f is None:
+            self._f = open(self.path, "a", encoding="utf-8")
+        return self._f
+
+    def append(self, op: str, flow: str, **fields: Any) -> int:
+        if op not in JOURNAL_OPS:
+            raise ValueError(f"unknown journal op: {op}")
+        self.last_seq += 1
+        rec = {"seq": self.last_seq, "op": op, "flow": str(flow)}
+        rec.update(fields)
+        f = self._file()
+        f.write(json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n")
+        f.flush()
+        if self.fsync:
+            os.fsync(f.fileno())
+        return self.last_seq
+
+    def compact(self, upto_seq: int) -> int:
+        """Drop records with seq <= upto_seq (they are in flow.yaml now). Returns records kept."""
+        keep = [r for r in read_journal(self.path) if r["seq"] > int(upto_seq)]
+        self.close()
+        if not keep:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            return 0
+        tmp = f"{self.path}.tmp{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for r in keep:
+                f.write(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n")
+        os.replace(tmp, self.path)
+        return len(keep)
+
+    def close(self) -> None:
+        if self._f is not None:
+            try:
+                self._f.close()
+            finally:
+                self._f = None
+
+
+def load_with_journal(doc: Dict[str, Any], journal_path: str) -> Tuple[int, int]:
+    """Replay journal_path over doc (records newer than global._editor.journal_seq).
+
+    Returns (applied_count, last_seq).
+    """
+    return replay(doc, read_journal(journal_path), after_seq=doc_journal_seq(doc))
+
+
+def open_journal(doc: Dict[str, Any], journal_path: str, fsync: bool = False) -> Optional[EditJournal]:
+    try:
+        return EditJournal(journal_path, start_seq=doc_journal_seq(doc), fsync=fsync)
+    except OSError:
+        return None
@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Anchor locator (OpenCV matchTemplate) for auto-click-system.
+
+取代 `pyautogui.locateOnScreen`：
+- anchor 圖只讀檔/解碼一次（含 grayscale 版本），以 (path, mtime, size) 為 key 快取
+- 先在 `anchor.capture_rect` 附近的搜尋窗內比對；找不到才擴大到整個虛擬桌面
+- 回傳 bbox 與比對分數（score）
+- `verify()`：只截上次找到的 bbox 再比對一次，用來確認預先找好的結果是否仍有效
+- `wait()` 輪詢時以 `frame_delta` 逐像素比對「上次比對過的畫面」（有 hint 時只比搜尋窗），
+  沒有任何像素變化超過容差（±8，吸收壓縮雜訊）就不重新 matchTemplate
+  （每 WAIT_FORCE_MATCH_EVERY 次仍強制比對一次，涵蓋 anchor 出現在搜尋窗以外的情況）
+
+信心值語意與 pyautogui（OpenCV 版）相同：
+- `cv2.matchTemplate(..., TM_CCOEFF_NORMED)` 的最大值 >= confidence 視為找到
+- grayscale=True 時 screen 與 template 都先轉灰階
+
+搜尋模式（global.locate_mode）：
+- `full`：全解析度 matchTemplate
+- `pyramid`：先在縮小的 screen/template 上比對，再於全解析度的候選點附近精修
+  （精修分數才與 confidence 比較，所以找到的結果與 full 模式的語意相同）
+- `auto`（預設）：搜尋影像像素數 >= PYRAMID_AUTO_MIN_PIXELS 時用 pyramid，否則 full
+
+座標：
+- `capture_rect` / 搜尋結果在「截圖像素座標」（以虛擬桌面左上角為原點）計算，
+  回傳的 LocateResult 是螢幕座標（已加上虛擬桌面 origin）。
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover
+    np = None
+
+try:
+    import cv2  # type: ignore
+except Exception:  # pragma: no cover
+    cv2 = None
+
+from auto_click_core import search_window_rect
+
+try:
+    from auto_click_capture import frame_delta  # type: ignore
+except Exception:  # pragma: no cover
+    frame_delta = None
+
+
+# search window margin (pixels) around anchor.capture_rect
+DEFAULT_HINT_MARGIN = 200
+
+LOCATE_MODES = ("auto", "full", "pyramid")
+DEFAULT_LOCATE_MODE = "auto"
+
+# pyramid tuning
+PYRAMID_AUTO_MIN_PIXELS = 1920 * 1080  # auto mode: use pyramid for haystacks at least this large
+PYRAMID_MIN_TEMPLATE_SIDE = 12  # downscaled template must keep at least this many pixels per side
+PYRAMID_MAX_FACTOR = 8
+PYRAMID_CANDIDATES = 5  # coarse peaks refined at full resolution
+PYRAMID_COARSE_SLACK = 0.25  # coarse score may be this much below confidence
+PYRAMID_SCALED_CACHE_MAX = 64  # downscaled templates kept (oldest dropped first)
+
+# wait(): skip re-matching an unchanged screen, but force a match after this many skips
+WAIT_FORCE_MATCH_EVERY = 4
+
+
+class AnchorNotFoundError(RuntimeError):
+    """Raised by AnchorLocator.wait() when the anchor is not found before timeout."""
+
+
+@dataclass(frozen=True)
+class LocateResult:
+    """Anchor bbox in screen coordinates + match score.
+
+    Field names match pyautogui's Box so callers can use `.left/.top/.width/.height`.
+    """
+
+    left: int
+    top: int
+    width: int
+    height: int
+    score: float
+
+
+def read_image_bgr(path: str):
+    """Decode an image file as BGR (supports non-ASCII paths on Windows)."""
+    if np is None or cv2 is None:
+        raise RuntimeError("Missing deps: numpy + opencv-python are required")
+    data = np.fromfile(path, dtype=np.uint8)
+    img = cv2.imdecode(data, cv2.IMREAD_COLOR)
+    if img is None:
+        raise RuntimeError(f"cannot decode image: {path}")
+    return img
+
+
+def to_gray(img):
+    if img.ndim == 2:
+        return img
+    return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+
+def match_template(haystack, needle) -> Optional[Tuple[int, int, float]]:
+    """Best TM_CCOEFF_NORMED match of needle in haystack: (x, y, score).
+
+    Returns None when the needle does not fit into the haystack.
+    """
+    hh, hw = haystack.shape[:2]
+    nh, nw = needle.shape[:2]
+    if nh > hh or nw > hw or nh <= 0 or nw <= 0:
+        return None
+    res = cv2.matchTemplate(haystack, needle, cv2.TM_CCOEFF_NORMED)
+    _min_v, max_v, _min_loc, max_loc = cv2.minMaxLoc(res)
+    return int(max_loc[0]), int(max_loc[1]), float(max_v)
+
+
+def pyramid_factor(needle_shape, haystack_shape) -> int:
+    """Largest power-of-two downscale that keeps the template usable."""
+    nh, nw = needle_shape[:2]
+    hh, hw = haystack_shape[:2]
+    f = 1
+    while (
+        f * 2 <= PYRAMID_MAX_FACTOR
+        and min(nh, nw) // (f * 2) >= PYRAMID_MIN_TEMPLATE_SIDE
+        and min(hh, hw) // (f * 2) >= 1
+    ):
+        f *= 2
+    return f
+
+
+def downscale(img, f: int):
+    if f <= 1:
+        return img
+    h, w = img.shape[:2]
+    return cv2.resize(img, (max(1, w // f), max(1, h // f)), interpolation=cv2.INTER_AREA)
+
+
+def pyramid_match(
+    haystack,
+    needle,
+    confidence: float,
+    small_needle=None,
+    factor: Optional[int] = None,
+    candidates: int = PYRAMID_CANDIDATES,
+) -> Optional[Tuple[int, int, float]]:
+    """Coarse-to-fine TM_CCOEFF_NORMED match: (x, y, score) at full resolution.
+
+    1) match downscaled needle in downscaled haystack, keep the top peaks
+    2) refine each peak at full resolution in a small window
+    The returned score is the full-resolution score.
+    """
+    f = int(factor or pyramid_factor(needle.shape, haystack.shape))
+    if f <= 1:
+        return match_template(haystack, needle)
+    if small_needle is None:
+        small_needle = downscale(needle, f)
+    small_hay = downscale(haystack, f)
+    sh, sw = small_needle.shape[:2]
+    if sh > small_hay.shape[0] or sw > small_hay.shape[1]:
+        return match_template(haystack, needle)
+
+    res = cv2.matchTemplate(small_hay, small_needle, cv2.TM_CCOEFF_NORMED)
+    coarse_min = float(confidence) - PYRAMID_COARSE_SLACK
+
+    nh, nw = needle.shape[:2]
+    hh, hw = haystack.shape[:2]
+    pad = 2 * f
+    best: Optional[Tuple[int, int, float]] = None
+    for _ in range(max(1, int(candidates))):
+        _min_v, max_v, _min_loc, (cx, cy) = cv2.minMaxLoc(res)
+        if best is not None and max_v < coarse_min:
+            break
+
+        # refine around the coarse peak at full resolution
+        x0 = max(0, cx * f - pad)
+        y0 = max(0, cy * f - pad)
+        x1 = min(hw, cx * f + nw + pad)
+        y1 = min(hh, cy * f + nh + pad)
+        m = match_template(haystack[y0:y1, x0:x1], needle)
+        if m is not None and (best is None or m[2] > best[2]):
+            best = (x0 + m[0], y0 + m[1], m[2])
+            if best[2] >= 0.999:
+                break
+
+        # suppress this peak (non-maximum suppression by template footprint)
+        res[max(0, cy - sh // 2) : cy + sh // 2 + 1, max(0, cx - sw // 2) : cx + sw // 2 + 1] = -1.0
+    return best
+
+
+class AnchorLocator:
+    """Locate anchor images on screen with cached templates and search hints.
+
+    `capture` is an auto_click_capture.ScreenCapture (default: the shared
+    session). Templates (and their pyramid levels) are cached per process.
+    """
+
+    def __init__(self, capture=None, hint_margin: int = DEFAULT_HINT_MARGIN, mode: str = DEFAULT_LOCATE_MODE):
+        if mode not in LOCATE_MODES:
+            raise ValueError(f"unknown locate mode: {mode}")
+        self._capture = capture
+        self.hint_margin = int(hint_margin)
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._templates: Dict[Tuple[str, bool], Tuple[Any, Any]] = {}
+        # (id(templ), factor) -> (templ, downscaled); holding templ keeps its id from being reused
+        self._scaled: Dict[Tuple[int, int], Tuple[Any, Any]] = {}
+        self.skipped_polls = 0  # wait() polls skipped because the screen did not change
+
+    def release_thread(self) -> None:
+        """Release the calling thread's capture backend (worker threads call this on exit)."""
+        release = getattr(self._capture, "release_thread", None)
+        if release is not None:
+            release()
+
+    @property
+    def capture(self):
+        if self._capture is None:
+            from auto_click_capture import shared_capture
+
+            self._capture = shared_capture()
+        return self._capture
+
+    # ----------------------- templates -----------------------
+
+    def template(self, path: str, grayscale: bool):
+        """Return the decoded template (gray or BGR), decoding at most once per file version."""
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+            version = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            version = None
+        key = (path, bool(grayscale))
+        with self._lock:
+            hit = self._templates.get(key)
+        if hit is not None and (version is None or hit[0] == version):
+            return hit[1]
+        img = read_image_bgr(path)
+        tmpl = to_gray(img) if grayscale else img
+        with self._lock:
+            if hit is not None:
+                self._drop_scaled(hit[1])
+            self._templates[key] = (version, tmpl)
+        return tmpl
+
+    def put_template(self, path: str, grayscale: bool, tmpl) -> None:
+        """Seed the cache with an already-decoded template (e.g. from .flowcache) for the file's current version."""
+        path = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+            version = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            version = None
+        with self._lock:
+            old = self._templates.get((path, bool(grayscale)))
+            if old is not None:
+                self._drop_scaled(old[1])
+            self._templates[(path, bool(grayscale))] = (version, tmpl)
+
+    def _drop_scaled(self, templ) -> None:
+        for k in [k for k in self._scaled if k[0] == id(templ)]:
+            del self._scaled[k]
+
+    def _scaled_template(self, templ, f: int):
+        key = (id(templ), int(f))
+        with self._lock:
+            hit = self._scaled.get(key)
+        if hit is not None and hit[0] is templ:
+            return hit[1]
+        small = downscale(templ, f)
+        with self._lock:
+            self._scaled.pop(key, None)
+            while len(self._scaled) >= PYRAMID_SCALED_CACHE_MAX:
+                del self._scaled[next(iter(self._scaled))]
+            self._scaled[key] = (templ, small)
+        return small
+
+    def _use_pyramid(self, hay) -> bool:
+        if self.mode == "pyramid":
+            return True
+        if self.mode == "full":
+            return False
+        return hay.shape[0] * hay.shape[1] >= PYRAMID_AUTO_MIN_PIXELS
+
+    # ----------------------- locate -----------------------
+
+    def locate_in(self, screen_bgr, templ, confidence: float, origin: Tuple[int, int] = (0, 0)) -> Optional[LocateResult]:
+        """Match a prepared template inside an already-captured image."""
+        hay = to_gray(screen_bgr) if templ.ndim == 2 else screen_bgr
+        if self._use_pyramid(hay):
+            f = pyramid_factor(templ.shape, hay.shape)
+            m = pyramid_match(hay, templ, confidence, small_needle=self._scaled_template(templ, f), factor=f)
+        else:
+            m = match_template(hay, templ)
+        if m is None:
+            return None
+        x, y, score = m
+        if score < float(confidence):
+            return None
+        h, w = templ.shape[:2]
+        return LocateResult(int(origin[0]) + x, int(origin[1]) + y, int(w), int(h), score)
+
+    def locate(
+        self,
+        anchor_path: str,
+        confidence: float,
+        grayscale: bool = True,
+        hint: Optional[Dict[str, int]] = None,
+    ) -> Optional[LocateResult]:
+        """One locate attempt: search window around `hint` first, then full screen.
+
+        hint: anchor.capture_rect ({x,y,w,h} in screenshot pixel coordinates).
+        """
+        return self._locate(anchor_path, confidence, grayscale, hint)[0]
+
+    def _hint_window(self, templ, hint, vw: int, vh: int) -> Optional[Tuple[int, int, int, int]]:
+        """Search window (x, y, w, h) around hint in virtual-desktop pixels, or None."""
+        if not isinstance(hint, dict):
+            return None
+        try:
+            wx, wy, ww, wh = search_window_rect(
+                int(hint.get("x", 0)),
+                int(hint.get("y", 0)),
+                int(hint.get("w", templ.shape[1])),
+                int(hint.get("h", templ.shape[0])),
+                self.hint_margin,
+                vw,
+                vh,
+            )
+        except Exception:
+            return None
+        if ww < templ.shape[1] or wh < templ.shape[0]:
+            return None
+        return wx, wy, ww, wh
+
+    def _locate(self, anchor_path: str, confidence: float, grayscale: bool, hint) -> Tuple[Optional[LocateResult], Any]:
+        """locate() that also returns the full-screen frame it grabbed (None if it did not need one)."""
+        templ = self.template(anchor_path, grayscale)
+        cap = self.capture
+        vl, vt, vw, vh = cap.virtual_rect()
+
+        win_rect = self._hint_window(templ, hint, vw, vh)
+        if win_rect is not None:
+            wx, wy, ww, wh = win_rect
+            try:
+                win = cap.grab((vl + wx, vt + wy, ww, wh))
+                found = self.locate_in(win, templ, confidence, origin=(vl + wx, vt + wy))
+                if found is not None:
+                    return found, None
+            except Exception:
+                pass
+
+        full, _fw, _fh = cap.grab_full()
+        return self.locate_in(full, templ, confidence, origin=(vl, vt)), full
+
+    def _locate_in_frame(self, full, templ, confidence: float, hint) -> Optional[LocateResult]:
+        """Same search order as locate(), on an already grabbed full-screen frame."""
+        vl, vt, vw, vh = self.capture.virtual_rect()
+        win_rect = self._hint_window(templ, hint, full.shape[1], full.shape[0])
+        if win_rect is not None:
+            wx, wy, ww, wh = win_rect
+            found = self.locate_in(full[wy : wy + wh, wx : wx + ww], templ, confidence, origin=(vl + wx, vt + wy))
+            if found is not None:
+                return found
+        return self.locate_in(full, templ, confidence, origin=(vl, vt))
+
+    def _watched(self, full, templ, hint):
+        """Part of a full frame wait() diffs between polls: the hint window, else the whole frame."""
+        win_rect = self._hint_window(templ, hint, full.shape[1], full.shape[0])
+        if win_rect is None:
+            return full
+        wx, wy, ww, wh = win_rect
+        return full[wy : wy + wh, wx : wx + ww]
+
+    def verify(
+        self,
+        anchor_path: str,
+        confidence: float,
+        box,
+        grayscale: bool = True,
+        slack: int = 2,
+    ) -> Optional[LocateResult]:
+        """Cheaply re-check an earlier result: match only inside `box` (+slack px).
+
+        box: LocateResult / pyautogui Box in screen coordinates.
+        Returns the refreshed result, or None when the anchor is no longer there.
+        """
+        templ = self.template(anchor_path, grayscale)
+        vl, vt, vw, vh = self.capture.virtual_rect()
+        x0 = max(vl, int(box.left) - slack)
+        y0 = max(vt, int(box.top) - slack)
+        x1 = min(vl + vw, int(box.left) + templ.shape[1] + slack)
+        y1 = min(vt + vh, int(box.top) + templ.shape[0] + slack)
+        if x1 - x0 < templ.shape[1] or y1 - y0 < templ.shape[0]:
+            return None
+        win = self.capture.grab((x0, y0, x1 - x0, y1 - y0))
+        return self.locate_in(win, templ, confidence, origin=(x0, y0))
+
+    def wait(
+        self,
+        anchor_path: str,
+        confidence: float,
+        grayscale: bool = True,
+        hint: Optional[Dict[str, int]] = None,
+        timeout_s: float = 15.0,
+        interval_s: float = 0.5,
+    ) -> LocateResult:
+        """Poll `locate()` until found; raise AnchorNotFoundError after timeout_s.
+
+        After a miss, each poll grabs the screen once and only re-runs the match
+        when at least one pixel differs from the frame last matched by more than
+        frame_delta's tolerance (±8 per channel); a one-letter change in a button
+        label is enough, compression noise is not.
+        """
+        t0 = time.monotonic()
+        found, full = self._locate(anchor_path, confidence, grayscale, hint)
+        last = None  # watched part of the frame the last match ran on
+        skipped = 0
+        while found is None:
+            if time.monotonic() - t0 >= timeout_s:
+                raise AnchorNotFoundError(f"anchor not found within {timeout_s}s: {anchor_path}")
+            time.sleep(interval_s)
+            if frame_delta is None:
+                found = self.locate(anchor_path, confidence, grayscale=grayscale, hint=hint)
+                continue
+            templ = self.template(anchor_path, grayscale)
+            if last is None and full is not None:
+                last = self._watched(full, templ, hint)
+            if last is None:
+                found, full = self._locate(anchor_path, confidence, grayscale, hint)
+                continue
+            full, _fw, _fh = self.capture.grab_full()
+            watched = self._watched(full, templ, hint)
+            if skipped < WAIT_FORCE_MATCH_EVERY and frame_delta(last, watched) == 0.0:
+                skipped += 1
+                self.skipped_polls += 1
+                continue
+            skipped = 0
+            last = watched
+            found = self._locate_in_frame(full, templ, confidence, hint)
+        return found
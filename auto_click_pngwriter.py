@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Background PNG writer pool for auto-click-system.
+
+錄製時 preview / 錨點圖的 PNG 壓縮與寫檔改在背景 thread 執行，
+避免 `cv2.imencode` 卡住 Qt GUI thread（快速連點時會延遲後續 signal）。
+
+設計：
+- bounded queue：佇列滿時 `submit()` 會阻塞（back-pressure），不會無限吃記憶體
+- worker 數量可設定
+- `flush()`：存檔前的 barrier，等所有已送出的圖寫完
+- 寫檔採「暫存檔 + rename」，編輯器不會讀到寫一半的 PNG
+- 成功/失敗透過 callback 回報（callback 在 worker thread 執行；GUI 端請用 Qt signal 轉回）
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import threading
+from typing import Callable, Optional
+
+try:
+    import cv2  # type: ignore
+except Exception:  # pragma: no cover
+    cv2 = None
+
+
+def encode_png(bgr_img) -> bytes:
+    if cv2 is None:
+        raise RuntimeError("opencv-python not available")
+    ok, buf = cv2.imencode(".png", bgr_img)
+    if not ok:
+        raise RuntimeError("cv2.imencode(.png) failed")
+    return buf.tobytes()
+
+
+def write_png_atomic(path: str, bgr_img) -> None:
+    """Encode and write a PNG via temp file + rename (supports non-ASCII paths)."""
+    data = encode_png(bgr_img)
+    tmp = f"{path}.tmp{threading.get_ident()}"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except Exception:
+            pass
+        raise
+
+
+class PngWriterPool:
+    """Write PNG files on background threads.
+
+    The pool takes ownership of submitted images: callers must not modify an
+    array after `submit()`.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_queue: int = 64,
+        on_done: Optional[Callable[[str], None]] = None,
+        on_error: Optional[Callable[[str, Exception], None]] = None,
+        writer: Callable[[str, object], None] = write_png_atomic,
+    ):
+        if workers <= 0:
+            raise ValueError("workers must be > 0")
+        if max_queue <= 0:
+            raise ValueError("max_queue must be > 0")
+        self.on_done = on_done
+        self.on_error = on_error
+        self._writer = writer
+        self._queue: "queue.Queue" = queue.Queue(maxsize=int(max_queue))
+        self._cond = threading.Condition()
+        self._pending = 0
+        self._failed = 0
+        self._closed = False
+        self._threads = []
+        for i in range(int(workers)):
+            t = threading.Thread(target=self._worker, name=f"png-writer-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return self._pending
+
+    @property
+    def failed(self) -> int:
+        with self._cond:
+            return self._failed
+
+    def submit(self, path: str, bgr_img, timeout: Optional[float] = None) -> None:
+        """Queue an image for writing; blocks while the queue is full."""
+        if self._closed:
+            raise RuntimeError("PngWriterPool is closed")
+        with self._cond:
+            self._pending += 1
+        try:
+            self._queue.put((path, bgr_img), block=True, timeout=timeout)
+        except Exception:
+            self._finish(failed=True)
+            raise
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every submitted image has been written (or failed).
+
+        Returns False on timeout.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending == 0, timeout=timeout)
+
+    def close(self, wait: bool = True) -> None:
+        if self._closed:
+            return
+        if wait:
+            self.flush()
+        self._closed = True
+        for _ in self._threads:
+            self._queue.put(None)
+        if wait:
+            for t in self._threads:
+                t.join()
+
+    def _finish(self, failed: bool) -> None:
+        with self._cond:
+            self._pending -= 1
+            if failed:
+                self._failed += 1
+            self._cond.notify_all()
+
+    def _worker(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            path, img = job
+            try:
+                self._writer(path, img)
+            except Exception as e:
+                self._finish(failed=True)
+                if self.on_error is not None:
+                    try:
+                        self.on_error(path, e)
+                    except Exception:
+                        pass
+                continue
+            self._finish(failed=False)
+            if self.on_done is not None:
+                try:
+                    self.on_done(path)
+                except Exception:
+                    pass
@@ -0,0 +1,785 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Data-driven flow runtime for auto-click-system.
+
+取代「把每個 step 展開成 Python 程式碼」的匯出方式：
+- flow.yaml 只載入一次，編譯成精簡的記憶體內計畫（FlowPlan / CompiledFlow / CompiledStep）
+- 由 FlowRunner 依序執行
+- 匯出按鈕只產生一支很小的 launcher（見 tools/generate_pyautogui_script.py generate_launcher），
+  啟動時間與重新產生的成本都跟 flow 大小無關；改 YAML 之後也不需要重新匯出
+
+座標換算與 spec_yaml_v0.md 相同：
+- locate anchor → bbox (ax, ay, w, h)
+- anchor_click_xy = (ax + click_in_image.x, ay + click_in_image.y)
+- click_xy = anchor_click_xy + offset
+
+等待模式（global.wait.mode）：
+- `fixed`（預設）：每個 step 之後固定 sleep(delay_s)
+- `stable`：在下一個點擊目標（或下一個 flow 的 anchor 區域）附近輪詢截圖，
+  畫面連續 `stable_ms` 沒有變化就繼續；`delay_s` 仍是等待上限
+
+多 flow 串接：
+- 目前 flow 的最後一步執行後（尾端等待期間），背景 thread 先找下一個 flow 的 anchor
+- 到了 flow 邊界只截上次找到的 bbox 驗證一次（`AnchorLocator.verify`），失效才完整搜尋
+- 下一個 flow 設了 `show_desktop` 時不預先搜尋（Win+D 會改變畫面）
+
+編譯結果快取（auto_click_flowcache）：
+- 編譯後的計畫與解碼好的 anchor 存在 project/.flowcache/，以 flow.yaml / anchor 圖的 sha256 為 key
+- 內容沒變時直接載入（不解析 YAML、不解碼 PNG）；`--no-cache` 可略過
+
+Usage:
+  py auto_click_runtime.py --project ./project
+  py auto_click_runtime.py --project ./project --flows flow1,flow3
+  py auto_click_runtime.py --project ./project --no-cache
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Ensure repo root (this file's directory) is on sys.path for sibling modules.
+_HERE = os.path.dirname(os.path.abspath(__file__))
+if _HERE and _HERE not in sys.path:
+    sys.path.insert(0, _HERE)
+
+from auto_click_clipboard import TYPE_MODES  # noqa: E402
+from auto_click_flowio import load_doc  # noqa: E402
+
+try:
+    from auto_click_capture import frame_delta, shared_capture  # type: ignore
+except Exception:  # pragma: no cover
+    frame_delta = None
+    shared_capture = None
+
+try:
+    from auto_click_locate import AnchorLocator, AnchorNotFoundError  # type: ignore
+except Exception:  # pragma: no cover
+    AnchorLocator = None
+
+    class AnchorNotFoundError(RuntimeError):  # type: ignore[no-redef]
+        pass
+
+
+DEFAULT_DELAY_S = 2
+DEFAULT_CONFIDENCE = 0.9
+DEFAULT_TYPE_INTERVAL_S = 0.02
+LOCATE_TIMEOUT_S = 15.0
+LOCATE_INTERVAL_S = 0.5
+
+WAIT_MODES = ("fixed", "stable")
+DEFAULT_WAIT_MODE = "fixed"
+DEFAULT_STABLE_MS = 300  # region unchanged for this long -> continue
+DEFAULT_STABLE_MIN_MS = 150  # never continue earlier (UI may not have started reacting yet)
+DEFAULT_STABLE_REGION = 200  # square side (pixels) polled around a click target
+DEFAULT_STABLE_THRESHOLD = 0.002  # changed-pixel fraction still considered "stable"
+DEFAULT_STABLE_POLL_MS = 50
+
+
+class FlowPlanError(ValueError):
+    """flow.yaml cannot be compiled into a runnable plan."""
+
+
+@dataclass(frozen=True)
+class CompiledStep:
+    """One executable step. Only the fields of its `op` are meaningful."""
+
+    op: str  # click / type / hotkey / wait / skip
+    delay_s: float = 0.0
+
+    # click (offset from anchor_click_xy)
+    dx: int = 0
+    dy: int = 0
+    button: str = "left"
+    clicks: int = 1
+
+    # type
+    text: str = ""
+    interval_s: float = DEFAULT_TYPE_INTERVAL_S
+    mode: str = "write"
+
+    # hotkey
+    keys: Tuple[str, ...] = ()
+
+    # wait
+    seconds: float = 0.0
+
+
+@dataclass(frozen=True)
+class WaitPolicy:
+    """How FlowRunner waits after a step (global.wait)."""
+
+    mode: str = DEFAULT_WAIT_MODE
+    stable_s: float = DEFAULT_STABLE_MS / 1000.0
+    min_s: float = DEFAULT_STABLE_MIN_MS / 1000.0
+    region: int = DEFAULT_STABLE_REGION
+    threshold: float = DEFAULT_STABLE_THRESHOLD
+    poll_s: float = DEFAULT_STABLE_POLL_MS / 1000.0
+
+
+@dataclass(frozen=True)
+class CompiledFlow:
+    id: str
+    anchor_path: str  # absolute
+    click_in_image: Tuple[int, int]
+    hint: Optional[Dict[str, int]]  # anchor.capture_rect
+    show_desktop: bool
+    steps: Tuple[CompiledStep, ...]
+
+
+@dataclass(frozen=True)
+class FlowPlan:
+    project_dir: str
+    confidence: float
+    grayscale: bool
+    locate_mode: str
+    expected_screen: Optional[Tuple[int, int]]
+    flows: Tuple[CompiledFlow, ...]
+    wait: WaitPolicy = WaitPolicy()
+
+
+# ----------------------- compile -----------------------
+
+
+def _compile_step(st: Dict[str, Any], default_delay_s: float) -> CompiledStep:
+    action = st.get("action")
+    delay_s = st.get("delay_s")
+    delay_s = float(delay_s) if delay_s is not None else float(default_delay_s)
+
+    if action == "click":
+        off = st.get("offset") or {}
+        return CompiledStep(
+            op="click",
+            delay_s=delay_s,
+            dx=int(off.get("x") or 0),
+            dy=int(off.get("y") or 0),
+            button=str(st.get("button") or "left"),
+            clicks=int(st.get("clicks") or 1),
+        )
+    if action == "type":
+        mode = str(st.get("mode") or "write").lower()
+        if mode not in TYPE_MODES:
+            raise FlowPlanError(f"unknown type mode: {mode}")
+        return CompiledStep(
+            op="type",
+            delay_s=delay_s,
+            text=str(st.get("text") or ""),
+            interval_s=float(st.get("interval_s") or DEFAULT_TYPE_INTERVAL_S),
+            mode=mode,
+        )
+    if action == "hotkey":
+        return CompiledStep(op="hotkey", delay_s=delay_s, keys=tuple(str(k) for k in (st.get("keys") or [])))
+    if action == "wait":
+        return CompiledStep(op="wait", seconds=float(st.get("seconds") or 0))
+    # Unsupported action: skipped, but keep its delay (same as the unrolled script)
+    return CompiledStep(op="skip", delay_s=delay_s, text=str(action))
+
+
+def _compile_flow(flow: Dict[str, Any], project_dir: str, default_delay_s: float) -> CompiledFlow:
+    fid = str(flow.get("id") or "")
+    anchor = flow.get("anchor")
+    if not isinstance(anchor, dict):
+        raise FlowPlanError(f"flow.anchor missing: {fid}")
+
+    anchor_image_rel = anchor.get("image")
+    if not isinstance(anchor_image_rel, str) or not anchor_image_rel:
+        raise FlowPlanError(f"anchor.image missing: {fid}")
+
+    click_in_image = anchor.get("click_in_image")
+    if not (isinstance(click_in_image, dict) and "x" in click_in_image and "y" in click_in_image):
+        raise FlowPlanError(f"anchor.click_in_image missing: {fid}")
+
+    hint = None
+    r = anchor.get("capture_rect")
+    if isinstance(r, dict):
+        try:
+            hint = {"x": int(r["x"]), "y": int(r["y"]), "w": int(r["w"]), "h": int(r["h"])}
+        except Exception:
+            hint = None
+
+    steps = tuple(_compile_step(st, default_delay_s) for st in (flow.get("steps") or []) if isinstance(st, dict))
+    return CompiledFlow(
+        id=fid,
+        anchor_path=os.path.join(project_dir, anchor_image_rel),
+        click_in_image=(int(click_in_image["x"]), int(click_in_image["y"])),
+        hint=hint,
+        show_desktop=bool(flow.get("show_desktop") or False),
+        steps=steps,
+    )
+
+
+def _compile_wait(glob: Dict[str, Any]) -> WaitPolicy:
+    w = glob.get("wait")
+    if w is None:
+        return WaitPolicy()
+    if not isinstance(w, dict):
+        raise FlowPlanError("global.wait must be a mapping")
+    mode = str(w.get("mode") or DEFAULT_WAIT_MODE)
+    if mode not in WAIT_MODES:
+        raise FlowPlanError(f"unknown global.wait.mode: {mode}")
+
+    def ms(key: str, default: float) -> float:
+        v = w.get(key)
+        return max(0.0, float(v if v is not None else default)) / 1000.0
+
+    return WaitPolicy(
+        mode=mode,
+        stable_s=ms("stable_ms", DEFAULT_STABLE_MS),
+        min_s=ms("min_ms", DEFAULT_STABLE_MIN_MS),
+        region=max(8, int(w.get("region") or DEFAULT_STABLE_REGION)),
+        threshold=float(w.get("threshold") if w.get("threshold") is not None else DEFAULT_STABLE_THRESHOLD),
+        poll_s=max(0.001, ms("poll_ms", DEFAULT_STABLE_POLL_MS)),
+    )
+
+
+def export_flow_ids(doc: Dict[str, Any]) -> List[str]:
+    """Flows marked `export` (default True if missing), in YAML order."""
+    out: List[str] = []
+    for f in doc.get("flows") or []:
+        if not isinstance(f, dict):
+            continue
+        if bool(f.get("export") if "export" in f else True):
+            fid = str(f.get("id") or "")
+            if fid:
+                out.append(fid)
+    return out
+
+
+def compile_doc(doc: Dict[str, Any], project_dir: str, flow_ids: Optional[Sequence[str]] = None) -> FlowPlan:
+    """Compile a flow.yaml document into a FlowPlan.
+
+    flow_ids=None selects the flows marked `export`.
+    """
+    version = int(doc.get("version") or 0)
+    if version != 0:
+        raise FlowPlanError(f"unsupported version: {version}")
+
+    project_dir = os.path.abspath(project_dir)
+    meta = doc.get("meta") or {}
+    glob = doc.get("global") or {}
+
+    default_delay_s = int(meta.get("default_delay_s") or DEFAULT_DELAY_S)
+    confidence = float(glob.get("confidence") or DEFAULT_CONFIDENCE)
+    grayscale = bool(glob.get("grayscale") if "grayscale" in glob else True)
+    locate_mode = str(glob.get("locate_mode") or "auto")
+
+    ed = glob.get("_editor") if isinstance(glob.get("_editor"), dict) else {}
+    expected_screen = None
+    if ed.get("capture_screen_w") is not None and ed.get("capture_screen_h") is not None:
+        expected_screen = (int(ed["capture_screen_w"]), int(ed["capture_screen_h"]))
+
+    by_id = {str(f.get("id")): f for f in (doc.get("flows") or []) if isinstance(f, dict)}
+    if flow_ids is None:
+        flow_ids = export_flow_ids(doc)
+
+    flows = []
+    for fid in flow_ids:
+        flow = by_id.get(str(fid))
+        if flow is None:
+            raise FlowPlanError(f"flow id not found: {fid}")
+        flows.append(_compile_flow(flow, project_dir, default_delay_s))
+
+    return FlowPlan(
+        project_dir=project_dir,
+        confidence=confidence,
+        grayscale=grayscale,
+        locate_mode=locate_mode,
+        expected_screen=expected_screen,
+        flows=tuple(flows),
+        wait=_compile_wait(glob),
+    )
+
+
+def load_plan(project_dir: str, flow_ids: Optional[Sequence[str]] = None) -> FlowPlan:
+    """Load project_dir/flow.yaml once and compile it."""
+    yaml_path = os.path.join(project_dir, "flow.yaml")
+    doc = load_doc(yaml_path)
+    return compile_doc(doc, project_dir, flow_ids)
+
+
+def plan_to_dict(plan: FlowPlan) -> Dict[str, Any]:
+    """JSON-safe form of a FlowPlan (used by the compiled-flow cache)."""
+    return asdict(plan)
+
+
+def plan_from_dict(d: Dict[str, Any]) -> FlowPlan:
+    flows = []
+    for f in d["flows"]:
+        steps = tuple(CompiledStep(**dict(st, keys=tuple(st.get("keys") or ()))) for st in f["steps"])
+        hint = f.get("hint")
+        flows.append(
+            CompiledFlow(
+                id=f["id"],
+                anchor_path=f["anchor_path"],
+                click_in_image=tuple(f["click_in_image"]),
+                hint=dict(hint) if isinstance(hint, dict) else None,
+                show_desktop=bool(f["show_desktop"]),
+                steps=steps,
+            )
+        )
+    es = d.get("expected_screen")
+    return FlowPlan(
+        project_dir=d["project_dir"],
+        confidence=float(d["confidence"]),
+        grayscale=bool(d["grayscale"]),
+        locate_mode=str(d["locate_mode"]),
+        expected_screen=tuple(es) if es else None,
+        flows=tuple(flows),
+        wait=WaitPolicy(**d.get("wait", {})),
+    )
+
+
+# ----------------------- execute -----------------------
+
+
+def wait_until_stable(
+    grab: Callable[[], Any],
+    max_s: float,
+    stable_s: float,
+    min_s: float = 0.0,
+    threshold: float = DEFAULT_STABLE_THRESHOLD,
+    poll_s: float = DEFAULT_STABLE_POLL_MS / 1000.0,
+    delta: Optional[Callable[[Any, Any], float]] = None,
+    clock: Callable[[], float] = time.monotonic,
+    sleep: Callable[[float], None] = time.sleep,
+) -> bool:
+    """Poll `grab()` until consecutive frames stay unchanged for `stable_s`.
+
+    Returns True when the region became stable, False when `max_s` elapsed
+    first (the caller has then waited the full upper bound). Never returns
+    True before `min_s`.
+    """
+    if max_s <= 0:
+        return False
+    if delta is None:
+        delta = frame_delta
+    start = clock()
+    prev = grab()
+    last_change = clock()
+    while True:
+        now = clock()
+        remaining = max_s - (now - start)
+        if remaining <= 0:
+            return False
+        sleep(min(poll_s, remaining))
+        frame = grab()
+        now = clock()
+        if delta(prev, frame) > threshold:
+            last_change = now
+        prev = frame
+        if now - start >= min_s and now - last_change >= stable_s:
+            return True
+
+
+class AnchorPrefetcher:
+    """Locate one flow's anchor on a background thread.
+
+    Polls `locator.locate()` until found or `take()` is called. The result
+    may be stale by the time it is taken; callers re-validate it.
+    """
+
+    def __init__(self, locator, flow: CompiledFlow, confidence: float, grayscale: bool, interval_s: float = LOCATE_INTERVAL_S):
+        self.flow = flow
+        self._locator = locator
+        self._confidence = confidence
+        self._grayscale = grayscale
+        self._interval_s = interval_s
+        self._stop = threading.Event()
+        self.result = None
+        self.error: Optional[Exception] = None
+        self._thread = threading.Thread(target=self._run, name=f"anchor-prefetch-{flow.id}", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            self._poll()
+        finally:
+            # mss handles are per thread: close this thread's one, or every prefetch leaks a handle
+            release = getattr(self._locator, "release_thread", None)
+            if release is not None:
+                try:
+                    release()
+                except Exception:
+                    pass
+
+    def _poll(self) -> None:
+        f = self.flow
+        while not self._stop.is_set():
+            try:
+                found = self._locator.locate(f.anchor_path, self._confidence, grayscale=self._grayscale, hint=f.hint)
+            except Exception as e:
+                self.error = e
+                return
+            if found is not None:
+                self.result = found
+                return
+            self._stop.wait(self._interval_s)
+
+    def take(self):
+        """Stop polling and return the last result (None if not found yet)."""
+        self._stop.set()
+        self._thread.join()
+        return self.result
+
+
+class PyautoguiActions:
+    """Input backend used by FlowRunner (pyautogui)."""
+
+    def __init__(self):
+        import pyautogui  # type: ignore
+
+        pyautogui.FAILSAFE = True
+        pyautogui.PAUSE = 0.0
+        self._pg = pyautogui
+        from auto_click_clipboard import have_clipboard
+
+        if not have_clipboard():
+            # no pyperclip: FlowRunner types `mode: paste` steps with write()
+            self.paste = None
+
+    def size(self) -> Tuple[int, int]:
+        sz = self._pg.size()
+        return int(sz.width), int(sz.height)
+
+    def click(self, x: int, y: int, clicks: int, button: str) -> None:
+        self._pg.click(x=x, y=y, clicks=clicks, interval=0.05, button=button)
+
+    def write(self, text: str, interval_s: float) -> None:
+        self._pg.write(text, interval=interval_s)
+
+    def paste(self, text: str) -> None:
+        from auto_click_clipboard import paste_text
+
+        paste_text(text, hotkey=self._pg.hotkey)
+
+    def hotkey(self, *keys: str) -> None:
+        self._pg.hotkey(*keys)
+
+    def locate_on_screen(self, path: str, confidence: float, grayscale: bool):
+        try:
+            return self._pg.locateOnScreen(path, confidence=confidence, grayscale=grayscale)
+        except TypeError:
+            # Older pyautogui without confidence/grayscale kwargs
+            return self._pg.locateOnScreen(path)
+
+
+class FlowRunner:
+    """Execute a FlowPlan.
+
+    actions: input backend (default PyautoguiActions); `paste(text)` is optional,
+             backends without it type `mode: paste` steps with write()
+    locator: auto_click_locate.AnchorLocator-like object with `wait(...)`;
+             None means "create one, or fall back to pyautogui.locateOnScreen"
+    capture: auto_click_capture.ScreenCapture used by the `stable` wait mode
+             (default: the shared session)
+    prefetch: locate the next flow's anchor during the current flow's trailing delay
+    """
+
+    def __init__(
+        self,
+        plan: FlowPlan,
+        actions=None,
+        locator=None,
+        sleep: Callable[[float], None] = time.sleep,
+        log: Callable[..., None] = print,
+        capture=None,
+        clock: Callable[[], float] = time.monotonic,
+        prefetch: bool = True,
+    ):
+        self.plan = plan
+        self.actions = actions if actions is not None else PyautoguiActions()
+        self.sleep = sleep
+        self.log = log
+        self.clock = clock
+        self._capture = capture
+        self._stable_enabled = plan.wait.mode == "stable"
+        self.prefetch = prefetch
+        self._prefetcher: Optional[AnchorPrefetcher] = None
+        self._locator = locator
+        if self._locator is None and AnchorLocator is not None:
+            try:
+                self._locator = AnchorLocator(mode=plan.locate_mode)
+            except Exception:
+                self._locator = None
+
+    # ----------------------- helpers -----------------------
+
+    def check_screen(self) -> None:
+        exp = self.plan.expected_screen
+        if exp is None:
+            return
+        cur = self.actions.size()
+        if tuple(cur) != tuple(exp):
+            raise RuntimeError(
+                f"Screen size mismatch: recorded={exp} current={tuple(cur)}. "
+                f"Please run with the same display/RDP scaling settings as when recording."
+            )
+
+    def show_desktop(self) -> None:
+        """Windows: Win+D"""
+        try:
+            self.actions.hotkey("win", "d")
+            self.sleep(0.5)
+        except Exception:
+            pass
+
+    def locate(self, flow: CompiledFlow):
+        p = self.plan
+        if self._locator is not None:
+            try:
+                return self._locator.wait(
+                    flow.anchor_path,
+                    p.confidence,
+                    grayscale=p.grayscale,
+                    hint=flow.hint,
+                    timeout_s=LOCATE_TIMEOUT_S,
+                    interval_s=LOCATE_INTERVAL_S,
+                )
+            except AnchorNotFoundError:
+                raise
+            except Exception as e:
+                self.log("auto_click_locate failed, falling back to pyautogui:", e)
+                self._locator = None
+
+        t0 = time.monotonic()
+        while time.monotonic() - t0 < LOCATE_TIMEOUT_S:
+            box = self.actions.locate_on_screen(flow.anchor_path, p.confidence, p.grayscale)
+            if box is not None:
+                return box
+            self.sleep(LOCATE_INTERVAL_S)
+        raise AnchorNotFoundError(f"anchor not found within {LOCATE_TIMEOUT_S}s: {flow.anchor_path}")
+
+    def _region_around(self, x: int, y: int) -> Tuple[int, int, int, int]:
+        r = self.plan.wait.region
+        return (int(x) - r // 2, int(y) - r // 2, r, r)
+
+    def wait_region(
+        self,
+        flow: CompiledFlow,
+        index: int,
+        anchor_xy: Tuple[int, int],
+        next_flow: Optional[CompiledFlow] = None,
+    ) -> Tuple[int, int, int, int]:
+        """Screen rect watched after steps[index]: where the next interaction happens.
+
+        - next step is a click: around its target
+        - last step of the flow: the next flow's anchor.capture_rect (if recorded)
+        - otherwise: around the most recent click of this flow (keyboard focus), else the anchor
+        """
+        steps = flow.steps
+        if index + 1 < len(steps):
+            nxt = steps[index + 1]
+            if nxt.op == "click":
+                return self._region_around(anchor_xy[0] + nxt.dx, anchor_xy[1] + nxt.dy)
+        elif next_flow is not None and next_flow.hint is not None:
+            vl, vt, _vw, _vh = self.capture.virtual_rect()
+            h = next_flow.hint
+            return (vl + h["x"], vt + h["y"], h["w"], h["h"])
+        for st in reversed(steps[: index + 1]):
+            if st.op == "click":
+                return self._region_around(anchor_xy[0] + st.dx, anchor_xy[1] + st.dy)
+        return self._region_around(anchor_xy[0], anchor_xy[1])
+
+    @property
+    def capture(self):
+        if self._capture is None:
+            if shared_capture is None:
+                raise RuntimeError("auto_click_capture not available")
+            self._capture = shared_capture()
+        return self._capture
+
+    def settle(self, delay_s: float, region: Callable[[], Tuple[int, int, int, int]]) -> None:
+        """Wait after a step: fixed delay_s, or until `region()` is stable (delay_s is the cap)."""
+        if not self._stable_enabled or delay_s <= 0:
+            self.sleep(delay_s)
+            return
+        w = self.plan.wait
+        start = self.clock()
+        try:
+            rect = region()
+            cap = self.capture
+            wait_until_stable(
+                lambda: cap.grab(rect),
+                max_s=delay_s,
+                stable_s=w.stable_s,
+                min_s=w.min_s,
+                threshold=w.threshold,
+                poll_s=w.poll_s,
+                clock=self.clock,
+                sleep=self.sleep,
+            )
+        except Exception as e:
+            self.log("stable wait unavailable, using fixed delay_s:", e)
+            self._stable_enabled = False
+            rest = delay_s - (self.clock() - start)
+            if rest > 0:
+                self.sleep(rest)
+
+    def act(self, st: CompiledStep, anchor_xy: Tuple[int, int]) -> bool:
+        """Perform the step's input. Returns False when there is nothing to settle."""
+        a = self.actions
+        if st.op == "click":
+            a.click(anchor_xy[0] + st.dx, anchor_xy[1] + st.dy, st.clicks, st.button)
+        elif st.op == "type":
+            paste = getattr(a, "paste", None) if st.mode == "paste" else None
+            if paste is not None:
+                paste(st.text)
+            else:
+                a.write(st.text, st.interval_s)
+        elif st.op == "hotkey":
+            a.hotkey(*st.keys)
+        elif st.op == "wait":
+            self.sleep(st.seconds)
+            return False
+        else:
+            self.log(f"Unsupported action: {st.text!r} (skipped)")
+            self.sleep(st.delay_s)
+            return False
+        return True
+
+    def run_step(
+        self,
+        st: CompiledStep,
+        anchor_xy: Tuple[int, int],
+        region: Optional[Callable[[], Tuple[int, int, int, int]]] = None,
+    ) -> None:
+        if not self.act(st, anchor_xy):
+            return
+        if region is None:
+            self.sleep(st.delay_s)
+        else:
+            self.settle(st.delay_s, region)
+
+    # ----------------------- prefetch -----------------------
+
+    def start_prefetch(self, flow: Optional[CompiledFlow]) -> None:
+        if not self.prefetch or flow is None or flow.show_desktop:
+            return
+        loc = self._locator
+        if loc is None or not hasattr(loc, "locate") or not hasattr(loc, "verify"):
+            return
+        self.cancel_prefetch()
+        self._prefetcher = AnchorPrefetcher(loc, flow, self.plan.confidence, self.plan.grayscale)
+
+    def cancel_prefetch(self) -> None:
+        pf, self._prefetcher = self._prefetcher, None
+        if pf is not None:
+            pf.take()
+
+    def take_prefetched(self, flow: CompiledFlow):
+        """Prefetched anchor box for `flow`, re-validated at its bbox; None if unusable."""
+        pf, self._prefetcher = self._prefetcher, None
+        if pf is None:
+            return None
+        box = pf.take()
+        if pf.flow is not flow or box is None:
+            return None
+        try:
+            return self._locator.verify(flow.anchor_path, self.plan.confidence, box, grayscale=self.plan.grayscale)
+        except Exception:
+            return None
+
+    # ----------------------- run -----------------------
+
+    def run_flow(self, flow: CompiledFlow, next_flow: Optional[CompiledFlow] = None) -> None:
+        if flow.show_desktop:
+            self.cancel_prefetch()
+            self.show_desktop()
+        box = self.take_prefetched(flow)
+        prefetched = box is not None
+        if box is None:
+            box = self.locate(flow)
+        ax, ay = int(box.left), int(box.top)
+        anchor_xy = (ax + flow.click_in_image[0], ay + flow.click_in_image[1])
+        self.log(
+            "flow=", flow.id, "anchor_click_xy=", anchor_xy, "score=", getattr(box, "score", None),
+            "prefetched=", prefetched,
+        )
+
+        steps = flow.steps
+        if not steps:
+            self.start_prefetch(next_flow)
+        for i, st in enumerate(steps):
+            last = i == len(steps) - 1
+            if last and st.op not in ("click", "type", "hotkey"):
+                # pure delay step (wait / skipped action): prefetch during it
+                self.start_prefetch(next_flow)
+            if not self.act(st, anchor_xy):
+                continue
+            if last:
+                # trailing delay of this flow: look for the next anchor meanwhile
+                self.start_prefetch(next_flow)
+            self.settle(st.delay_s, lambda i=i: self.wait_region(flow, i, anchor_xy, next_flow))
+
+    def run(self) -> None:
+        self.check_screen()
+        flows = self.plan.flows
+        try:
+            for i, flow in enumerate(flows):
+                self.run_flow(flow, flows[i + 1] if i + 1 < len(flows) else None)
+        finally:
+            self.cancel_prefetch()
+        self.log("done")
+
+
+def run_project(project_dir: str, flow_ids: Optional[Sequence[str]] = None, use_cache: bool = True) -> int:
+    """Entry point used by exported launchers.
+
+    use_cache: load the compiled plan + decoded anchors from project_dir/.flowcache
+               (see auto_click_flowcache); falls back to a normal compile on any problem.
+    """
+    templates: Dict[str, Any] = {}
+    plan = None
+    if use_cache:
+        try:
+            from auto_click_flowcache import load_plan_cached
+
+            plan, templates = load_plan_cached(project_dir, flow_ids)
+        except FlowPlanError:
+            raise
+        except Exception:
+            plan = None
+    if plan is None:
+        plan = load_plan(project_dir, flow_ids)
+
+    locator = None
+    if AnchorLocator is not None:
+        try:
+            locator = AnchorLocator(mode=plan.locate_mode)
+            for path, tmpl in templates.items():
+                locator.put_template(path, plan.grayscale, tmpl)
+        except Exception:
+            locator = None
+    try:
+        FlowRunner(plan, locator=locator).run()
+    finally:
+        try:
+            from auto_click_capture import close_shared_capture
+
+            close_shared_capture()
+        except Exception:
+            pass
+    return 0
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--project", required=True, help="project dir containing flow.yaml")
+    ap.add_argument("--flows", default="", help="comma-separated flow ids (default: flows with export=true)")
+    ap.add_argument("--no-cache", action="store_true", help="ignore and do not write project/.flowcache")
+    return ap.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ns = parse_args(argv)
+    flow_ids = [s.strip() for s in ns.flows.split(",") if s.strip()] or None
+    return run_project(ns.project, flow_ids, use_cache=not ns.no_cache)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,204 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+
+import auto_click_locate
+from auto_click_locate import AnchorLocator
+
+
+class FakeCapture:
+    """Serves crops of a synthetic BGR screen; virtual origin at (ox, oy)."""
+
+    def __init__(self, screen, ox=0, oy=0):
+        self.screen = screen
+        self.ox, self.oy = ox, oy
+        self.grabs = []
+
+    def virtual_rect(self):
+        h, w = self.screen.shape[:2]
+        return self.ox, self.oy, w, h
+
+    def grab(self, rect, reuse=False):
+        l, t, w, h = rect
+        self.grabs.append(("region", rect))
+        x0, y0 = l - self.ox, t - self.oy
+        return self.screen[y0 : y0 + h, x0 : x0 + w].copy()
+
+    def grab_full(self, reuse=False):
+        self.grabs.append(("full", None))
+        h, w = self.screen.shape[:2]
+        return self.screen.copy(), w, h
+
+
+def make_screen(w=640, h=400, seed=0):
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 256, size=(h // 8, w // 8, 3), dtype=np.uint8)
+    return cv2.resize(small, (w, h), interpolation=cv2.INTER_LINEAR)
+
+
+def write_anchor(tmp_path, screen, x, y, w, h):
+    p = tmp_path / "anchor.png"
+    ok, buf = cv2.imencode(".png", screen[y : y + h, x : x + w])
+    assert ok
+    p.write_bytes(buf.tobytes())
+    return str(p)
+
+
+@pytest.mark.parametrize("grayscale", [True, False])
+def test_locate_with_hint_uses_search_window(tmp_path, grayscale):
+    screen = make_screen()
+    path = write_anchor(tmp_path, screen, 300, 200, 60, 30)
+    cap = FakeCapture(screen, ox=-100, oy=0)
+    loc = AnchorLocator(capture=cap, hint_margin=40)
+
+    r = loc.locate(path, 0.9, grayscale=grayscale, hint={"x": 290, "y": 190, "w": 60, "h": 30})
+    assert r is not None
+    assert (r.left, r.top, r.width, r.height) == (-100 + 300, 200, 60, 30)
+    assert r.score > 0.99
+    assert [kind for kind, _ in cap.grabs] == ["region"]
+
+
+def test_locate_widens_to_full_screen_when_hint_misses(tmp_path):
+    screen = make_screen()
+    path = write_anchor(tmp_path, screen, 500, 40, 50, 40)
+    cap = FakeCapture(screen)
+    loc = AnchorLocator(capture=cap, hint_margin=10)
+
+    r = loc.locate(path, 0.9, hint={"x": 20, "y": 300, "w": 50, "h": 40})
+    assert r is not None
+    assert (r.left, r.top) == (500, 40)
+    assert [kind for kind, _ in cap.grabs] == ["region", "full"]
+
+
+def test_locate_returns_none_below_confidence(tmp_path):
+    screen = make_screen()
+    path = write_anchor(tmp_path, screen, 100, 100, 40, 40)
+    other = make_screen(seed=1)
+    loc = AnchorLocator(capture=FakeCapture(other))
+    assert loc.locate(path, 0.95) is None
+
+
+def test_template_is_decoded_once(tmp_path, monkeypatch):
+    screen = make_screen()
+    path = write_anchor(tmp_path, screen, 10, 10, 30, 30)
+    calls = []
+    real = auto_click_locate.read_image_bgr
+    monkeypatch.setattr(auto_click_locate, "read_image_bgr", lambda p: calls.append(p) or real(p))
+
+    loc = AnchorLocator(capture=FakeCapture(screen))
+    for _ in range(3):
+        assert loc.locate(path, 0.9) is not None
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("grayscale", [True, False])
+@pytest.mark.parametrize("x,y", [(1200, 700), (0, 0), (1536, 912)])
+def test_pyramid_mode_matches_full_mode(tmp_path, grayscale, x, y):
+    screen = make_screen(w=1600, h=960, seed=3)
+    path = write_anchor(tmp_path, screen, x, y, 64, 48)
+
+    full = AnchorLocator(capture=FakeCapture(screen), mode="full").locate(path, 0.9, grayscale=grayscale)
+    pyr = AnchorLocator(capture=FakeCapture(screen), mode="pyramid").locate(path, 0.9, grayscale=grayscale)
+    assert full is not None and pyr is not None
+    assert (pyr.left, pyr.top) == (full.left, full.top) == (x, y)
+    assert abs(pyr.score - full.score) < 1e-4
+
+
+def test_pyramid_mode_respects_confidence(tmp_path):
+    screen = make_screen(w=1600, h=960, seed=3)
+    path = write_anchor(tmp_path, screen, 400, 300, 64, 48)
+    other = make_screen(w=1600, h=960, seed=4)
+    assert AnchorLocator(capture=FakeCapture(other), mode="pyramid").locate(path, 0.9) is None
+
+
+def test_pyramid_factor_keeps_template_usable():
+    assert auto_click_locate.pyramid_factor((20, 20), (1000, 1000)) == 1
+    assert auto_click_locate.pyramid_factor((48, 64), (2160, 3840)) == 4
+    assert auto_click_locate.pyramid_factor((400, 400), (2160, 3840)) == auto_click_locate.PYRAMID_MAX_FACTOR
+
+
+def test_verify_only_grabs_the_box(tmp_path):
+    screen = make_screen()
+    path = write_anchor(tmp_path, screen, 300, 200, 60, 30)
+    cap = FakeCapture(screen, ox=-100, oy=0)
+    loc = AnchorLocator(capture=cap)
+
+    r = loc.verify(path, 0.9, auto_click_locate.LocateResult(200, 200, 60, 30, 1.0))
+    assert r is not None and (r.left, r.top) == (200, 200)
+    assert cap.grabs == [("region", (198, 198, 64, 34))]
+
+    # anchor moved away from the cached box
+    assert loc.verify(path, 0.9, auto_click_locate.LocateResult(0, 50, 60, 30, 1.0)) is None
+
+
+def test_wait_skips_matching_unchanged_screen(tmp_path, monkeypatch):
+    screen = make_screen()
+    path = write_anchor(tmp_path, screen, 100, 100, 40, 40)
+    cap = FakeCapture(make_screen(seed=1))
+    loc = AnchorLocator(capture=cap, mode="full")
+    matches = []
+    real = loc.locate_in
+    monkeypatch.setattr(loc, "locate_in", lambda *a, **k: matches.append(1) or real(*a, **k))
+    monkeypatch.setattr(auto_click_locate, "WAIT_FORCE_MATCH_EVERY", 4)
+
+    with pytest.raises(auto_click_locate.AnchorNotFoundError):
+        loc.wait(path, 0.95, timeout_s=0.3, interval_s=0.01)
+    polls = len([k for k, _ in cap.grabs if k == "full"])
+    assert polls > 10
+    # first attempt + one forced match every 5 polls
+    assert len(matches) <= 1 + polls // 5 + 1
+    assert loc.skipped_polls >= polls - len(matches) - 1
+
+
+def test_wait_finds_anchor_when_screen_changes(tmp_path):
+    screen = make_screen()
+    path = write_anchor(tmp_path, screen, 300, 120, 60, 30)
+    blank = make_screen(seed=1)
+
+    class ChangingCapture(FakeCapture):
+        def grab_full(self, reuse=False):
+            if len(self.grabs) >= 3:
+                self.screen = screen
+            return super().grab_full(reuse)
+
+    cap = ChangingCapture(blank)
+    loc = AnchorLocator(capture=cap)
+    r = loc.wait(path, 0.9, hint={"x": 300, "y": 120, "w": 60, "h": 30}, timeout_s=2.0, interval_s=0.01)
+    assert (r.left, r.top) == (300, 120)
+
+
+def test_wait_notices_a_small_change_in_the_hint_window(tmp_path, monkeypatch):
+    screen = make_screen()
+    path = write_anchor(tmp_path, screen, 300, 120, 60, 30)
+    typo = screen.copy()
+    typo[130:133, 320:323] = 255 - typo[130:133, 320:323]  # a few pixels of the label differ
+
+    class FixedCapture(FakeCapture):
+        def grab_full(self, reuse=False):
+            if len(self.grabs) >= 6:
+                self.screen = screen
+            return super().grab_full(reuse)
+
+    monkeypatch.setattr(auto_click_locate, "WAIT_FORCE_MATCH_EVERY", 1000)  # only the diff can trigger a match
+    cap = FixedCapture(typo)
+    loc = AnchorLocator(capture=cap, mode="full")
+    r = loc.wait(path, 0.995, hint={"x": 300, "y": 120, "w": 60, "h": 30}, timeout_s=2.0, interval_s=0.01)
+    assert (r.left, r.top) == (300, 120)
+    assert loc.skipped_polls >= 2
+
+
+def test_scaled_template_cache_is_bounded_and_keyed_on_the_array(monkeypatch):
+    monkeypatch.setattr(auto_click_locate, "PYRAMID_SCALED_CACHE_MAX", 3)
+    loc = AnchorLocator(capture=object())
+    a = np.full((40, 40), 10, np.uint8)
+    small = loc._scaled_template(a, 2)
+    assert loc._scaled_template(a, 2) is small
+    for v in range(5):
+        loc._scaled_template(np.full((40, 40), v, np.uint8), 2)
+    assert len(loc._scaled) <= 3
+
+    # a different array at a recycled id must not get a stale entry
+    b = np.full((40, 40), 200, np.uint8)
+    loc._scaled[(id(b), 2)] = (a, small)
+    assert int(loc._scaled_template(b, 2)[0, 0]) == 200
@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+import yaml
+
+from auto_click_autosave import BackgroundSaver, DocSnapshotter, dump_yaml, write_text_atomic
+
+
+def test_write_text_atomic_replaces_file(tmp_path):
+    p = tmp_path / "flow.yaml"
+    p.write_text("old", encoding="utf-8")
+    write_text_atomic(str(p), "新內容\n")
+    assert p.read_text(encoding="utf-8") == "新內容\n"
+    assert [x.name for x in tmp_path.iterdir()] == ["flow.yaml"]
+
+
+def test_write_text_atomic_keeps_old_file_on_error(tmp_path):
+    p = tmp_path / "flow.yaml"
+    p.write_text("old", encoding="utf-8")
+    with pytest.raises(TypeError):
+        write_text_atomic(str(p), None)
+    assert p.read_text(encoding="utf-8") == "old"
+    assert [x.name for x in tmp_path.iterdir()] == ["flow.yaml"]
+
+
+def test_saver_writes_snapshot_and_reports(tmp_path):
+    p = str(tmp_path / "flow.yaml")
+    done = []
+    saver = BackgroundSaver(on_done=lambda gen, path: done.append(gen))
+    gen = saver.submit(p, {"version": 0, "meta": {"name": "測試"}})
+    assert saver.flush(timeout=5)
+    assert done == [gen] and saver.saved_generation == gen
+    with open(p, encoding="utf-8") as f:
+        assert yaml.safe_load(f)["meta"]["name"] == "測試"
+    saver.close()
+
+
+def test_saver_coalesces_while_busy(tmp_path):
+    gate = threading.Event()
+    started = threading.Event()
+    written = []
+
+    def writer(path, text):
+        started.set()
+        gate.wait(5)
+        written.append(text)
+
+    saver = BackgroundSaver(writer=writer)
+    saver.submit("p", {"n": 1})
+    assert started.wait(5)
+    for n in range(2, 6):
+        last = saver.submit("p", {"n": n})
+    assert saver.busy
+    gate.set()
+    assert saver.flush(timeout=5)
+    assert written == [dump_yaml({"n": 1}), dump_yaml({"n": 5})]
+    assert saver.saved_generation == last
+    saver.close()
+
+
+def test_saver_reports_errors_and_runs_barrier(tmp_path):
+    errors = []
+    barrier = []
+
+    def writer(path, text):
+        raise OSError("disk full")
+
+    saver = BackgroundSaver(
+        writer=writer,
+        before_write=lambda: barrier.append(1),
+        on_error=lambda gen, path, e: errors.append((gen, str(e))),
+    )
+    gen = saver.submit("p", {})
+    assert saver.flush(timeout=5)
+    assert errors == [(gen, "disk full")] and barrier == [1]
+    assert saver.saved_generation == 0
+    saver.close()
+    with pytest.raises(RuntimeError):
+        saver.submit("p", {})
+
+
+def test_snapshotter_recopies_only_marked_flows():
+    doc = {"version": 0, "meta": {"name": "x"}, "flows": [{"id": "a", "steps": [{"n": 1}]}, {"id": "b", "steps": []}]}
+    snaps = DocSnapshotter()
+    s1 = snaps.snapshot(doc, doc["flows"])
+    assert s1 == doc and s1["flows"][0] is not doc["flows"][0]
+    assert s1["flows"][0]["steps"][0] is not doc["flows"][0]["steps"][0]
+
+    doc["flows"][0]["steps"][0]["n"] = 2
+    snaps.mark(doc["flows"][0])
+    doc["meta"]["name"] = "y"  # top-level keys are always copied
+    s2 = snaps.snapshot(doc, doc["flows"])
+    assert s2["flows"][0]["steps"][0]["n"] == 2 and s1["flows"][0]["steps"][0]["n"] == 1
+    assert s2["flows"][1] is s1["flows"][1]  # unchanged flow: copy reused
+    assert s2["meta"]["name"] == "y"
+    assert (snaps.copied, snaps.reused) == (3, 1)
+
+    # a replaced flow dict is never mistaken for the cached one
+    doc["flows"][1] = {"id": "b", "steps": [{"n": 9}]}
+    assert snaps.snapshot(doc, doc["flows"])["flows"][1]["steps"] == [{"n": 9}]
+    snaps.mark_all()
+    assert snaps.snapshot(doc, doc["flows"][:1])["flows"] == [doc["flows"][0]]
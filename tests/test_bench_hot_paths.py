@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from tools import bench_hot_paths as bench
+
+
+def test_run_selected_cases_and_write_json(tmp_path):
+    out = tmp_path / "bench.json"
+    assert bench.main(["--only", "crop_plan,preview.1080p.120px", "--repeat", "1", "--out", str(out)]) == 0
+    report = json.loads(out.read_text(encoding="utf-8"))
+    assert set(report["results"]) == {"crop_plan.x1000", "preview.1080p.120px"}
+    assert report["results"]["crop_plan.x1000"]["median_ms"] > 0
+    assert "numpy" in report["env"]
+
+
+def test_compare_flags_only_regressions():
+    base = {"results": {"a": {"median_ms": 10.0}, "b": {"median_ms": 10.0}, "gone": {"median_ms": 1.0}}}
+    cur = {"results": {"a": {"median_ms": 12.0}, "b": {"median_ms": 13.0}, "new": {"median_ms": 99.0}}}
+    slower = bench.compare(cur, base, tolerance=0.25)
+    assert [s[0] for s in slower] == ["b"]
+    assert slower[0][3] == pytest.approx(1.3)
+
+
+def test_only_builds_the_selected_groups(tmp_path, monkeypatch):
+    def boom(*a):
+        raise AssertionError("fixture built for an unselected group")
+
+    for name in ("cases_preview", "cases_locate", "cases_yaml", "cases_export"):
+        monkeypatch.setattr(bench, name, boom)
+    assert [c[0] for c in bench.collect_cases(str(tmp_path), ["crop_plan"])] == ["crop_plan.x1000"]
@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+pytest.importorskip("PySide6")
+np = pytest.importorskip("numpy")
+
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+import auto_click_editor as editor  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def test_identical_frames_are_skipped(app):
+    v = editor.CalibPreviewView(300)
+    frame = np.zeros((300, 300, 3), dtype=np.uint8)
+    frame[:, :150] = (255, 0, 0)  # blue (BGR)
+    assert v.set_bgr_image(frame)
+    assert not v.set_bgr_image(frame.copy())
+    assert (v.frames_uploaded, v.frames_skipped) == (1, 1)
+
+    buf = v._buf
+    frame[0, 0] = (1, 2, 3)
+    assert v.set_bgr_image(frame)
+    assert v._buf is buf  # same-size frames reuse the buffer / QImage
+    assert v.frames_uploaded == 2
+
+
+def test_buffer_is_shown_without_channel_swap(app):
+    v = editor.CalibPreviewView(100)
+    frame = np.zeros((50, 50, 3), dtype=np.uint8)
+    frame[:, :] = (10, 20, 200)  # BGR -> red-ish
+    v.set_bgr_image(frame)
+    c = v._qimg.pixelColor(5, 5)
+    assert (c.red(), c.green(), c.blue()) == (200, 20, 10)
+    # rendering scales into the widget and draws the crosshair overlay
+    img = v.grab().toImage()
+    assert img.width() == 100
+    c = img.pixelColor(10, 10)
+    assert (c.red(), c.green(), c.blue()) == (200, 20, 10)
+
+
+def test_gray_and_resized_frames(app):
+    v = editor.CalibPreviewView(64)
+    assert v.set_bgr_image(np.full((32, 32), 7, dtype=np.uint8))
+    assert v._buf.shape == (32, 32, 3)
+    assert v.set_bgr_image(np.zeros((16, 16, 3), dtype=np.uint8))
+    assert v._buf.shape == (16, 16, 3)
@@ -0,0 +1,149 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from auto_click_capture import ScreenCapture
+
+
+class FakeShot:
+    def __init__(self, bgra):
+        self.height, self.width = bgra.shape[:2]
+        self.bgra = bgra.tobytes()
+
+
+class FakeBackend:
+    """Minimal stand-in for mss.mss(): a 200×100 virtual desktop at (-50, 0)."""
+
+    opened = 0
+
+    def __init__(self):
+        FakeBackend.opened += 1
+        self.closed = False
+        self.monitors = [{"left": -50, "top": 0, "width": 200, "height": 100}]
+        self.screen = np.zeros((100, 200, 4), dtype=np.uint8)
+        # encode x into blue channel and y into green channel
+        self.screen[:, :, 0] = np.arange(200, dtype=np.uint8)[None, :]
+        self.screen[:, :, 1] = np.arange(100, dtype=np.uint8)[:, None]
+        self.grabs = []
+
+    def grab(self, mon):
+        self.grabs.append(dict(mon))
+        x0 = mon["left"] - self.monitors[0]["left"]
+        y0 = mon["top"] - self.monitors[0]["top"]
+        return FakeShot(self.screen[y0 : y0 + mon["height"], x0 : x0 + mon["width"]].copy())
+
+    def close(self):
+        self.closed = True
+
+
+def test_backend_opened_once_across_grabs():
+    FakeBackend.opened = 0
+    cap = ScreenCapture(backend_factory=FakeBackend)
+    for _ in range(5):
+        cap.grab((0, 0, 10, 10))
+    cap.grab_full()
+    assert FakeBackend.opened == 1
+    assert cap.stats.snapshot()["count"] == 6
+
+
+def test_grab_region_is_bgr_and_clamped():
+    cap = ScreenCapture(backend_factory=FakeBackend)
+    bgr = cap.grab((-100, 90, 30, 30))
+    # clamped to left=-50 (virtual origin), bottom edge
+    assert bgr.shape == (10, 30, 3)
+    assert int(bgr[0, 0, 0]) == 0
+    assert int(bgr[0, 0, 1]) == 90
+
+
+def test_grab_full_returns_virtual_size():
+    cap = ScreenCapture(backend_factory=FakeBackend)
+    bgr, w, h = cap.grab_full()
+    assert (w, h) == (200, 100)
+    assert bgr.shape == (100, 200, 3)
+
+
+def test_reuse_buffer_is_shared_per_shape():
+    cap = ScreenCapture(backend_factory=FakeBackend)
+    a = cap.grab((0, 0, 20, 20), reuse=True)
+    b = cap.grab((10, 0, 20, 20), reuse=True)
+    c = cap.grab((0, 0, 20, 20))
+    assert a is b
+    assert c is not a
+
+
+def test_close_releases_backend():
+    cap = ScreenCapture(backend_factory=FakeBackend)
+    cap.grab((0, 0, 5, 5))
+    sct = cap._backend()
+    cap.close()
+    assert sct.closed
+
+
+def test_release_thread_closes_only_that_threads_backend():
+    import threading
+
+    cap = ScreenCapture(backend_factory=FakeBackend)
+    cap.grab_full()
+    main_sct = cap._local.sct
+    worker = {}
+
+    def run():
+        cap.grab_full()
+        worker["sct"] = cap._local.sct
+        cap.release_thread()
+
+    t = threading.Thread(target=run)
+    t.start()
+    t.join()
+    assert worker["sct"].closed
+    assert worker["sct"] not in cap._backends
+    assert cap._backends == [main_sct] and not main_sct.closed
+
+
+@pytest.mark.parametrize("click_x,click_y", [(0, 0), (100, 50), (199, 99), (5, 95)])
+@pytest.mark.parametrize("dx,dy", [(0, 0), (-7, 4)])
+def test_region_preview_matches_fullscreen_preview(click_x, click_y, dx, dy):
+    cap = ScreenCapture(backend_factory=FakeBackend)
+    region = cap.grab_preview(click_x, click_y, size=40, dx=dx, dy=dy, mode="region", crosshair=False)
+    full = cap.grab_preview(click_x, click_y, size=40, dx=dx, dy=dy, mode="fullscreen", crosshair=False)
+    assert region.shape == (40, 40, 3)
+    assert (region == full).all()
+
+
+def test_region_preview_grabs_only_crop_rect():
+    cap = ScreenCapture(backend_factory=FakeBackend)
+    cap.grab_preview(100, 50, size=40, mode="region")
+    last = cap._backend().grabs[-1]
+    assert (last["width"], last["height"]) == (40, 40)
+    # virtual origin is (-50, 0): pixel x=100 maps to screen x=50
+    assert (last["left"], last["top"]) == (-50 + 80, 30)
+
+
+def test_frame_delta():
+    from auto_click_capture import frame_delta
+
+    a = np.zeros((10, 10, 3), dtype=np.uint8)
+    b = a.copy()
+    assert frame_delta(a, b) == 0.0
+    b[0, 0] = (0, 0, 5)  # below tolerance
+    assert frame_delta(a, b) == 0.0
+    b[0, :5] = (0, 0, 200)
+    assert frame_delta(a, b) == pytest.approx(0.05)
+    assert frame_delta(a, np.zeros((5, 5, 3), dtype=np.uint8)) == 1.0
+
+
+def test_frame_change_detector():
+    from auto_click_capture import FrameChangeDetector, frame_fingerprint
+
+    rng = np.random.default_rng(0)
+    a = rng.integers(0, 256, size=(120, 160, 3), dtype=np.uint8)
+    det = FrameChangeDetector()
+    assert det.changed(a)
+    assert not det.changed(a.copy())
+    c = a.copy()
+    c[5, 5, 0] ^= 1  # exact: a 1-bit change counts
+    assert det.changed(c)
+    assert det.changed(a, key="other")  # keys are independent
+    assert (det.changes, det.skips) == (3, 1)
+    assert frame_fingerprint(a)[0] == a.shape
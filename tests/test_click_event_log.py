@@ -0,0 +1,98 @@
+import io
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from tools.click_event_log import (  # noqa: E402
+    HEADER_SIZE,
+    RECORD_SIZE,
+    ClickLogError,
+    convert_jsonl,
+    encode_header,
+    encode_records,
+    is_click_log,
+    load_click_log,
+)
+from tools.simple_click_recorder import BatchedEventWriter, EventClock  # noqa: E402
+from tools.simple_click_replayer import load_schedule  # noqa: E402
+
+
+def _clicks(n, t0=5_000_000_000):
+    buttons = ["left", "right", "middle", "Button.x1"]
+    return [
+        {"type": "click", "t": 0.0, "t_ns": t0 + i * 1_000_000, "x": -1920 + i, "y": 2 * i, "button": buttons[i % 4], "pressed": i % 2 == 0}
+        for i in range(n)
+    ]
+
+
+def test_roundtrip_through_batched_writer(tmp_path):
+    p = tmp_path / "clicks.bin"
+    clock = EventClock()
+    with open(p, "wb") as f:
+        f.write(encode_header(clock.wall_anchor, clock.perf_anchor_ns))
+        w = BatchedEventWriter(f, encode=encode_records, batch_max=3)
+        w.put({"type": "meta", **clock.meta()})  # not a click: dropped
+        for ev in _clicks(10):
+            w.put(ev)
+        w.put({"type": "state", "t": 0.0, "paused": True})
+        w.close()
+    assert p.stat().st_size == HEADER_SIZE + 10 * RECORD_SIZE
+    assert is_click_log(str(p))
+
+    header, rec = load_click_log(str(p))
+    assert header["perf_anchor_ns"] == clock.perf_anchor_ns
+    assert header["wall_anchor"] == clock.wall_anchor
+    assert isinstance(rec, np.memmap)
+    assert rec["t_ns"].tolist() == [e["t_ns"] for e in _clicks(10)]
+    assert rec["x"].tolist() == [-1920 + i for i in range(10)]
+    assert rec["button"].tolist() == [0, 1, 2, 0] * 2 + [0, 1]
+    assert rec["pressed"].tolist() == [1, 0] * 5
+
+
+def test_replayer_schedule_matches_jsonl(tmp_path):
+    clicks = _clicks(6)
+    src = tmp_path / "clicks.jsonl"
+    src.write_text("\n".join(json.dumps(c) for c in clicks) + "\n", encoding="utf-8")
+    dst = tmp_path / "clicks.bin"
+    assert convert_jsonl(str(src), str(dst)) == 6
+
+    for only_press in (False, True):
+        a = load_schedule(str(src), 2.0, only_press=only_press)
+        b = load_schedule(str(dst), 2.0, only_press=only_press)  # auto-detected
+        assert b == a
+    assert load_schedule(str(dst), 1.0, only_press=True)[1] == (0.002, (-1918, 4, "middle"))
+
+
+def test_truncated_tail_and_bad_files(tmp_path):
+    p = tmp_path / "clicks.bin"
+    p.write_bytes(encode_header(0.0, 0) + encode_records(_clicks(3))[:-5])
+    _, rec = load_click_log(str(p))
+    assert len(rec) == 2
+
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(encode_header(0.0, 0))
+    assert len(load_click_log(str(empty))[1]) == 0
+    assert load_schedule(str(empty), 1.0) == []
+
+    bad = tmp_path / "bad.bin"
+    bad.write_bytes(b"{}\n")
+    assert not is_click_log(str(bad))
+    with pytest.raises(ClickLogError):
+        load_click_log(str(bad))
+
+
+def test_legacy_jsonl_conversion_uses_wall_clock(tmp_path):
+    src = tmp_path / "old.jsonl"
+    buf = io.StringIO()
+    for row in (
+        {"type": "meta", "t": 100.0, "out": "old.jsonl"},
+        {"type": "click", "t": 100.5, "x": 1, "y": 1, "button": "left", "pressed": True},
+        {"type": "click", "t": 101.0, "x": 2, "y": 2, "button": "left", "pressed": False},
+    ):
+        buf.write(json.dumps(row) + "\n")
+    src.write_text(buf.getvalue(), encoding="utf-8")
+    dst = tmp_path / "old.bin"
+    assert convert_jsonl(str(src), str(dst)) == 2
+    assert [off for off, _ in load_schedule(str(dst), 1.0)] == [0.0, 0.5]
@@ -0,0 +1,116 @@
+import json
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+
+from auto_click_core import is_double_click  # noqa: E402
+from auto_click_flowio import load_doc  # noqa: E402
+from tools.click_event_log import convert_jsonl  # noqa: E402
+from tools.clicks_to_flow import build_click_steps, convert, double_click_starts, load_clicks  # noqa: E402
+
+MS = 1_000_000
+
+
+def _press_release(t_ms, x, y, button="left", hold_ms=60):
+    return [
+        {"type": "click", "t": t_ms / 1000, "t_ns": t_ms * MS, "x": x, "y": y, "button": button, "pressed": True},
+        {"type": "click", "t": (t_ms + hold_ms) / 1000, "t_ns": (t_ms + hold_ms) * MS, "x": x, "y": y, "button": button, "pressed": False},
+    ]
+
+
+def _session():
+    rows = [{"type": "meta", "t": 0.0, "clock": "perf_counter_ns", "wall_anchor": 0.0, "perf_anchor_ns": 0}]
+    rows += _press_release(1000, 500, 300)  # single
+    rows += _press_release(3000, 600, 320) + _press_release(3200, 601, 321)  # double
+    rows += _press_release(5000, 700, 400, "right") + _press_release(5150, 700, 400)  # different buttons
+    rows += _press_release(8000, 10, 10) + _press_release(8100, 10, 10) + _press_release(8200, 10, 10)  # triple
+    rows += _press_release(9500, 30, 30) + _press_release(9600, 90, 30)  # too far apart
+    rows.append({"type": "state", "t": 10.0, "stopped": True})
+    return rows
+
+
+def test_double_click_detection_is_greedy_and_non_overlapping():
+    t = np.array([0, 100, 200, 300, 2000]) * MS
+    xy = np.zeros(5, dtype=np.int64)
+    b = np.zeros(5, dtype=np.uint8)
+    assert double_click_starts(t, xy, xy, b).tolist() == [True, False, True, False, False]
+    assert double_click_starts(t[:3], xy[:3], xy[:3], b[:3]).tolist() == [True, False, False]
+    assert double_click_starts(t[:1], xy[:1], xy[:1], b[:1]).tolist() == [False]
+    assert is_double_click(0.2, 1, -1)
+    assert not is_double_click(0.2, 1, -1, same_button=False)
+    assert not is_double_click(0.8, 0, 0)
+    assert not is_double_click(0.1, 10, 0)
+
+
+def test_steps_offsets_delays_and_clicks(tmp_path):
+    src = tmp_path / "clicks.jsonl"
+    src.write_text("\n".join(json.dumps(r) for r in _session()) + "\n", encoding="utf-8")
+    clicks = load_clicks(str(src))
+    steps = build_click_steps(clicks, (500, 300))
+    assert steps["clicks"].tolist() == [1, 2, 1, 1, 2, 1, 1, 1]
+    assert steps["offset_x"].tolist()[:3] == [0, 100, 200]
+    assert steps["offset_y"].tolist()[:3] == [0, 20, 100]
+    # measured from the last press of a step to the next step's press, rounded up to whole seconds
+    assert steps["delay_s"].tolist() == [2, 2, 1, 3, 1, 2, 1, 2]
+
+    # the binary log gives the same steps
+    dst = tmp_path / "clicks.bin"
+    convert_jsonl(str(src), str(dst))
+    steps_bin = build_click_steps(load_clicks(str(dst)), (500, 300))
+    for k in steps:
+        assert steps_bin[k].tolist() == steps[k].tolist()
+
+
+def test_convert_writes_flow_anchor_and_previews(tmp_path):
+    src = tmp_path / "clicks.jsonl"
+    src.write_text("\n".join(json.dumps(r) for r in _session()) + "\n", encoding="utf-8")
+
+    anchor = np.full((40, 60, 3), 200, dtype=np.uint8)
+    anchor_path = tmp_path / "anchor.png"
+    cv2.imwrite(str(anchor_path), anchor)
+
+    shots = tmp_path / "shots"
+    shots.mkdir()
+    for i, t_ms in enumerate((0, 4000)):
+        img = np.zeros((600, 800, 3), dtype=np.uint8)
+        img[:, :, i] = 255  # blue, then green
+        cv2.imwrite(str(shots / f"shot_{t_ms * MS}.png"), img)
+
+    project = tmp_path / "project"
+    f = convert(
+        str(src),
+        str(project),
+        "flow3",
+        str(anchor_path),
+        (490, 290),
+        anchor_rect=(470, 280),
+        shots_dir=str(shots),
+        preview_size=30,
+        log=lambda *_: None,
+    )
+    assert f["anchor"]["click_in_image"] == {"x": 20, "y": 10}
+    assert f["anchor"]["capture_rect"] == {"x": 470, "y": 280, "w": 60, "h": 40}
+    assert os.path.isfile(project / "anchors" / "flow3_anchor.png")
+
+    doc = load_doc(str(project / "flow.yaml"))
+    flow = [fl for fl in doc["flows"] if fl["id"] == "flow3"][0]
+    steps = flow["steps"]
+    assert len(steps) == 8 and flow["export"] is True
+    assert steps[1]["clicks"] == 2 and steps[1]["offset"] == {"x": 110, "y": 30}
+    assert steps[2]["button"] == "right"
+    assert [s["delay_s"] for s in steps] == [2, 2, 1, 3, 1, 2, 1, 2]
+    assert all(type(s["delay_s"]) is int for s in steps)
+    assert steps[0]["preview"] == os.path.join("previews", "flow3_step0001.png")
+
+    first = cv2.imread(str(project / steps[0]["preview"]))
+    late = cv2.imread(str(project / steps[3]["preview"]))
+    assert first.shape == (30, 30, 3)
+    assert first[2, 2].tolist() == [255, 0, 0]  # taken from the t=0 shot
+    assert late[2, 2].tolist() == [0, 255, 0]  # taken from the t=4 s shot
+
+    # --append keeps the existing steps and continues the preview numbering
+    f2 = convert(str(src), str(project), "flow3", str(anchor_path), (490, 290), append=True, log=lambda *_: None)
+    assert len(f2["steps"]) == 16 and f2["steps"][8]["preview"] is None
@@ -0,0 +1,112 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+pytest.importorskip("PySide6")
+pytest.importorskip("numpy")
+
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+import auto_click_editor as editor  # noqa: E402
+from auto_click_flowio import load_doc  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def ed(app, tmp_path):
+    w = editor.AutoClickEditor()
+    w._load_project_dir(str(tmp_path))
+    yield w
+    w._flush_saves()
+
+
+def test_superseded_save_generation_does_not_stick(ed):
+    ed._mark_dirty()
+    ed._save_gens.update({1: ed._edit_gen})  # queued, then replaced by gen 2 without a callback
+    ed._save_journal_seq.update({1: 3})
+    ed._mark_dirty()
+    ed._save_gens.update({2: ed._edit_gen})
+    ed._save_journal_seq.update({2: 5})
+    ed._on_save_state_gui(2, "saved", "flow.yaml")
+    assert ed._save_gens == {} and ed._save_journal_seq == {}
+    assert ed.save_state == "saved"
+
+
+def test_save_snapshot_reuses_unchanged_flows(ed):
+    for fid in ("flow1", "flow2"):
+        f = ed._ensure_flow(fid)
+        f["steps"] = [{"action": "wait", "seconds": 1}]
+    ed.current_flow_id = "flow1"
+    ed._save_now()
+    ed._flush_saves()
+    copied = ed._snapshots.copied
+    ed._get_flow("flow1")["steps"].append({"action": "wait", "seconds": 2})
+    ed._mark_dirty()
+    ed._save_now()
+    ed._flush_saves()
+    assert ed._snapshots.copied == copied + 1  # only flow1
+    doc = load_doc(ed.yaml_path)
+    assert [len(f["steps"]) for f in doc["flows"]] == [2, 1]
+
+
+def test_toggling_a_virtual_slot_persists_and_refreshes_rows(ed, app):
+    from PySide6.QtCore import Qt
+
+    ed._ensure_flow("flow1")["steps"] = [{"action": "wait", "seconds": 1}]
+    ed._refresh_flow_list()
+    row = next(r for r in range(ed.flows_table.rowCount()) if ed.flows_table.item(r, 0).text() == "flow3")
+    ed.flows_table.item(row, 2).setCheckState(Qt.CheckState.Checked)
+
+    assert [ed.flows_table.item(r, 0).text() for r in range(2)] == ["flow1", "flow3"]
+    assert ed.flows_table.item(1, 2).checkState() == Qt.CheckState.Checked
+    ed._flush_saves()
+    doc = load_doc(ed.yaml_path)
+    assert [f["id"] for f in doc["flows"]] == ["flow1", "flow3"] and doc["flows"][1]["export"] is True
+
+
+def test_flow_rename_move_delete_survive_a_crash(ed, monkeypatch, tmp_path):
+    for fid in ("flow1", "flow2", "flow3"):
+        ed._ensure_flow(fid)["steps"] = [{"action": "wait", "seconds": 1}]
+    ed._save_now()
+    ed._flush_saves()
+    ed._refresh_flow_list()
+
+    monkeypatch.setattr(editor.QInputDialog, "getText", lambda *a, **k: ("login", True))
+    monkeypatch.setattr(editor.QMessageBox, "question", lambda *a, **k: editor.QMessageBox.StandardButton.Yes)
+    ed.on_rename_flow(ed.flows_table.item(0, 0))
+    ed.flows_table.setCurrentCell(2, 0)
+    ed.on_flow_up()  # flow3 above flow2
+    ed.flows_table.setCurrentCell(2, 0)
+    ed.on_del_flow()  # flow2
+
+    # reopen before the debounced save ran: the journal carries the changes
+    w = editor.AutoClickEditor()
+    w._load_project_dir(str(tmp_path))
+    assert [f["id"] for f in w.flows] == ["login", "flow3"]
+    w._flush_saves()
+
+
+def test_failed_png_write_clears_its_references(ed, monkeypatch, tmp_path):
+    f = ed._ensure_flow("flow1")
+    f["anchor"] = {"image": os.path.join("anchors", "flow1_anchor.png"), "click_in_image": {"x": 1, "y": 1}}
+    f["steps"] = [{"action": "click", "preview": os.path.join("previews", "flow1_step0001.png")},
+                  {"action": "click", "preview": os.path.join("previews", "flow1_step0002.png")}]
+    warnings = []
+    monkeypatch.setattr(editor.QMessageBox, "warning", lambda *a, **k: warnings.append(a[2]))
+
+    ed._on_png_failed_gui(str(tmp_path / "previews" / "flow1_step0002.png"), "disk full")
+    assert [s["preview"] for s in f["steps"]] == [os.path.join("previews", "flow1_step0001.png"), None]
+    assert warnings == []
+
+    ed._on_png_failed_gui(str(tmp_path / "anchors" / "flow1_anchor.png"), "disk full")
+    assert f["anchor"] is None and len(warnings) == 1
+
+    ed._save_now()
+    ed._flush_saves()
+    saved = load_doc(ed.yaml_path)["flows"][0]
+    assert saved["anchor"] is None and saved["steps"][1]["preview"] is None
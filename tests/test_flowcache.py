@@ -0,0 +1,120 @@
+import os
+import shutil
+
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+
+import auto_click_flowcache as fc  # noqa: E402
+from auto_click_locate import AnchorLocator  # noqa: E402
+from auto_click_runtime import load_plan, plan_from_dict, plan_to_dict  # noqa: E402
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLE_PROJECT = os.path.join(REPO_ROOT, "EXAMPLE_PROJECT")
+
+
+@pytest.fixture
+def project(tmp_path):
+    proj = tmp_path / "project"
+    shutil.copytree(EXAMPLE_PROJECT, proj)
+    (proj / "anchors").mkdir(exist_ok=True)
+    img = np.zeros((40, 60, 3), dtype=np.uint8)
+    img[10:30, 15:45] = (0, 128, 255)
+    cv2.imwrite(str(proj / "anchors" / "flow1_anchor.png"), img)
+    return str(proj)
+
+
+def test_plan_dict_roundtrip():
+    plan = load_plan(EXAMPLE_PROJECT)
+    assert plan_from_dict(plan_to_dict(plan)) == plan
+
+
+def test_cold_miss_then_warm_hit(project, monkeypatch):
+    plan, templates = fc.load_plan_cached(project)
+    assert plan == load_plan(project)
+    anchor = plan.flows[0].anchor_path
+    assert templates[anchor].shape == (40, 60)  # grayscale: true
+    assert os.path.exists(os.path.join(project, fc.CACHE_DIR_NAME, "index.json"))
+
+    # the warm path must not parse YAML or decode PNGs
+    def boom(*a, **k):
+        raise AssertionError("cache miss")
+
+    monkeypatch.setattr(fc, "loads_doc", boom)
+    monkeypatch.setattr(fc, "decode_templates", boom)
+    plan2, templates2 = fc.load_plan_cached(project)
+    assert plan2 == plan
+    assert np.array_equal(templates2[anchor], templates[anchor])
+
+
+def test_yaml_change_invalidates(project):
+    plan, _ = fc.load_plan_cached(project)
+    yaml_path = os.path.join(project, "flow.yaml")
+    with open(yaml_path, "r", encoding="utf-8") as f:
+        text = f.read()
+    with open(yaml_path, "w", encoding="utf-8") as f:
+        f.write(text.replace("confidence: 0.9", "confidence: 0.8"))
+    plan2, _ = fc.load_plan_cached(project)
+    assert plan.confidence == 0.9
+    assert plan2.confidence == 0.8
+
+
+def test_anchor_change_invalidates(project):
+    plan, templates = fc.load_plan_cached(project)
+    anchor = plan.flows[0].anchor_path
+    cv2.imwrite(anchor, np.full((20, 20, 3), 200, dtype=np.uint8))
+    _plan2, templates2 = fc.load_plan_cached(project)
+    assert templates2[anchor].shape == (20, 20)
+
+
+def test_copied_project_uses_its_own_paths_and_anchor(project, tmp_path):
+    plan_a, _ = fc.load_plan_cached(project)  # warm A's cache
+    other = tmp_path / "copy"
+    shutil.copytree(project, other)  # .flowcache/ comes along
+    other = str(other)
+
+    # unchanged copy: warm hit, rebased onto the copy's folder
+    plan_b, templates_b = fc.load_plan_cached(other)
+    assert plan_b == load_plan(other)
+    assert plan_b.project_dir == os.path.abspath(other)
+    assert plan_b.flows[0].anchor_path.startswith(os.path.abspath(other))
+    assert set(templates_b) == {plan_b.flows[0].anchor_path}
+
+    # changing the copy's anchor is detected
+    cv2.imwrite(plan_b.flows[0].anchor_path, np.full((20, 20, 3), 200, dtype=np.uint8))
+    _plan, templates_b2 = fc.load_plan_cached(other)
+    assert templates_b2[plan_b.flows[0].anchor_path].shape == (20, 20)
+    # and A is untouched
+    _plan, templates_a = fc.load_plan_cached(project)
+    assert templates_a[plan_a.flows[0].anchor_path].shape == (40, 60)
+
+
+def test_corrupt_cache_falls_back(project):
+    fc.load_plan_cached(project)
+    cache_dir = os.path.join(project, fc.CACHE_DIR_NAME)
+    for name in os.listdir(cache_dir):
+        if name.endswith(".npz"):
+            with open(os.path.join(cache_dir, name), "wb") as f:
+                f.write(b"not a zip")
+    plan, templates = fc.load_plan_cached(project)
+    assert plan == load_plan(project)
+    assert plan.flows[0].anchor_path in templates
+
+
+def test_cache_keeps_newest_entries(project, monkeypatch):
+    monkeypatch.setattr(fc, "MAX_CACHE_ENTRIES", 2)
+    for fid in (["flow1"], None, ["flow1", "flow1"]):
+        fc.load_plan_cached(project, fid)
+    cache_dir = os.path.join(project, fc.CACHE_DIR_NAME)
+    npz = [n for n in os.listdir(cache_dir) if n.endswith(".npz")]
+    assert len(fc.FlowCache(project)._read_index()["entries"]) == 2
+    assert len(npz) == 2
+
+
+def test_put_template_seeds_locator(project):
+    plan, templates = fc.load_plan_cached(project)
+    anchor = plan.flows[0].anchor_path
+    loc = AnchorLocator(capture=object())
+    loc.put_template(anchor, True, templates[anchor])
+    assert loc.template(anchor, True) is templates[anchor]
@@ -0,0 +1,95 @@
+from auto_click_flowdoc import FlowDocument, is_placeholder_flow, new_flow, persisted_flows
+from auto_click_journal import apply_record
+
+
+def _doc(n=5):
+    return {"flows": [new_flow(f"flow{i}") for i in range(1, n + 1)]}
+
+
+def test_view_is_not_a_copy():
+    doc = _doc()
+    flows = FlowDocument(doc)
+    assert len(flows) == 5
+    assert flows[0] is doc["flows"][0]
+    assert flows.get("flow3") is doc["flows"][2]
+    assert "flow3" in flows and "nope" not in flows
+    assert flows.ids() == [f"flow{i}" for i in range(1, 6)]
+
+
+def test_ensure_appends_once():
+    doc = _doc(2)
+    flows = FlowDocument(doc)
+    f = flows.ensure("extra")
+    assert flows.ensure("extra") is f
+    assert doc["flows"][-1] is f
+    assert flows.index_of("extra") == 2
+    assert f["export"] is False
+
+
+def test_move_keeps_index_in_sync():
+    doc = _doc()
+    flows = FlowDocument(doc)
+    assert flows.move(1, 0)
+    assert flows.ids()[:2] == ["flow2", "flow1"]
+    assert flows.index_of("flow1") == 1 and flows.index_of("flow2") == 0
+    assert not flows.move(0, -1)
+    assert not flows.move(4, 5)
+    assert flows.move(4, 0)
+    assert flows.ids() == ["flow5", "flow2", "flow1", "flow3", "flow4"]
+    assert flows.index_of("flow4") == 4
+
+
+def test_remove_and_rename():
+    doc = _doc(3)
+    flows = FlowDocument(doc)
+    assert flows.remove("flow2")["id"] == "flow2"
+    assert flows.remove("flow2") is None
+    assert flows.index_of("flow3") == 1
+    assert flows.rename("flow3", "flow1") is None  # taken
+    f = flows.rename("flow3", "last")
+    assert f["id"] == f["title"] == "last"
+    assert flows.get("flow3") is None and flows.get("last") is f
+
+
+def test_duplicate_ids_first_wins():
+    doc = {"flows": [new_flow("a"), new_flow("a"), new_flow("b")]}
+    flows = FlowDocument(doc)
+    assert flows.get("a") is doc["flows"][0]
+    assert flows.index_of("b") == 2
+
+
+def test_external_mutation_is_detected():
+    doc = _doc(2)
+    flows = FlowDocument(doc)
+    assert flows.get("flow1") is not None
+    # journal replay appends/reorders doc["flows"] directly
+    apply_record(doc, {"seq": 1, "op": "set_flow", "flow": "new", "fields": {"export": True}})
+    assert flows.get("new") is doc["flows"][-1]
+    doc["flows"].reverse()
+    assert flows.index_of("flow1") == 2
+    doc["flows"] = [new_flow("x")]
+    assert flows.get("flow1") is None and flows.get("x") is doc["flows"][0]
+
+
+def test_missing_flows_key():
+    doc = {}
+    flows = FlowDocument(doc)
+    assert len(flows) == 0
+    flows.ensure("flow1")
+    assert doc["flows"][0]["id"] == "flow1"
+
+
+def test_virtual_slots_and_persisted_flows():
+    doc = {"flows": [new_flow("flow2"), new_flow("custom"), new_flow("flow9")]}
+    doc["flows"][0]["steps"] = [{"action": "click"}]
+    flows = FlowDocument(doc)
+    assert flows.virtual_ids(4) == ["flow1", "flow3", "flow4"]
+    assert flows.virtual_ids(0) == []
+    # flow9 is beyond the slot count, so it is a real (named) flow and is kept
+    assert [f["id"] for f in persisted_flows(flows, 4)] == ["flow2", "custom", "flow9"]
+    assert [f["id"] for f in persisted_flows(flows, 50)] == ["flow2", "custom"]
+    assert is_placeholder_flow(new_flow("flow1"), 50)
+    assert not is_placeholder_flow(dict(new_flow("flow1"), anchor={"image": "a.png"}), 50)
+    assert not is_placeholder_flow(new_flow("flow01"), 50)
+    assert not is_placeholder_flow(dict(new_flow("flow1"), show_desktop=True), 50)
+    assert not is_placeholder_flow(new_flow("flow1", export=True), 50)
@@ -0,0 +1,40 @@
+import os
+
+import yaml
+
+import auto_click_flowio as flowio
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _doc():
+    return {
+        "version": 0,
+        "meta": {"name": "自動點擊系統", "default_delay_s": 2},
+        "flows": [{"id": "flow1", "steps": [{"action": "type", "text": "中文 'quote' : colon", "interval_s": 0.02}]}],
+    }
+
+
+def test_dump_matches_pure_python_safe_dump():
+    doc = _doc()
+    assert flowio.dumps_doc(doc) == yaml.safe_dump(doc, allow_unicode=True, sort_keys=False)
+
+
+def test_roundtrip_and_atomic_save(tmp_path):
+    p = str(tmp_path / "flow.yaml")
+    flowio.save_doc(p, _doc())
+    assert flowio.load_doc(p) == _doc()
+    assert os.listdir(tmp_path) == ["flow.yaml"]
+
+
+def test_empty_document_is_empty_dict(tmp_path):
+    p = tmp_path / "flow.yaml"
+    p.write_text("", encoding="utf-8")
+    assert flowio.load_doc(str(p)) == {}
+    assert flowio.loads_doc("") == {}
+
+
+def test_example_project_loads_same_as_safe_load():
+    p = os.path.join(REPO_ROOT, "EXAMPLE_PROJECT", "flow.yaml")
+    with open(p, encoding="utf-8") as f:
+        assert flowio.load_doc(p) == yaml.safe_load(f)
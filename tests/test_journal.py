@@ -0,0 +1,103 @@
+import json
+
+from auto_click_journal import (
+    EditJournal,
+    doc_journal_seq,
+    journal_path_for,
+    load_with_journal,
+    read_journal,
+    replay,
+    set_doc_journal_seq,
+)
+
+
+def _doc():
+    return {"version": 0, "global": {}, "flows": [{"id": "flow1", "anchor": None, "steps": []}]}
+
+
+def _click(x):
+    return {"action": "click", "offset": {"x": x, "y": 0}, "delay_s": 2}
+
+
+def test_journal_path():
+    assert journal_path_for("/p/flow.yaml").replace("\\", "/") == "/p/flow.journal.jsonl"
+
+
+def test_replay_add_delete_move_edit_set_flow(tmp_path):
+    j = EditJournal(str(tmp_path / "flow.journal.jsonl"))
+    for i in range(3):
+        j.append("add", "flow1", index=i, step=_click(i))
+    j.append("move", "flow1", index=2, to=1)
+    j.append("delete", "flow1", index=0)
+    j.append("edit", "flow1", index=0, fields={"delay_s": 0})
+    j.append("set_flow", "flow2", fields={"anchor": {"image": "anchors/a.png"}})
+    j.close()
+
+    doc = _doc()
+    applied, last = replay(doc, read_journal(j.path))
+    assert (applied, last) == (7, 7)
+    steps = doc["flows"][0]["steps"]
+    assert [s["offset"]["x"] for s in steps] == [2, 1]
+    assert steps[0]["delay_s"] == 0
+    assert doc["flows"][1]["id"] == "flow2" and doc["flows"][1]["anchor"]["image"] == "anchors/a.png"
+
+
+def test_replay_flow_rename_move_delete(tmp_path):
+    j = EditJournal(str(tmp_path / "flow.journal.jsonl"))
+    j.append("add", "flow2", index=0, step=_click(2))
+    j.append("rename_flow", "flow1", to="login")
+    j.append("add", "login", index=0, step=_click(1))
+    j.append("move_flow", "flow2", to=0)
+    j.append("rename_flow", "flow3", to="login")  # name taken: ignored
+    j.append("rename_flow", "flow3", to="empty")  # unsaved slot: materialized under the new name
+    j.append("delete_flow", "empty")
+    j.append("delete_flow", "missing")
+    j.close()
+
+    doc = _doc()
+    applied, last = replay(doc, read_journal(j.path))
+    assert (applied, last) == (6, 8)
+    assert [(f["id"], [s["offset"]["x"] for s in f["steps"]]) for f in doc["flows"]] == [("flow2", [2]), ("login", [1])]
+    assert doc["flows"][1]["title"] == "login"
+
+
+def test_replay_skips_records_already_in_yaml_and_torn_lines(tmp_path):
+    p = tmp_path / "flow.journal.jsonl"
+    j = EditJournal(str(p))
+    j.append("add", "flow1", index=0, step=_click(1))
+    j.append("add", "flow1", index=1, step=_click(2))
+    j.close()
+    with open(p, "a", encoding="utf-8") as f:
+        f.write('{"seq": 3, "op": "add", "flow": "flo')  # crash mid-write
+
+    doc = _doc()
+    doc["flows"][0]["steps"].append(_click(1))
+    set_doc_journal_seq(doc, 1)  # seq 1 was saved into flow.yaml
+    applied, last = load_with_journal(doc, str(p))
+    assert (applied, last) == (1, 2)
+    assert [s["offset"]["x"] for s in doc["flows"][0]["steps"]] == [1, 2]
+
+
+def test_seq_continues_and_compact(tmp_path):
+    p = tmp_path / "flow.journal.jsonl"
+    j = EditJournal(str(p), start_seq=10)
+    assert j.append("add", "flow1", index=0, step=_click(1)) == 11
+    assert j.append("add", "flow1", index=1, step=_click(2)) == 12
+    assert j.compact(11) == 1
+    assert [r["seq"] for r in read_journal(str(p))] == [12]
+
+    # reopening continues after the highest seq on disk
+    j2 = EditJournal(str(p))
+    assert j2.append("delete", "flow1", index=0) == 13
+    assert j2.compact(13) == 0
+    assert not p.exists()
+
+
+def test_records_are_one_json_line_each(tmp_path):
+    p = tmp_path / "flow.journal.jsonl"
+    j = EditJournal(str(p))
+    j.append("edit", "流程", index=0, fields={"text": "中文"})
+    j.close()
+    lines = p.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1 and json.loads(lines[0])["fields"]["text"] == "中文"
+    assert doc_journal_seq({}) == 0
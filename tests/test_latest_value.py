@@ -0,0 +1,33 @@
+import threading
+
+from auto_click_core import LatestValue
+
+
+def test_latest_value_overwrites():
+    slot = LatestValue()
+    assert slot.get() is None
+    assert slot.snapshot() == (0, None)
+    slot.set((1, 2))
+    slot.set((3, 4))
+    assert slot.get() == (3, 4)
+    assert slot.version == 2
+
+
+def test_latest_value_reader_sees_consistent_pairs():
+    slot = LatestValue((0, 0))
+    n = 20000
+    seen = []
+
+    def writer():
+        for i in range(1, n + 1):
+            slot.set((i, -i))
+
+    t = threading.Thread(target=writer)
+    t.start()
+    while t.is_alive():
+        seen.append(slot.snapshot())
+    t.join()
+    assert slot.snapshot() == (n, (n, -n))
+    for version, (x, y) in seen:
+        assert x == -y
+        assert version == x
@@ -0,0 +1,42 @@
+import pytest
+
+from auto_click_core import LruCache
+
+
+def test_evicts_least_recently_used():
+    c = LruCache(maxsize=2)
+    c.put("a", 1)
+    c.put("b", 2)
+    assert c.get("a") == 1  # a is now most recent
+    c.put("c", 3)
+    assert "b" not in c
+    assert c.get("a") == 1 and c.get("c") == 3
+    assert len(c) == 2
+
+
+def test_get_or_create_and_stats():
+    c = LruCache(maxsize=4)
+    calls = []
+
+    def make():
+        calls.append(1)
+        return "v"
+
+    assert c.get_or_create("k", make) == "v"
+    assert c.get_or_create("k", make) == "v"
+    assert len(calls) == 1
+    assert c.hits == 1 and c.misses == 1
+
+    # None is not cached
+    assert c.get_or_create("none", lambda: None) is None
+    assert "none" not in c
+
+
+def test_discard_and_invalid_size():
+    c = LruCache(maxsize=4)
+    for k in [("p", 1), ("p", 2), ("q", 1)]:
+        c.put(k, k)
+    assert c.discard(lambda k: k[0] == "p") == 2
+    assert len(c) == 1
+    with pytest.raises(ValueError):
+        LruCache(maxsize=0)
@@ -0,0 +1,81 @@
+import os
+import threading
+import time
+
+import pytest
+
+from auto_click_pngwriter import PngWriterPool
+
+
+def test_flush_waits_for_all_writes():
+    written = []
+    lock = threading.Lock()
+
+    def slow_writer(path, img):
+        time.sleep(0.01)
+        with lock:
+            written.append(path)
+
+    pool = PngWriterPool(workers=3, max_queue=4, writer=slow_writer)
+    for i in range(20):
+        pool.submit(f"p{i}.png", None)
+    assert pool.flush(timeout=5.0)
+    assert sorted(written) == sorted(f"p{i}.png" for i in range(20))
+    assert pool.pending == 0
+    pool.close()
+
+
+def test_bounded_queue_applies_back_pressure():
+    gate = threading.Event()
+
+    def blocked_writer(path, img):
+        gate.wait(5.0)
+
+    pool = PngWriterPool(workers=1, max_queue=1, writer=blocked_writer)
+    pool.submit("a.png", None)  # taken by the worker
+    pool.submit("b.png", None)  # fills the queue
+    with pytest.raises(Exception):
+        pool.submit("c.png", None, timeout=0.05)
+    gate.set()
+    assert pool.flush(timeout=5.0)
+    pool.close()
+
+
+def test_failures_are_reported_and_counted():
+    errors = []
+    done = []
+
+    def writer(path, img):
+        if "bad" in path:
+            raise OSError("disk full")
+
+    pool = PngWriterPool(
+        workers=2,
+        writer=writer,
+        on_done=done.append,
+        on_error=lambda path, e: errors.append((path, str(e))),
+    )
+    pool.submit("ok.png", None)
+    pool.submit("bad.png", None)
+    assert pool.flush(timeout=5.0)
+    pool.close()
+    assert done == ["ok.png"]
+    assert errors == [("bad.png", "disk full")]
+    assert pool.failed == 1
+
+
+def test_real_png_write_roundtrip(tmp_path):
+    np = pytest.importorskip("numpy")
+    cv2 = pytest.importorskip("cv2")
+
+    img = np.zeros((12, 10, 3), dtype=np.uint8)
+    img[3, 4] = (0, 0, 255)
+    out = str(tmp_path / "預覽.png")  # non-ASCII path
+    pool = PngWriterPool(workers=1)
+    pool.submit(out, img)
+    pool.close()
+
+    data = np.fromfile(out, dtype=np.uint8)
+    back = cv2.imdecode(data, cv2.IMREAD_COLOR)
+    assert (back == img).all()
+    assert not [n for n in os.listdir(tmp_path) if ".tmp" in n]
@@ -0,0 +1,105 @@
+import os
+import time
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+pytest.importorskip("PySide6")
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+import auto_click_editor as editor  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def rec(app, tmp_path, monkeypatch):
+    grabs = []
+
+    def fake_capture(x, y, size=30, dx=0, dy=0, mode="region"):
+        grabs.append((x, y))
+        return np.zeros((size, size, 3), dtype=np.uint8)
+
+    monkeypatch.setattr(editor, "capture_preview_bgr", fake_capture)
+    w = editor.AutoClickEditor()
+    w._load_project_dir(str(tmp_path))
+    w.current_flow_id = "flow1"
+    f = w._ensure_flow("flow1")
+    f["anchor"] = {"image": "anchors/flow1_anchor.png", "click_in_image": {"x": 1, "y": 1}}
+    w.anchor_click_xy = {"x": 10, "y": 10}
+    w.recording = True
+    w.grabs = grabs
+    yield w
+    w.on_stop()
+    w._flush_saves()
+
+
+def _press(w, x, y, t, button="left"):
+    w._on_click_gui(x, y, button, True, t)
+    w._on_click_gui(x, y, button, False, t + 0.05)
+
+
+def _steps(w):
+    return w._get_flow("flow1")["steps"]
+
+
+def test_double_click_becomes_one_step_with_one_capture(rec):
+    _press(rec, 100, 50, 1.0)
+    assert _steps(rec) == []  # held back while a second press may follow
+    assert rec._pending_click_timer.isActive()
+    _press(rec, 102, 51, 1.2)
+    steps = _steps(rec)
+    assert [s["clicks"] for s in steps] == [2]
+    assert steps[0]["offset"] == {"x": 90, "y": 40}  # position of the first press
+    assert steps[0]["preview"] == os.path.join("previews", "flow1_step0001.png")
+    assert rec.grabs == [(100, 50)]
+    assert not rec._pending_click_timer.isActive()
+
+
+def test_separate_clicks_stay_single(rec):
+    _press(rec, 100, 50, 1.0)
+    _press(rec, 100, 50, 2.0)  # too late
+    _press(rec, 300, 50, 2.1)  # too far
+    _press(rec, 300, 50, 2.2, button="right")  # other button
+    rec._flush_pending_click()
+    steps = _steps(rec)
+    assert [s["clicks"] for s in steps] == [1, 1, 1, 1]
+    assert [s["button"] for s in steps] == ["left", "left", "left", "right"]
+    assert len(rec.grabs) == 4
+    assert [s["preview"][-8:] for s in steps] == ["0001.png", "0002.png", "0003.png", "0004.png"]
+
+
+def test_triple_click_is_double_plus_single(rec):
+    _press(rec, 100, 50, 1.0)
+    _press(rec, 100, 50, 1.1)
+    _press(rec, 100, 50, 1.2)
+    rec._flush_pending_click()
+    assert [s["clicks"] for s in _steps(rec)] == [2, 1]
+
+
+def test_pending_click_is_committed_on_timeout_and_stop(rec, app):
+    _press(rec, 100, 50, 1.0)
+    rec._pending_click_timer.start(1)
+    deadline = time.monotonic() + 2.0
+    while not _steps(rec) and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+    assert [s["clicks"] for s in _steps(rec)] == [1]
+
+    _press(rec, 200, 50, 5.0)
+    rec.on_stop()
+    assert len(_steps(rec)) == 2
+    _press(rec, 200, 50, 5.1)  # not recording any more
+    assert len(_steps(rec)) == 2 and rec._pending_click is None
+
+
+def test_pause_flushes_pending_click(rec):
+    _press(rec, 100, 50, 1.0)
+    rec._on_f9_gui()  # pause
+    assert rec.paused and len(_steps(rec)) == 1
@@ -0,0 +1,417 @@
+import os
+import sys
+import types
+
+import pytest
+import yaml
+
+from auto_click_locate import AnchorNotFoundError, LocateResult
+from auto_click_runtime import FlowPlanError, FlowRunner, compile_doc, export_flow_ids, load_plan
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXAMPLE_PROJECT = os.path.join(REPO_ROOT, "EXAMPLE_PROJECT")
+
+
+class FakeActions:
+    def __init__(self, size=(1920, 1080)):
+        self._size = size
+        self.calls = []
+
+    def size(self):
+        return self._size
+
+    def click(self, x, y, clicks, button):
+        self.calls.append(("click", x, y, clicks, button))
+
+    def write(self, text, interval_s):
+        self.calls.append(("write", text, interval_s))
+
+    def hotkey(self, *keys):
+        self.calls.append(("hotkey",) + tuple(keys))
+
+    def locate_on_screen(self, path, confidence, grayscale):
+        return None
+
+
+class FakeLocator:
+    def __init__(self, box):
+        self.box = box
+        self.calls = []
+
+    def wait(self, anchor_path, confidence, grayscale=True, hint=None, timeout_s=15.0, interval_s=0.5):
+        self.calls.append((anchor_path, confidence, grayscale, hint))
+        if self.box is None:
+            raise AnchorNotFoundError(anchor_path)
+        return self.box
+
+
+def _doc(steps, **glob):
+    return {
+        "version": 0,
+        "meta": {"default_delay_s": 2},
+        "global": dict({"confidence": 0.8, "grayscale": True}, **glob),
+        "flows": [
+            {
+                "id": "flow1",
+                "anchor": {
+                    "image": "anchors/flow1_anchor.png",
+                    "click_in_image": {"x": 10, "y": 5},
+                    "capture_rect": {"x": 100, "y": 100, "w": 40, "h": 20},
+                },
+                "steps": steps,
+            },
+            {"id": "flow2", "export": False, "anchor": {"image": "a.png", "click_in_image": {"x": 0, "y": 0}}},
+        ],
+    }
+
+
+def test_load_example_project():
+    plan = load_plan(EXAMPLE_PROJECT)
+    assert [f.id for f in plan.flows] == ["flow1"]
+    flow = plan.flows[0]
+    assert flow.anchor_path == os.path.join(EXAMPLE_PROJECT, "anchors", "flow1_anchor.png")
+    assert flow.hint == {"x": 100, "y": 100, "w": 300, "h": 120}
+    assert [s.op for s in flow.steps] == ["click", "type", "hotkey"]
+    assert flow.steps[0].dx == 300 and flow.steps[0].dy == 120
+    assert flow.steps[2].keys == ("ctrl", "s")
+
+
+def test_export_flow_ids_and_unknown_flow(tmp_path):
+    doc = _doc([])
+    assert export_flow_ids(doc) == ["flow1"]
+    assert [f.id for f in compile_doc(doc, str(tmp_path), ["flow2"]).flows] == ["flow2"]
+    with pytest.raises(FlowPlanError):
+        compile_doc(doc, str(tmp_path), ["nope"])
+
+
+def test_runner_clicks_relative_to_anchor(tmp_path):
+    steps = [
+        {"action": "click", "offset": {"x": 3, "y": -4}, "button": "right", "clicks": 2, "delay_s": 1},
+        {"action": "type", "text": "hi"},
+        {"action": "wait", "seconds": 0.25},
+        {"action": "scroll", "delay_s": 0.5},
+        {"action": "hotkey", "keys": ["ctrl", "s"], "delay_s": 0},
+    ]
+    plan = compile_doc(_doc(steps), str(tmp_path))
+    actions = FakeActions()
+    locator = FakeLocator(LocateResult(200, 300, 40, 20, 0.99))
+    sleeps = []
+    logs = []
+    FlowRunner(plan, actions=actions, locator=locator, sleep=sleeps.append, log=lambda *a: logs.append(a)).run()
+
+    assert actions.calls == [
+        ("click", 213, 301, 2, "right"),
+        ("write", "hi", 0.02),
+        ("hotkey", "ctrl", "s"),
+    ]
+    # click delay, type default delay, wait seconds, skipped step delay, hotkey delay
+    assert sleeps == [1.0, 2.0, 0.25, 0.5, 0.0]
+    assert locator.calls[0][1:] == (0.8, True, {"x": 100, "y": 100, "w": 40, "h": 20})
+
+
+def test_runner_checks_screen_size(tmp_path):
+    doc = _doc([], _editor={"capture_screen_w": 2560, "capture_screen_h": 1440})
+    plan = compile_doc(doc, str(tmp_path))
+    runner = FlowRunner(plan, actions=FakeActions((1920, 1080)), locator=FakeLocator(None), sleep=lambda s: None)
+    with pytest.raises(RuntimeError, match="Screen size mismatch"):
+        runner.run()
+
+
+def test_runner_anchor_not_found(tmp_path):
+    plan = compile_doc(_doc([{"action": "click", "offset": {"x": 0, "y": 0}}]), str(tmp_path))
+    actions = FakeActions()
+    runner = FlowRunner(plan, actions=actions, locator=FakeLocator(None), sleep=lambda s: None, log=lambda *a: None)
+    with pytest.raises(AnchorNotFoundError):
+        runner.run()
+    assert actions.calls == []
+
+
+def test_launcher_is_independent_of_flow_size(tmp_path):
+    from tools.generate_pyautogui_script import generate_launcher
+
+    doc = _doc([{"action": "click", "offset": {"x": i, "y": i}} for i in range(500)])
+    (tmp_path / "flow.yaml").write_text(yaml.safe_dump(doc, allow_unicode=True), encoding="utf-8")
+    out = tmp_path / "run.py"
+    generate_launcher(str(tmp_path), ["flow1"], str(out))
+    src = out.read_text(encoding="utf-8")
+    compile(src, str(out), "exec")
+    assert "run_project" in src
+    assert len(src) < 1000
+    assert repr(REPO_ROOT) not in src and repr(str(tmp_path)) not in src
+    assert _generated_repo_root(src, out, {}) == REPO_ROOT
+
+    # the launcher moves with a copied project
+    moved = tmp_path / "copy" / "run.py"
+    moved.parent.mkdir()
+    moved.write_text(src, encoding="utf-8")
+    line = next(ln for ln in src.splitlines() if ln.startswith("PROJECT_DIR = "))
+    ns = {"os": os, "__file__": str(moved)}
+    exec(line, ns)
+    assert ns["PROJECT_DIR"] == str(tmp_path / "copy")
+
+
+class FakeClock:
+    def __init__(self):
+        self.t = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.t
+
+    def sleep(self, s):
+        self.sleeps.append(s)
+        self.t += s
+
+
+def _frames(change_until_s, clock):
+    """grab() that changes every poll until `change_until_s`, then stays constant."""
+
+    def grab():
+        return round(clock.t, 3) if clock.t < change_until_s else "stable"
+
+    return grab
+
+
+def _delta(a, b):
+    return 0.0 if a == b else 1.0
+
+
+def test_wait_until_stable_returns_early():
+    from auto_click_runtime import wait_until_stable
+
+    clock = FakeClock()
+    ok = wait_until_stable(
+        _frames(0.2, clock), max_s=2.0, stable_s=0.3, min_s=0.1, poll_s=0.05,
+        delta=_delta, clock=clock, sleep=clock.sleep,
+    )
+    assert ok
+    assert 0.5 <= clock.t < 0.6
+
+
+def test_wait_until_stable_respects_upper_bound_and_min():
+    from auto_click_runtime import wait_until_stable
+
+    clock = FakeClock()
+    assert not wait_until_stable(
+        _frames(99, clock), max_s=1.0, stable_s=0.3, poll_s=0.05, delta=_delta, clock=clock, sleep=clock.sleep
+    )
+    assert clock.t == pytest.approx(1.0)
+
+    clock = FakeClock()
+    assert wait_until_stable(
+        lambda: "same", max_s=2.0, stable_s=0.1, min_s=0.4, poll_s=0.05, delta=_delta, clock=clock, sleep=clock.sleep
+    )
+    assert clock.t == pytest.approx(0.4, abs=0.06)
+
+
+class RecordingCapture:
+    def __init__(self):
+        self.rects = []
+
+    def virtual_rect(self):
+        return (-100, 0, 3000, 1000)
+
+    def grab(self, rect):
+        self.rects.append(tuple(rect))
+        np = pytest.importorskip("numpy")
+        return np.zeros((4, 4, 3), dtype=np.uint8)
+
+
+def test_runner_stable_mode_watches_next_target(tmp_path):
+    pytest.importorskip("numpy")
+    steps = [
+        {"action": "click", "offset": {"x": 0, "y": 0}, "delay_s": 2},
+        {"action": "click", "offset": {"x": 50, "y": 0}, "delay_s": 2},
+        {"action": "type", "text": "x", "delay_s": 2},
+    ]
+    doc = _doc(steps, wait={"mode": "stable", "stable_ms": 100, "min_ms": 0, "region": 20, "poll_ms": 50})
+    doc["flows"][1]["anchor"]["capture_rect"] = {"x": 7, "y": 8, "w": 30, "h": 40}
+    plan = compile_doc(doc, str(tmp_path), ["flow1", "flow2"])
+    assert plan.wait.mode == "stable" and plan.wait.region == 20
+
+    clock = FakeClock()
+    cap = RecordingCapture()
+    runner = FlowRunner(
+        plan, actions=FakeActions(), locator=FakeLocator(LocateResult(200, 300, 40, 20, 0.99)),
+        sleep=clock.sleep, log=lambda *a: None, capture=cap, clock=clock,
+    )
+    runner.run_flow(plan.flows[0], plan.flows[1])
+
+    # anchor_click_xy = (210, 305)
+    # after click 1: next click target; after click 2 (followed by type): the last click
+    assert set(cap.rects) == {(250, 295, 20, 20), (-93, 8, 30, 40)}
+    assert cap.rects[-1] == (-93, 8, 30, 40)  # after the last step: next flow's anchor rect
+    assert clock.t < 1.0  # 3 steps with delay_s=2 finished well under 6 s
+
+
+def test_compile_wait_rejects_unknown_mode(tmp_path):
+    with pytest.raises(FlowPlanError):
+        compile_doc(_doc([], wait={"mode": "magic"}), str(tmp_path))
+
+
+class PrefetchLocator(FakeLocator):
+    def __init__(self, box, still_there=True):
+        super().__init__(box)
+        self.still_there = still_there
+        self.located = []
+        self.verified = []
+        self.released = 0
+
+    def release_thread(self):
+        self.released += 1
+
+    def locate(self, anchor_path, confidence, grayscale=True, hint=None):
+        self.located.append(anchor_path)
+        return self.box
+
+    def verify(self, anchor_path, confidence, box, grayscale=True, slack=2):
+        self.verified.append(anchor_path)
+        return box if self.still_there else None
+
+
+def _two_flow_plan(tmp_path, **flow2):
+    doc = _doc([{"action": "click", "offset": {"x": 1, "y": 1}, "delay_s": 1}])
+    doc["flows"][1].update(flow2)
+    return compile_doc(doc, str(tmp_path), ["flow1", "flow2"])
+
+
+def test_runner_prefetches_next_anchor(tmp_path):
+    plan = _two_flow_plan(tmp_path)
+    loc = PrefetchLocator(LocateResult(200, 300, 40, 20, 0.99))
+    FlowRunner(plan, actions=FakeActions(), locator=loc, sleep=lambda s: None, log=lambda *a: None).run()
+
+    flow2 = plan.flows[1].anchor_path
+    assert [c[0] for c in loc.calls] == [plan.flows[0].anchor_path]  # only flow1 used a blocking wait
+    assert loc.located == [flow2]
+    assert loc.verified == [flow2]
+    assert loc.released == 1  # the prefetch thread closed its capture backend
+
+
+def test_runner_prefetch_falls_back_when_stale(tmp_path):
+    plan = _two_flow_plan(tmp_path)
+    loc = PrefetchLocator(LocateResult(200, 300, 40, 20, 0.99), still_there=False)
+    FlowRunner(plan, actions=FakeActions(), locator=loc, sleep=lambda s: None, log=lambda *a: None).run()
+    assert [c[0] for c in loc.calls] == [f.anchor_path for f in plan.flows]
+
+
+def test_runner_no_prefetch_before_show_desktop(tmp_path):
+    plan = _two_flow_plan(tmp_path, show_desktop=True)
+    loc = PrefetchLocator(LocateResult(200, 300, 40, 20, 0.99))
+    FlowRunner(plan, actions=FakeActions(), locator=loc, sleep=lambda s: None, log=lambda *a: None).run()
+    assert loc.located == []
+    assert len(loc.calls) == 2
+
+
+class PasteActions(FakeActions):
+    def paste(self, text):
+        self.calls.append(("paste", text))
+
+
+def test_type_paste_mode(tmp_path):
+    steps = [
+        {"action": "type", "text": "你好，世界", "mode": "paste", "delay_s": 0},
+        {"action": "type", "text": "abc", "delay_s": 0},
+    ]
+    plan = compile_doc(_doc(steps), str(tmp_path))
+    assert [s.mode for s in plan.flows[0].steps] == ["paste", "write"]
+    locator = FakeLocator(LocateResult(0, 0, 40, 20, 0.99))
+
+    actions = PasteActions()
+    FlowRunner(plan, actions=actions, locator=locator, sleep=lambda s: None, log=lambda *a: None).run()
+    assert actions.calls == [("paste", "你好，世界"), ("write", "abc", 0.02)]
+
+    # backends without paste() fall back to write()
+    actions = FakeActions()
+    FlowRunner(plan, actions=actions, locator=locator, sleep=lambda s: None, log=lambda *a: None).run()
+    assert actions.calls[0] == ("write", "你好，世界", 0.02)
+
+    with pytest.raises(FlowPlanError):
+        compile_doc(_doc([{"action": "type", "text": "x", "mode": "clipboard"}]), str(tmp_path))
+
+
+def test_generated_script_pastes(tmp_path):
+    from tools.generate_pyautogui_script import generate, generate_multiple
+
+    doc = _doc([{"action": "type", "text": "中文", "mode": "paste"}, {"action": "type", "text": "en"}])
+    (tmp_path / "flow.yaml").write_text(yaml.safe_dump(doc, allow_unicode=True), encoding="utf-8")
+    for out, gen in ((tmp_path / "one.py", lambda o: generate(str(tmp_path), "flow1", o)),
+                     (tmp_path / "multi.py", lambda o: generate_multiple(str(tmp_path), ["flow1"], o))):
+        gen(str(out))
+        src = out.read_text(encoding="utf-8")
+        compile(src, str(out), "exec")
+        assert "paste_text('中文', hotkey=pyautogui.hotkey)" in src
+        assert "pyautogui.write('en', interval=0.02)" in src
+
+
+def _generated_repo_root(src, script_path, env):
+    line = next(ln for ln in src.splitlines() if ln.startswith("REPO_ROOT = "))
+    ns = {"os": types.SimpleNamespace(environ=env, path=os.path), "__file__": str(script_path)}
+    exec(line, ns)
+    return ns["REPO_ROOT"]
+
+
+def test_generated_script_finds_repo_relative_to_itself(tmp_path):
+    from tools.generate_pyautogui_script import REPO_ROOT_ENV, generate
+
+    doc = _doc([{"action": "click", "offset": {"x": 1, "y": 1}}])
+    (tmp_path / "flow.yaml").write_text(yaml.safe_dump(doc, allow_unicode=True), encoding="utf-8")
+    out = tmp_path / "run_flow.py"
+    generate(str(tmp_path), "flow1", str(out))
+    src = out.read_text(encoding="utf-8")
+    compile(src, str(out), "exec")
+    assert repr(REPO_ROOT) not in src
+    assert "except AnchorNotFoundError" not in src
+    assert _generated_repo_root(src, out, {}) == REPO_ROOT
+    assert _generated_repo_root(src, out, {REPO_ROOT_ENV: "/opt/acs"}) == "/opt/acs"
+
+
+def test_paste_falls_back_to_write_without_pyperclip(tmp_path, monkeypatch):
+    import auto_click_clipboard
+    from auto_click_runtime import PyautoguiActions
+    from tools.generate_pyautogui_script import generate
+
+    monkeypatch.setattr(auto_click_clipboard, "pyperclip", None)
+    typed = []
+    fake_pg = types.SimpleNamespace(write=lambda text, interval: typed.append(text), hotkey=lambda *k: typed.append(k))
+    monkeypatch.setitem(sys.modules, "pyautogui", fake_pg)
+
+    actions = PyautoguiActions()
+    assert actions.paste is None
+    plan = compile_doc(_doc([{"action": "type", "text": "中文", "mode": "paste", "delay_s": 0}]), str(tmp_path))
+    FlowRunner(plan, actions=actions, locator=FakeLocator(LocateResult(0, 0, 40, 20, 0.99)),
+               sleep=lambda s: None, log=lambda *a: None).run()
+    assert typed == ["中文"]
+
+    # generated scripts: the clipboard import block leaves paste_text = None
+    (tmp_path / "flow.yaml").write_text(yaml.safe_dump(_doc([]), allow_unicode=True), encoding="utf-8")
+    out = tmp_path / "run_flow.py"
+    generate(str(tmp_path), "flow1", str(out))
+    lines = out.read_text(encoding="utf-8").splitlines()
+    start = lines.index("    from auto_click_clipboard import have_clipboard, paste_text  # type: steps with mode: paste") - 1
+    end = lines.index("    paste_text = None", start) + 1
+    ns = {}
+    exec("\n".join(lines[start:end]), ns)
+    assert ns["paste_text"] is None
+
+
+def test_paste_text_restores_clipboard():
+    from auto_click_clipboard import paste_keys, paste_text
+
+    board = ["old"]
+    events = []
+
+    def copy(t):
+        board[0] = t
+        events.append(("copy", t))
+
+    def hotkey(*keys):
+        events.append(("hotkey", keys, board[0]))
+
+    paste_text("貼上", hotkey=hotkey, copy=copy, paste=lambda: board[0], sleep=lambda s: events.append(("sleep", s)))
+    assert events[0] == ("copy", "貼上")
+    assert events[1] == ("hotkey", tuple(paste_keys()), "貼上")
+    assert events[-1] == ("copy", "old") and board[0] == "old"
+
+    events.clear()
+    paste_text("", hotkey=hotkey, copy=copy, paste=lambda: board[0])
+    assert events == []
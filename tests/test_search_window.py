@@ -0,0 +1,17 @@
+from auto_click_core import search_window_rect
+
+
+def test_window_inside_screen():
+    assert search_window_rect(100, 100, 50, 20, 10, 1000, 800) == (90, 90, 70, 40)
+
+
+def test_window_clamped_at_edges():
+    x, y, w, h = search_window_rect(5, 790, 50, 20, 30, 1000, 800)
+    assert (x, y) == (0, 760)
+    assert x + w <= 1000 and y + h == 800
+
+
+def test_rect_outside_screen_still_non_empty():
+    x, y, w, h = search_window_rect(5000, 5000, 10, 10, 0, 1000, 800)
+    assert w >= 1 and h >= 1
+    assert 0 <= x < 1000 and 0 <= y < 800
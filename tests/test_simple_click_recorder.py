@@ -0,0 +1,95 @@
+import io
+import json
+import threading
+import time
+
+from tools.simple_click_recorder import BatchedEventWriter, EventClock, SyncEventWriter
+from tools.simple_click_replayer import build_schedule
+
+
+class SlowFile(io.StringIO):
+    """A file whose flush() is slow, like a disk under load."""
+
+    def __init__(self, delay=0.05):
+        super().__init__()
+        self.delay = delay
+        self.flush_calls = 0
+        self.write_calls = 0
+
+    def write(self, s):
+        self.write_calls += 1
+        return super().write(s)
+
+    def flush(self):
+        self.flush_calls += 1
+        time.sleep(self.delay)
+
+
+def _lines(f):
+    return [json.loads(line) for line in f.getvalue().splitlines()]
+
+
+def test_put_never_waits_for_the_disk():
+    f = SlowFile(delay=0.2)
+    w = BatchedEventWriter(f, flush_interval_s=0.05)
+    t0 = time.perf_counter()
+    for i in range(500):
+        w.put({"type": "click", "i": i})
+    assert time.perf_counter() - t0 < 0.1
+    w.close()
+    assert [o["i"] for o in _lines(f)] == list(range(500))
+    assert w.written == 500 and w.error is None
+    # batched: far fewer writes and flushes than events
+    assert f.write_calls < 50
+    assert 1 <= f.flush_calls < 10
+
+
+def test_flushes_on_timer_without_close():
+    f = SlowFile(delay=0.0)
+    w = BatchedEventWriter(f, flush_interval_s=0.02)
+    w.put({"a": 1})
+    deadline = time.monotonic() + 2.0
+    while f.flush_calls == 0 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert f.flush_calls >= 1
+    assert _lines(f) == [{"a": 1}]
+    w.close()
+
+
+def test_put_from_many_threads_keeps_every_event():
+    f = SlowFile(delay=0.0)
+    w = BatchedEventWriter(f, batch_max=7)
+    threads = [threading.Thread(target=lambda k=k: [w.put({"k": k, "i": i}) for i in range(100)]) for k in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    w.close()
+    got = _lines(f)
+    assert len(got) == 400
+    for k in range(4):
+        assert [o["i"] for o in got if o["k"] == k] == list(range(100))
+
+
+def test_sync_writer_flushes_each_event():
+    f = SlowFile(delay=0.0)
+    w = SyncEventWriter(f)
+    w.put({"a": 1})
+    w.put({"a": 2})
+    assert f.flush_calls == 2
+    w.close()
+    assert _lines(f) == [{"a": 1}, {"a": 2}]
+
+
+def test_stamps_are_anchored_and_replayable():
+    clock = EventClock()
+    meta = clock.meta()
+    a = clock.stamp()
+    time.sleep(0.01)
+    b = clock.stamp()
+    assert b["t_ns"] > a["t_ns"] > meta["perf_anchor_ns"]
+    assert abs(a["t"] - (meta["wall_anchor"] + (a["t_ns"] - meta["perf_anchor_ns"]) / 1e9)) < 1e-6
+    evs = [{"t": 0.0, "t_ns": a["t_ns"]}, {"t": 0.0, "t_ns": a["t_ns"] + 250_000_000}]
+    assert [off for off, _ in build_schedule(evs, 1.0)] == [0.0, 0.25]
+    # mixed / legacy files fall back to wall-clock t
+    assert [off for off, _ in build_schedule([{"t": 1.0}, {"t": 1.5, "t_ns": 5}], 1.0)] == [0.0, 0.5]
@@ -0,0 +1,71 @@
+import json
+
+from tools.simple_click_replayer import ReplayScheduler, build_schedule, load_click_events, timing_summary
+
+
+class FakeClock:
+    """Virtual time: sleep() advances it (plus a fixed oversleep), dispatch costs `latency`."""
+
+    def __init__(self, oversleep=0.0):
+        self.now = 100.0
+        self.oversleep = oversleep
+        self.sleeps = []
+        self.reads = 0
+
+    def __call__(self):
+        self.reads += 1
+        self.now += 2e-5  # every clock read costs a little, so spinning terminates
+        return self.now
+
+    def sleep(self, s):
+        self.sleeps.append(s)
+        self.now += s + self.oversleep
+
+
+def test_schedule_is_relative_and_scaled(tmp_path):
+    p = tmp_path / "clicks.jsonl"
+    rows = [
+        {"type": "state", "state": "recording"},
+        {"type": "click", "t": 10.0, "x": 1, "y": 2, "button": "Button.left", "pressed": True},
+        {"type": "click", "t": 10.5, "x": 1, "y": 2, "button": "Button.left", "pressed": False},
+        {"type": "click", "t": 12.0, "x": 3, "y": 4, "button": "Button.right", "pressed": True},
+    ]
+    p.write_text("\n".join(json.dumps(r) for r in rows) + "\n", encoding="utf-8")
+    assert len(load_click_events(str(p))) == 3
+    events = load_click_events(str(p), only_press=True)
+    assert [off for off, _ in build_schedule(events, 2.0)] == [0.0, 1.0]
+
+
+def test_latency_is_compensated_and_nothing_drifts():
+    clock = FakeClock(oversleep=0.002)
+    sched = ReplayScheduler(clock=clock, sleep=clock.sleep)
+
+    def dispatch(_ev):
+        clock.now += 0.010  # a slow pyautogui call
+
+    schedule = [(i * 0.05, i) for i in range(20)]
+    timings = sched.run(schedule, dispatch)
+    assert [t.index for t in timings] == list(range(20))
+    # first event pays the unknown latency; afterwards clicks land on target
+    assert 9.0 < timings[0].error_ms < 11.0
+    assert all(abs(t.error_ms) < 0.1 for t in timings[2:])
+    assert abs(sched.latency_s - 0.010) < 1e-4
+    # the oversleep estimate keeps coarse sleeps from overshooting the spin window
+    assert abs(sched.oversleep_s - 0.002) < 1e-4
+    # mostly sleeping: only a handful of clock reads per event
+    assert clock.reads < 20 * 60
+
+
+def test_behind_schedule_dispatches_immediately():
+    clock = FakeClock()
+    sched = ReplayScheduler(clock=clock, sleep=clock.sleep, compensate=False)
+
+    def dispatch(_ev):
+        clock.now += 0.5
+
+    timings = sched.run([(0.0, "a"), (0.1, "b"), (0.2, "c")], dispatch)
+    assert timings[1].start_s < 0.5 + 0.001  # no extra wait once late
+    assert timings[2].error_ms > 0
+    s = timing_summary(timings)
+    assert s["count"] == 3 and s["max_abs_ms"] == max(abs(t.error_ms) for t in timings)
+    assert timing_summary([])["count"] == 0
@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+pytest.importorskip("PySide6")
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QApplication
+
+import auto_click_editor as editor
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def _flow(n, anchor=True):
+    steps = [{"action": "click", "offset": {"x": i, "y": -i}, "delay_s": 2, "preview": f"previews/s{i}.png"} for i in range(n)]
+    return {"id": "flow1", "anchor": {"image": "anchors/a.png"} if anchor else None, "steps": steps}
+
+
+def test_rows_and_cells(app, tmp_path):
+    m = editor.StepsTableModel()
+    f = _flow(3)
+    m.set_source(str(tmp_path), f)
+    assert m.rowCount() == 5
+    assert [m.data(m.index(r, 0)) for r in range(5)] == ["A1", "A2", "1", "2", "3"]
+    assert m.data(m.index(3, 4)) == "1" and m.data(m.index(3, 5)) == "-1"
+    assert m.data(m.index(0, 10)) == "anchors/a.png"
+
+    m.set_source(str(tmp_path), _flow(2, anchor=False))
+    assert m.rowCount() == 2 and m.data(m.index(0, 0)) == "1"
+
+
+def test_append_remove_move_edit(app, tmp_path):
+    m = editor.StepsTableModel()
+    f = _flow(2)
+    m.set_source(str(tmp_path), f)
+    inserted = []
+    m.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+
+    m.append_step({"action": "type", "text": "x", "delay_s": 2})
+    assert inserted == [(4, 4)] and len(f["steps"]) == 3
+
+    assert m.move_step(2, 1)
+    assert [st.get("action") for st in f["steps"]] == ["click", "type", "click"]
+
+    assert m.flags(m.index(3, 12)) & Qt.ItemFlag.ItemIsEditable
+    assert not m.flags(m.index(2, 12)) & Qt.ItemFlag.ItemIsEditable
+    assert m.setData(m.index(3, 12), "hello") and f["steps"][1]["text"] == "hello"
+    assert m.setData(m.index(2, 8), "-3") and f["steps"][0]["delay_s"] == 0
+    assert not m.setData(m.index(0, 8), "1")  # anchor row
+
+    m.remove_step(0)
+    assert m.rowCount() == 4 and f["steps"][0]["action"] == "type"
+
+
+def test_thumbnail_cache_keys_on_mtime(app, tmp_path):
+    from PySide6.QtGui import QImage
+
+    p = tmp_path / "t.png"
+    img = QImage(10, 10, QImage.Format.Format_RGB32)
+    img.fill(0)
+    assert img.save(str(p))
+
+    cache = editor.ThumbnailCache(maxsize=8)
+    a = cache.icon(str(p), 40)
+    assert a is not None
+    assert cache.icon(str(p), 40) is a
+    assert cache.icon(str(p), 60) is not a  # other display size
+
+    st = os.stat(p)
+    os.utime(p, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+    assert cache.icon(str(p), 40) is not a
+    assert cache.icon(str(tmp_path / "missing.png"), 40) is None
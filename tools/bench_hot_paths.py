@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Benchmark the hot paths of auto-click-system (no display required).
+
+用合成的 numpy 畫面 / anchor 圖量測：
+- `preview_crop_plan`（純計算）
+- preview pipeline：crop + 補邊 + 十字 + PNG encode
+- anchor locate：1080p / 1440p / 4K，full 與 pyramid 模式，以及有 capture_rect hint 的搜尋窗
+- 大型專案 flow.yaml 的載入 / 存檔（純 Python pyyaml 與 auto_click_flowio / libyaml）
+- 匯出：generate_multiple（展開成程式碼）、generate_launcher、runtime 編譯（load_plan）
+
+結果可寫成 JSON（`--out`），下次用 `--baseline` 比較；任何一項的中位數
+比 baseline 慢超過 `--tolerance` 時 exit code = 1，方便在 CI / 版本之間抓退步。
+
+Usage:
+  py tools/bench_hot_paths.py
+  py tools/bench_hot_paths.py --out bench.json
+  py tools/bench_hot_paths.py --baseline bench.json --tolerance 0.25
+  py tools/bench_hot_paths.py --only locate --repeat 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import cv2
+import yaml
+
+# Ensure repo root is on sys.path (tools/ is one level below)
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from auto_click_capture import finish_preview  # noqa: E402
+from auto_click_core import preview_crop_plan  # noqa: E402
+from auto_click_flowio import HAVE_LIBYAML, load_doc, save_doc  # noqa: E402
+from auto_click_locate import AnchorLocator, to_gray  # noqa: E402
+from auto_click_pngwriter import encode_png  # noqa: E402
+
+RESOLUTIONS = {
+    "1080p": (1920, 1080),
+    "1440p": (2560, 1440),
+    "4k": (3840, 2160),
+}
+
+ANCHOR_W, ANCHOR_H = 160, 60
+PREVIEW_SIZE = 120  # auto_click_editor.PREVIEW_CROP_SIZE (editor imports Qt, so not imported here)
+BIG_PROJECT_FLOWS = 50
+BIG_PROJECT_STEPS = 200
+
+
+# ----------------------- synthetic data -----------------------
+
+
+def synthetic_screen(w: int, h: int, seed: int = 0):
+    """Blocky random BGR screen (smooth enough for template matching to be unique)."""
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 256, size=(max(1, h // 8), max(1, w // 8), 3), dtype=np.uint8)
+    return cv2.resize(small, (w, h), interpolation=cv2.INTER_LINEAR)
+
+
+def big_project_doc(flows: int = BIG_PROJECT_FLOWS, steps: int = BIG_PROJECT_STEPS) -> Dict[str, Any]:
+    out = []
+    for i in range(1, flows + 1):
+        st: List[Dict[str, Any]] = []
+        for j in range(1, steps + 1):
+            if j % 10 == 0:
+                st.append({"action": "type", "text": f"文字 {i}-{j}", "interval_s": 0.02, "delay_s": 1})
+            else:
+                st.append(
+                    {
+                        "action": "click",
+                        "offset": {"x": (j * 7) % 500 - 250, "y": (j * 13) % 300 - 150},
+                        "button": "left",
+                        "clicks": 1,
+                        "delay_s": 1,
+                        "preview": f"previews/flow{i}_step{j:04d}.png",
+                        "purpose": f"步驟 {j}",
+                    }
+                )
+        out.append(
+            {
+                "id": f"flow{i}",
+                "title": f"流程 {i}",
+                "export": True,
+                "anchor": {
+                    "image": f"anchors/flow{i}_anchor.png",
+                    "click_in_image": {"x": 20, "y": 10},
+                    "capture_rect": {"x": 100, "y": 100, "w": ANCHOR_W, "h": ANCHOR_H},
+                },
+                "steps": st,
+            }
+        )
+    return {
+        "version": 0,
+        "meta": {"name": "bench", "created_utc": "2026-01-01T00:00:00Z", "default_delay_s": 2},
+        "global": {"confidence": 0.9, "grayscale": True},
+        "flows": out,
+    }
+
+
+# ----------------------- timing -----------------------
+
+
+def time_case(fn: Callable[[], Any], repeat: int, number: int = 1, warmup: int = 1) -> Dict[str, float]:
+    """Run fn `number` times per sample, `repeat` samples. Times are per call (ms)."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - t0) * 1000.0 / number)
+    return {
+        "median_ms": statistics.median(samples),
+        "min_ms": min(samples),
+        "mean_ms": statistics.fmean(samples),
+        "n": len(samples) * number,
+    }
+
+
+# ----------------------- cases -----------------------
+
+
+def cases_crop_plan() -> List[Tuple[str, Callable[[], Any], int]]:
+    rng = np.random.default_rng(1)
+    pts = [(int(x), int(y)) for x, y in rng.integers(-50, 2000, size=(1000, 2))]
+
+    def run():
+        for x, y in pts:
+            preview_crop_plan(x, y, 1920, 1080, PREVIEW_SIZE, dx=2, dy=-3)
+
+    return [("crop_plan.x1000", run, 5)]
+
+
+def cases_preview() -> List[Tuple[str, Callable[[], Any], int]]:
+    out = []
+    for name, (w, h) in RESOLUTIONS.items():
+        screen = synthetic_screen(w, h, seed=2)
+        for size in (PREVIEW_SIZE, 200):
+
+            def run(screen=screen, w=w, h=h, size=size):
+                plan = preview_crop_plan(w // 2, h // 2, w, h, size)
+                crop = screen[plan.top : plan.bottom, plan.left : plan.right]
+                encode_png(finish_preview(crop, plan))
+
+            out.append((f"preview.{name}.{size}px", run, 20))
+
+        def run_edge(screen=screen, w=w, h=h):
+            plan = preview_crop_plan(3, h - 2, w, h, 200)  # padded on two sides
+            crop = screen[plan.top : plan.bottom, plan.left : plan.right]
+            encode_png(finish_preview(crop, plan))
+
+        out.append((f"preview.{name}.200px_edge", run_edge, 20))
+    return out
+
+
+def cases_locate() -> List[Tuple[str, Callable[[], Any], int]]:
+    out = []
+    for name, (w, h) in RESOLUTIONS.items():
+        screen = synthetic_screen(w, h, seed=3)
+        ax, ay = (w * 2) // 3, (h * 3) // 5
+        templ = to_gray(screen[ay : ay + ANCHOR_H, ax : ax + ANCHOR_W])
+        for mode in ("full", "pyramid"):
+            loc = AnchorLocator(capture=object(), mode=mode)
+
+            def run(loc=loc, screen=screen, templ=templ, ax=ax, ay=ay):
+                r = loc.locate_in(screen, templ, 0.9)
+                assert r is not None and (r.left, r.top) == (ax, ay), r
+
+            out.append((f"locate.{name}.{mode}", run, 1))
+
+        # hint window (capture_rect ± DEFAULT_HINT_MARGIN)
+        loc = AnchorLocator(capture=object(), mode="auto")
+        m = loc.hint_margin
+        win = screen[ay - m : ay + ANCHOR_H + m, ax - m : ax + ANCHOR_W + m]
+
+        def run_hint(loc=loc, win=win, templ=templ):
+            assert loc.locate_in(win, templ, 0.9) is not None
+
+        out.append((f"locate.{name}.hint_window", run_hint, 5))
+    return out
+
+
+def cases_yaml(tmpdir: str) -> List[Tuple[str, Callable[[], Any], int]]:
+    doc = big_project_doc()
+    path = os.path.join(tmpdir, "flow.yaml")
+
+    # pure-Python pyyaml (reference)
+    def save():
+        with open(path, "w", encoding="utf-8") as f:
+            yaml.safe_dump(doc, f, allow_unicode=True, sort_keys=False)
+
+    def load():
+        with open(path, "r", encoding="utf-8") as f:
+            yaml.safe_load(f)
+
+    # auto_click_flowio (libyaml when available) - what the editor/runtime use
+    def flowio_save():
+        save_doc(path, doc)
+
+    def flowio_load():
+        load_doc(path)
+
+    save()
+    tag = f"{BIG_PROJECT_FLOWS}x{BIG_PROJECT_STEPS}"
+    return [
+        (f"yaml.save.{tag}", save, 1),
+        (f"yaml.load.{tag}", load, 1),
+        (f"yaml.flowio_save.{tag}", flowio_save, 1),
+        (f"yaml.flowio_load.{tag}", flowio_load, 1),
+    ]
+
+
+def cases_export(tmpdir: str) -> List[Tuple[str, Callable[[], Any], int]]:
+    from tools.generate_pyautogui_script import generate_launcher, generate_multiple
+    from auto_click_runtime import load_plan
+
+    proj = os.path.join(tmpdir, "export_project")
+    os.makedirs(proj, exist_ok=True)
+    doc = big_project_doc()
+    save_doc(os.path.join(proj, "flow.yaml"), doc)
+    ids = [f["id"] for f in doc["flows"]]
+    out_unrolled = os.path.join(proj, "run_unrolled.py")
+    out_launcher = os.path.join(proj, "run_launcher.py")
+    tag = f"{BIG_PROJECT_FLOWS}x{BIG_PROJECT_STEPS}"
+
+    def unrolled():
+        generate_multiple(proj, ids, out_unrolled)
+
+    def unrolled_compile():
+        with open(out_unrolled, "r", encoding="utf-8") as f:
+            compile(f.read(), out_unrolled, "exec")
+
+    def launcher():
+        generate_launcher(proj, ids, out_launcher)
+
+    def runtime_plan():
+        load_plan(proj, ids)
+
+    unrolled()
+    return [
+        (f"export.generate_multiple.{tag}", unrolled, 1),
+        (f"export.compile_unrolled.{tag}", unrolled_compile, 1),
+        (f"export.generate_launcher.{tag}", launcher, 20),
+        (f"export.runtime_load_plan.{tag}", runtime_plan, 1),
+    ]
+
+
+def selected(name: str, only: Optional[List[str]]) -> bool:
+    """--only entries are case-name prefixes ("locate", "preview.1080p", ...)."""
+    return not only or any(name.startswith(s) for s in only)
+
+
+def collect_cases(tmpdir: str, only: Optional[List[str]] = None) -> List[Tuple[str, Callable[[], Any], int]]:
+    """Cases matching `only`; a group's fixtures (screens, big projects) are built only if it can match."""
+    groups: List[Tuple[str, Callable[[], List[Tuple[str, Callable[[], Any], int]]]]] = [
+        ("crop_plan", cases_crop_plan),
+        ("preview", cases_preview),
+        ("locate", cases_locate),
+        ("yaml", lambda: cases_yaml(tmpdir)),
+        ("export", lambda: cases_export(tmpdir)),
+    ]
+    out = []
+    for prefix, build in groups:
+        if only and not any(prefix.startswith(s) or s.startswith(prefix + ".") for s in only):
+            continue
+        out.extend(case for case in build() if selected(case[0], only))
+    return out
+
+
+# ----------------------- results -----------------------
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "pyyaml": getattr(yaml, "__version__", "?"),
+        "libyaml": str(HAVE_LIBYAML),
+        "created_utc": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }
+
+
+def run_benchmarks(only: Optional[List[str]] = None, repeat: int = 5) -> Dict[str, Any]:
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory(prefix="acs_bench_") as tmpdir:
+        for name, fn, number in collect_cases(tmpdir, only):
+            results[name] = time_case(fn, repeat=repeat, number=number)
+    return {"env": environment(), "results": results}
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[Tuple[str, float, float, float]]:
+    """Return (name, baseline_ms, current_ms, ratio) for cases slower than baseline*(1+tolerance)."""
+    slower = []
+    base = baseline.get("results") or {}
+    for name, cur in (current.get("results") or {}).items():
+        b = base.get(name)
+        if not b or not b.get("median_ms"):
+            continue
+        ratio = float(cur["median_ms"]) / float(b["median_ms"])
+        if ratio > 1.0 + tolerance:
+            slower.append((name, float(b["median_ms"]), float(cur["median_ms"]), ratio))
+    return slower
+
+
+def print_table(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    base = (baseline or {}).get("results") or {}
+    print(f"{'case':44s} {'median ms':>11s} {'min ms':>10s} {'vs base':>9s}")
+    for name, r in report["results"].items():
+        b = base.get(name)
+        rel = f"{r['median_ms'] / b['median_ms']:.2f}x" if b and b.get("median_ms") else ""
+        print(f"{name:44s} {r['median_ms']:11.3f} {r['min_ms']:10.3f} {rel:>9s}")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", default="", help="write results as JSON")
+    ap.add_argument("--baseline", default="", help="compare against a previous --out JSON")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    ap.add_argument("--repeat", type=int, default=5, help="samples per case")
+    ap.add_argument("--only", default="", help="comma-separated case name prefixes to run")
+    return ap.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    ns = parse_args(argv)
+    only = [s.strip() for s in ns.only.split(",") if s.strip()] or None
+    report = run_benchmarks(only=only, repeat=ns.repeat)
+
+    baseline = None
+    if ns.baseline:
+        with open(ns.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_table(report, baseline)
+
+    if ns.out:
+        with open(ns.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print("written:", ns.out)
+
+    if baseline is not None:
+        slower = compare(report, baseline, ns.tolerance)
+        for name, b, c, ratio in slower:
+            print(f"REGRESSION {name}: {b:.3f} ms -> {c:.3f} ms ({ratio:.2f}x)")
+        if slower:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
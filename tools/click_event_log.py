@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Fixed-width binary click log (`--format bin` of simple_click_recorder / replayer).
+
+JSONL 每筆 click 約 100 bytes，且重播時要逐行 `json.loads`；長時間錄製（數小時）
+的檔案載入很慢。binary 格式為固定長度記錄，重播端直接 `numpy.memmap`，不需逐筆解析。
+
+Layout (little-endian):
+- header (HEADER_SIZE = 32 bytes):
+  magic b"ACLOG\\0\\0\\1" | version u16 | record_size u16 | reserved u32 |
+  wall_anchor f64 (time.time() at start) | perf_anchor_ns i64 (perf_counter_ns() at start)
+- records (RECORD_SIZE = 20 bytes each), until EOF:
+  t_ns i64 (perf_counter_ns) | x i32 | y i32 | button u8 | pressed u8 | pad 2
+
+button: 0 = left, 1 = right, 2 = middle (see BUTTONS).
+只記錄 click；pause/stop 等 state 記錄不寫入（暫停期間本來就沒有 click）。
+若錄到一半當機，檔尾不完整的記錄會在讀取時忽略。
+
+Convert an existing JSONL recording:
+  py tools/click_event_log.py clicks.jsonl clicks.bin
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import struct
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b"ACLOG\x00\x00\x01"
+VERSION = 1
+HEADER = struct.Struct("<8sHHIdq")
+HEADER_SIZE = HEADER.size  # 32
+RECORD = struct.Struct("<qiiBBxx")
+RECORD_SIZE = RECORD.size  # 20
+RECORD_DTYPE = np.dtype(
+    {
+        "names": ["t_ns", "x", "y", "button", "pressed"],
+        "formats": ["<i8", "<i4", "<i4", "u1", "u1"],
+        "offsets": [0, 8, 12, 16, 17],
+        "itemsize": RECORD_SIZE,
+    }
+)
+
+BUTTONS = ("left", "right", "middle")
+
+
+class ClickLogError(ValueError):
+    pass
+
+
+def button_code(button: Optional[str]) -> int:
+    button = str(button or "left")
+    if "right" in button:
+        return 1
+    if "middle" in button:
+        return 2
+    return 0
+
+
+def button_name(code: int) -> str:
+    return BUTTONS[code] if 0 <= int(code) < len(BUTTONS) else "left"
+
+
+def encode_header(wall_anchor: float, perf_anchor_ns: int) -> bytes:
+    return HEADER.pack(MAGIC, VERSION, RECORD_SIZE, 0, float(wall_anchor), int(perf_anchor_ns))
+
+
+def encode_records(batch: Iterable[Dict[str, Any]]) -> bytes:
+    """Pack the click records of a batch (other record types are dropped)."""
+    return b"".join(
+        RECORD.pack(int(o["t_ns"]), int(o["x"]), int(o["y"]), button_code(o.get("button")), bool(o.get("pressed")))
+        for o in batch
+        if o.get("type") == "click"
+    )
+
+
+def is_click_log(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def read_header(path: str) -> Dict[str, Any]:
+    with open(path, "rb") as f:
+        raw = f.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE or raw[: len(MAGIC)] != MAGIC:
+        raise ClickLogError(f"not a binary click log: {path}")
+    magic, version, record_size, _reserved, wall_anchor, perf_anchor_ns = HEADER.unpack(raw)
+    if version != VERSION or record_size != RECORD_SIZE:
+        raise ClickLogError(f"unsupported click log version={version} record_size={record_size}")
+    return {"version": version, "wall_anchor": wall_anchor, "perf_anchor_ns": perf_anchor_ns}
+
+
+def load_click_log(path: str) -> Tuple[Dict[str, Any], np.ndarray]:
+    """(header, records) with records a read-only memmap of RECORD_DTYPE (no copy, no parsing)."""
+    header = read_header(path)
+    n = (os.path.getsize(path) - HEADER_SIZE) // RECORD_SIZE
+    if n <= 0:
+        return header, np.zeros(0, dtype=RECORD_DTYPE)
+    return header, np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(n,))
+
+
+def convert_jsonl(src: str, dst: str) -> int:
+    """JSONL recording -> binary click log; returns the number of clicks written."""
+    meta: Dict[str, Any] = {}
+    clicks = []
+    with open(src, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            obj = json.loads(line)
+            if obj.get("type") == "meta" and not meta:
+                meta = obj
+            elif obj.get("type") == "click":
+                if obj.get("t_ns") is None:  # legacy recording: wall-clock seconds only
+                    obj = dict(obj, t_ns=int(round(float(obj["t"]) * 1e9)))
+                clicks.append(obj)
+    wall = float(meta.get("wall_anchor", meta.get("t", 0.0)))
+    perf = int(meta.get("perf_anchor_ns", round(wall * 1e9)))
+    with open(dst, "wb") as f:
+        f.write(encode_header(wall, perf))
+        f.write(encode_records(clicks))
+    return len(clicks)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="convert a JSONL click recording to the binary format")
+    ap.add_argument("src", help="input JSONL path")
+    ap.add_argument("dst", help="output binary path")
+    ns = ap.parse_args()
+    n = convert_jsonl(ns.src, ns.dst)
+    print(f"Wrote {n} clicks: {ns.dst} ({os.path.getsize(ns.dst)} bytes, was {os.path.getsize(ns.src)})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
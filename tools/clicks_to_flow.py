@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Convert a raw click recording (simple_click_recorder.py) into a flow of flow.yaml.
+
+把 simple_click_recorder 的錄製檔（JSONL 或 `--format bin`）轉成編輯器的 flow：
+- anchor：指定 anchor 圖與錨點基準點（basepoint = 錄製時 anchor_click_xy，像素座標）
+- 每個 press 變成一個 click step：`offset = click_xy - basepoint`（整批用 numpy 計算）
+- 連續兩次同鍵 press 的時間 / 距離都在門檻內時合併成 `clicks: 2`
+  （門檻：auto_click_core.DOUBLE_CLICK_INTERVAL_S / DOUBLE_CLICK_DISTANCE_PX，與編輯器錄製一致）
+- delay_s：預設用錄製時到下一個 step 的實際間隔，無條件進位成整數秒、最少 1 秒
+  （flow.yaml 的 delay_s 是整數秒，匯出腳本與編輯器都以 int 處理；`--delay default` 改用固定 default_delay_s）
+- preview：給 `--shots-dir` 時，用錄製期間的全螢幕截圖批次產生。
+  截圖檔名需含時間戳（例如 `<t_ns>.png` / `shot_<t_ns>.png`，與錄製檔的 `t_ns` 同一個時鐘）；
+  每個 step 取「按下之前最後一張」截圖，每張截圖只解碼一次，PNG 由背景 thread 寫檔。
+
+Usage:
+  py tools/clicks_to_flow.py --in clicks.jsonl --project ./project --flow flow1 \\
+      --anchor anchor.png --basepoint 812,433 --anchor-rect 760,410
+  py tools/clicks_to_flow.py --in clicks.bin --project ./project --anchor anchor.png \\
+      --basepoint 812,433 --click-in-image 52,23 --shots-dir ./shots
+
+已存在的 flow.yaml 會被更新：指定的 flow 的 anchor / steps 會被取代（`--append` 則接在既有 steps 後面）。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from auto_click_core import DOUBLE_CLICK_DISTANCE_PX, DOUBLE_CLICK_INTERVAL_S, preview_crop_plan  # noqa: E402
+from auto_click_flowdoc import FlowDocument  # noqa: E402
+from auto_click_flowio import load_doc, save_doc  # noqa: E402
+from tools.click_event_log import BUTTONS, button_code, is_click_log, load_click_log  # noqa: E402
+
+try:
+    import cv2  # type: ignore
+except Exception:  # pragma: no cover
+    cv2 = None
+
+DEFAULT_DELAY_S = 2
+DEFAULT_CONFIDENCE = 0.9
+DEFAULT_GRAYSCALE = True
+PREVIEW_CROP_SIZE = 120  # same as the editor
+MIN_RECORDED_DELAY_S = 1  # delay_s is whole seconds everywhere (generator, editor)
+
+_SHOT_TS = re.compile(r"(\d+)$")
+
+
+# ----------------------- input -----------------------
+
+
+def load_clicks(path: str) -> Dict[str, np.ndarray]:
+    """Click events as column arrays: t_ns (int64), x, y (int64), button (uint8), pressed (bool).
+
+    JSONL without `t_ns` (old recordings) falls back to the wall-clock `t`.
+    """
+    if is_click_log(path):
+        _header, rec = load_click_log(path)
+        return {
+            "t_ns": np.asarray(rec["t_ns"], dtype=np.int64),
+            "x": np.asarray(rec["x"], dtype=np.int64),
+            "y": np.asarray(rec["y"], dtype=np.int64),
+            "button": np.asarray(rec["button"], dtype=np.uint8),
+            "pressed": np.asarray(rec["pressed"]) != 0,
+        }
+
+    t_ns: List[Optional[int]] = []
+    t_s: List[float] = []
+    xs: List[int] = []
+    ys: List[int] = []
+    buttons: List[int] = []
+    pressed: List[bool] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            obj = json.loads(line)
+            if obj.get("type") != "click":
+                continue
+            t_ns.append(obj.get("t_ns"))
+            t_s.append(float(obj.get("t", 0.0)))
+            xs.append(int(obj["x"]))
+            ys.append(int(obj["y"]))
+            buttons.append(button_code(obj.get("button")))
+            pressed.append(bool(obj.get("pressed")))
+    if t_ns and all(v is not None for v in t_ns):
+        t = np.asarray(t_ns, dtype=np.int64)
+    else:
+        t = np.round(np.asarray(t_s, dtype=np.float64) * 1e9).astype(np.int64)
+    return {
+        "t_ns": t,
+        "x": np.asarray(xs, dtype=np.int64),
+        "y": np.asarray(ys, dtype=np.int64),
+        "button": np.asarray(buttons, dtype=np.uint8),
+        "pressed": np.asarray(pressed, dtype=bool),
+    }
+
+
+# ----------------------- conversion -----------------------
+
+
+def double_click_starts(
+    t_ns: np.ndarray,
+    x: np.ndarray,
+    y: np.ndarray,
+    button: np.ndarray,
+    interval_s: float = DOUBLE_CLICK_INTERVAL_S,
+    distance_px: int = DOUBLE_CLICK_DISTANCE_PX,
+) -> np.ndarray:
+    """Mask over presses: True where press i and press i+1 form a double-click.
+
+    Pairs never overlap: in a run of candidates (e.g. a triple click) every other
+    press starts a pair, so three quick presses become a double + a single click.
+    """
+    n = len(t_ns)
+    cand = np.zeros(n, dtype=bool)
+    if n < 2:
+        return cand
+    dt = np.diff(t_ns)
+    cand[:-1] = (
+        (button[1:] == button[:-1])
+        & (dt >= 0)
+        & (dt <= int(interval_s * 1e9))
+        & (np.abs(np.diff(x)) <= distance_px)
+        & (np.abs(np.diff(y)) <= distance_px)
+    )
+    idx = np.arange(n)
+    prev = np.concatenate(([False], cand[:-1]))
+    run_start = np.maximum.accumulate(np.where(cand & ~prev, idx, 0))
+    return cand & ((idx - run_start) % 2 == 0)
+
+
+def build_click_steps(
+    clicks: Dict[str, np.ndarray],
+    basepoint: Tuple[int, int],
+    delay: str = "recorded",
+    default_delay_s: int = DEFAULT_DELAY_S,
+    interval_s: float = DOUBLE_CLICK_INTERVAL_S,
+    distance_px: int = DOUBLE_CLICK_DISTANCE_PX,
+) -> Dict[str, np.ndarray]:
+    """Column arrays of the click steps (one row per step).
+
+    t_ns is the time of the (first) press; delay_s is measured from the step's
+    last press to the next step's first press, rounded up to whole seconds.
+    """
+    p = clicks["pressed"]
+    t, x, y, b = clicks["t_ns"][p], clicks["x"][p], clicks["y"][p], clicks["button"][p]
+    starts = double_click_starts(t, x, y, b, interval_s=interval_s, distance_px=distance_px)
+    second = np.concatenate(([False], starts[:-1])) if len(starts) else starts
+    keep = ~second
+    last_t = np.where(starts, np.roll(t, -1), t)[keep]
+
+    t_k = t[keep]
+    if delay == "recorded" and len(t_k):
+        gaps = np.empty(len(t_k), dtype=np.float64)
+        gaps[:-1] = (t_k[1:] - last_t[:-1]) / 1e9
+        gaps[-1] = float(default_delay_s)
+        # round first so float noise (2.0000001 s) does not add a second
+        delay_s = np.maximum(np.ceil(np.round(gaps, 3)), MIN_RECORDED_DELAY_S).astype(np.int64)
+    else:
+        delay_s = np.full(len(t_k), int(default_delay_s), dtype=np.int64)
+
+    return {
+        "t_ns": t_k,
+        "x": x[keep],
+        "y": y[keep],
+        "offset_x": x[keep] - int(basepoint[0]),
+        "offset_y": y[keep] - int(basepoint[1]),
+        "button": b[keep],
+        "clicks": np.where(starts[keep], 2, 1),
+        "delay_s": delay_s,
+    }
+
+
+def steps_to_dicts(steps: Dict[str, np.ndarray], previews: Sequence[Optional[str]]) -> List[Dict[str, Any]]:
+    cols = {k: v.tolist() for k, v in steps.items()}
+    out = []
+    for i in range(len(cols["t_ns"])):
+        d = cols["delay_s"][i]
+        out.append(
+            {
+                "action": "click",
+                "offset": {"x": cols["offset_x"][i], "y": cols["offset_y"][i]},
+                "button": BUTTONS[cols["button"][i]] if cols["button"][i] < len(BUTTONS) else "left",
+                "clicks": cols["clicks"][i],
+                "delay_s": d,
+                "preview": previews[i] if i < len(previews) else None,
+                "_editor": {"click_xy": {"x": cols["x"][i], "y": cols["y"][i]}},
+            }
+        )
+    return out
+
+
+# ----------------------- previews -----------------------
+
+
+def list_shots(shots_dir: str) -> Tuple[np.ndarray, List[str]]:
+    """(sorted timestamps, paths) of the PNG/JPG screenshots whose name ends with digits."""
+    found = []
+    for name in os.listdir(shots_dir):
+        stem, ext = os.path.splitext(name)
+        if ext.lower() not in (".png", ".jpg", ".jpeg", ".bmp"):
+            continue
+        m = _SHOT_TS.search(stem)
+        if m:
+            found.append((int(m.group(1)), os.path.join(shots_dir, name)))
+    found.sort()
+    return np.asarray([t for t, _ in found], dtype=np.int64), [p for _, p in found]
+
+
+def _read_image(path: str):
+    # np.fromfile + imdecode: cv2.imread fails on non-ASCII paths on Windows
+    return cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+def render_previews(
+    steps: Dict[str, np.ndarray],
+    shots_dir: str,
+    project_dir: str,
+    flow_id: str,
+    first_index: int = 1,
+    size: int = PREVIEW_CROP_SIZE,
+    workers: int = 2,
+    log=print,
+) -> List[Optional[str]]:
+    """Write one preview per step from the session screenshots; returns relative paths (None = no shot)."""
+    if cv2 is None:
+        raise RuntimeError("opencv-python not available")
+    from auto_click_capture import finish_preview
+    from auto_click_pngwriter import PngWriterPool
+
+    n = len(steps["t_ns"])
+    previews: List[Optional[str]] = [None] * n
+    shot_t, shot_paths = list_shots(shots_dir)
+    if n == 0 or len(shot_t) == 0:
+        return previews
+
+    # latest screenshot taken at or before each press
+    which = np.searchsorted(shot_t, steps["t_ns"], side="right") - 1
+    previews_dir = os.path.join(project_dir, "previews")
+    os.makedirs(previews_dir, exist_ok=True)
+    xs, ys = steps["x"].tolist(), steps["y"].tolist()
+
+    failed: List[str] = []
+    pool = PngWriterPool(workers=workers, on_error=lambda p, e: failed.append(f"{p}: {e}"))
+    try:
+        for shot in np.unique(which[which >= 0]).tolist():
+            img = _read_image(shot_paths[shot])
+            if img is None:
+                log(f"cannot read screenshot: {shot_paths[shot]}")
+                continue
+            h, w = img.shape[:2]
+            for i in np.flatnonzero(which == shot).tolist():
+                plan = preview_crop_plan(xs[i], ys[i], screen_w=w, screen_h=h, size=size)
+                crop = finish_preview(img[plan.top : plan.bottom, plan.left : plan.right], plan)
+                name = f"{flow_id}_step{first_index + i:04d}.png"
+                pool.submit(os.path.join(previews_dir, name), np.ascontiguousarray(crop))
+                previews[i] = os.path.join("previews", name)
+    finally:
+        pool.close(wait=True)
+    for msg in failed:
+        log(f"preview write failed: {msg}")
+    return previews
+
+
+# ----------------------- flow.yaml -----------------------
+
+
+def new_doc() -> Dict[str, Any]:
+    return {
+        "version": 0,
+        "meta": {
+            "name": "自動點擊系統",
+            "created_utc": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "default_delay_s": DEFAULT_DELAY_S,
+        },
+        "global": {"confidence": DEFAULT_CONFIDENCE, "grayscale": DEFAULT_GRAYSCALE},
+        "flows": [],
+    }
+
+
+def anchor_info(
+    image_rel: str,
+    image_wh: Tuple[int, int],
+    basepoint: Tuple[int, int],
+    anchor_rect: Optional[Sequence[int]] = None,
+    click_in_image: Optional[Tuple[int, int]] = None,
+) -> Dict[str, Any]:
+    """anchor dict as the editor writes it (click_in_image clamped into the image)."""
+    w, h = int(image_wh[0]), int(image_wh[1])
+    anch: Dict[str, Any] = {"image": image_rel}
+    if anchor_rect is not None:
+        rx, ry = int(anchor_rect[0]), int(anchor_rect[1])
+        rw = int(anchor_rect[2]) if len(anchor_rect) > 2 else w
+        rh = int(anchor_rect[3]) if len(anchor_rect) > 3 else h
+        cx, cy = int(basepoint[0]) - rx, int(basepoint[1]) - ry
+        anch["capture_rect"] = {"x": rx, "y": ry, "w": rw, "h": rh}
+    elif click_in_image is not None:
+        cx, cy = int(click_in_image[0]), int(click_in_image[1])
+    else:
+        cx, cy = w // 2, h // 2
+    anch["click_in_image"] = {"x": max(0, min(w - 1, cx)), "y": max(0, min(h - 1, cy))}
+    return anch
+
+
+def convert(
+    clicks_path: str,
+    project_dir: str,
+    flow_id: str,
+    anchor_path: str,
+    basepoint: Tuple[int, int],
+    anchor_rect: Optional[Sequence[int]] = None,
+    click_in_image: Optional[Tuple[int, int]] = None,
+    shots_dir: Optional[str] = None,
+    delay: str = "recorded",
+    append: bool = False,
+    preview_size: int = PREVIEW_CROP_SIZE,
+    log=print,
+) -> Dict[str, Any]:
+    """Convert one recording into `flow_id` of project_dir/flow.yaml; returns the flow dict."""
+    if cv2 is None:
+        raise RuntimeError("opencv-python not available")
+    os.makedirs(os.path.join(project_dir, "anchors"), exist_ok=True)
+    yaml_path = os.path.join(project_dir, "flow.yaml")
+    doc = load_doc(yaml_path) if os.path.exists(yaml_path) else new_doc()
+    default_delay_s = (doc.get("meta") or {}).get("default_delay_s", DEFAULT_DELAY_S)
+
+    anchor_img = _read_image(anchor_path)
+    if anchor_img is None:
+        raise RuntimeError(f"cannot read anchor image: {anchor_path}")
+    anchor_name = f"{flow_id}_anchor.png"
+    anchor_abs = os.path.join(project_dir, "anchors", anchor_name)
+    if os.path.abspath(anchor_path) != os.path.abspath(anchor_abs):
+        shutil.copyfile(anchor_path, anchor_abs)
+
+    steps = build_click_steps(load_clicks(clicks_path), basepoint, delay=delay, default_delay_s=default_delay_s)
+
+    flows = FlowDocument(doc)
+    f = flows.ensure(flow_id, export=True)
+    existing = list(f.get("steps") or []) if append else []
+    if shots_dir:
+        previews = render_previews(
+            steps, shots_dir, project_dir, flow_id, first_index=len(existing) + 1, size=preview_size, log=log
+        )
+    else:
+        previews = []
+
+    f["anchor"] = anchor_info(
+        os.path.join("anchors", anchor_name),
+        (anchor_img.shape[1], anchor_img.shape[0]),
+        basepoint,
+        anchor_rect=anchor_rect,
+        click_in_image=click_in_image,
+    )
+    f["steps"] = existing + steps_to_dicts(steps, previews)
+    save_doc(yaml_path, doc)
+    return f
+
+
+def _ints(text: str, n: Sequence[int]) -> Tuple[int, ...]:
+    vals = tuple(int(v) for v in text.replace(" ", "").split(","))
+    if len(vals) not in n:
+        raise argparse.ArgumentTypeError(f"expected {' or '.join(map(str, n))} comma-separated integers: {text}")
+    return vals
+
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--in", dest="inp", required=True, help="recording (JSONL or binary click log)")
+    ap.add_argument("--project", required=True, help="project folder (flow.yaml is created or updated)")
+    ap.add_argument("--flow", default="flow1", help="flow id to write")
+    ap.add_argument("--anchor", required=True, help="anchor image (copied to anchors/<flow>_anchor.png)")
+    ap.add_argument("--basepoint", required=True, type=lambda s: _ints(s, (2,)), help="anchor_click_xy: X,Y")
+    ap.add_argument("--anchor-rect", type=lambda s: _ints(s, (2, 4)), help="anchor capture rect: X,Y[,W,H]")
+    ap.add_argument("--click-in-image", type=lambda s: _ints(s, (2,)), help="basepoint inside the anchor image: X,Y")
+    ap.add_argument("--shots-dir", help="screenshots taken during the session (name ends with the t_ns timestamp)")
+    ap.add_argument("--delay", choices=["recorded", "default"], default="recorded", help="step delay_s source")
+    ap.add_argument("--append", action="store_true", help="append to the flow's existing steps")
+    ap.add_argument("--preview-size", type=int, default=PREVIEW_CROP_SIZE)
+    return ap.parse_args()
+
+
+def main() -> int:
+    ns = parse_args()
+    f = convert(
+        ns.inp,
+        ns.project,
+        ns.flow,
+        ns.anchor,
+        ns.basepoint,
+        anchor_rect=ns.anchor_rect,
+        click_in_image=ns.click_in_image,
+        shots_dir=ns.shots_dir,
+        delay=ns.delay,
+        append=ns.append,
+        preview_size=ns.preview_size,
+    )
+    steps = f.get("steps") or []
+    doubles = sum(1 for s in steps if s.get("clicks") == 2)
+    with_preview = sum(1 for s in steps if s.get("preview"))
+    print(f"{ns.flow}: {len(steps)} steps ({doubles} double-clicks, {with_preview} previews) -> {ns.project}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,6 +5,10 @@
 這支工具把「YAML 流程檔（flow.yaml）」轉成一支可直接執行的 Python 腳本（pyautogui）。
 
 重點：
+- anchor 定位使用 repo 內的 auto_click_locate（OpenCV matchTemplate，
+  先搜尋 anchor.capture_rect 附近，再擴大到全螢幕）；無法匯入時退回 pyautogui.locateOnScreen
+- 產生的腳本以「相對於腳本本身」的路徑找到 repo（環境變數 AUTO_CLICK_SYSTEM_ROOT 可覆寫），
+  repo 與腳本一起搬移/複製到別的電腦仍可執行
 - 依 spec_yaml_v0.md 的座標換算：
   - 執行時 locate anchor 圖得到 bbox (ax,ay,w,h)
   - anchor_click_xy = (ax + click_in_image.x, ay + click_in_image.y)
@@ -22,21 +26,35 @@ Usage:
 
 然後執行：
   py ./project/run_flow.py
+
+Launcher 模式（建議；編輯器「匯出」使用此模式）：
+  py tools/generate_pyautogui_script.py --project ./project --out ./project/run.py --flow-id flow1,flow2 --launcher
+  產生的 launcher 只有幾行，執行時由 auto_click_runtime 載入 flow.yaml 並執行；
+  修改 flow.yaml 之後不需要重新產生。
 """
 
 from __future__ import annotations
 
 import argparse
 import os
+import sys
 import textwrap
 from typing import Any, Dict, List, Optional
 
-import yaml
+
+# repo root (contains auto_click_locate.py); generated scripts locate it relative to themselves
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+# environment variable that overrides the repo location for generated scripts
+REPO_ROOT_ENV = "AUTO_CLICK_SYSTEM_ROOT"
+
+from auto_click_flowio import load_doc  # noqa: E402
 
 
 def _load_yaml(path: str) -> Dict[str, Any]:
-    with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
+    return load_doc(path)
 
 
 def _py(s: str) -> str:
@@ -44,6 +62,102 @@ def _py(s: str) -> str:
     return repr(s)
 
 
+def _hint_literal(anchor: Dict[str, Any]) -> str:
+    """anchor.capture_rect as a Python dict literal (or 'None')."""
+    r = anchor.get("capture_rect")
+    if not isinstance(r, dict):
+        return "None"
+    try:
+        x, y, w, h = int(r["x"]), int(r["y"]), int(r["w"]), int(r["h"])
+    except Exception:
+        return "None"
+    return f"{{'x': {x}, 'y': {y}, 'w': {w}, 'h': {h}}}"
+
+
+def _locate_mode(glob: Dict[str, Any]) -> str:
+    """global.locate_mode (auto / full / pyramid)."""
+    mode = str(glob.get("locate_mode") or "auto")
+    return mode if mode in ("auto", "full", "pyramid") else "auto"
+
+
+def _script_relative(path: str, out_path: str) -> str:
+    """Python expression for `path` relative to the generated script (absolute if on another drive)."""
+    try:
+        rel = os.path.relpath(os.path.abspath(path), os.path.dirname(os.path.abspath(out_path)))
+    except ValueError:
+        return _py(os.path.abspath(path))
+    return f"os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), {_py(rel.replace(os.sep, '/'))}))"
+
+
+def _repo_root_src(out_path: str) -> str:
+    """REPO_ROOT for a generated script: $AUTO_CLICK_SYSTEM_ROOT, else the repo relative to the script."""
+    return "".join(
+        [
+            f"REPO_ROOT = os.environ.get({_py(REPO_ROOT_ENV)}) or {_script_relative(REPO_ROOT, out_path)}\n",
+            "if REPO_ROOT not in sys.path:\n",
+            "    sys.path.insert(0, REPO_ROOT)\n",
+        ]
+    )
+
+
+def _locator_src(out_path: str, locate_mode: str = "auto") -> str:
+    """Shared locate_anchor() source for generated scripts."""
+    return "".join(
+        [
+            _repo_root_src(out_path),
+            "try:\n",
+            "    from auto_click_capture import cv2 as _cv2, mss as _mss, np as _np\n",
+            "    from auto_click_locate import AnchorLocator\n",
+            "\n",
+            "    # without the capture deps fall back to pyautogui up front (not after a failed wait)\n",
+            f"    LOCATOR = AnchorLocator(mode={_py(locate_mode)}) if None not in (_cv2, _mss, _np) else None\n",
+            "except Exception:\n",
+            "    LOCATOR = None\n",
+            "try:\n",
+            "    from auto_click_clipboard import have_clipboard, paste_text  # type: steps with mode: paste\n",
+            "\n",
+            "    if not have_clipboard():\n",
+            "        paste_text = None  # no pyperclip: paste steps are typed with pyautogui.write\n",
+            "except Exception:\n",
+            "    paste_text = None\n",
+            "\n\n",
+            "def locate_anchor(anchor_path: str, confidence: float, grayscale: bool, hint=None, timeout_s: float = 15.0, interval_s: float = 0.5):\n",
+            "    \"\"\"Locate anchor image on screen and return bbox (left, top, width, height).\n\n",
+            "    Uses auto_click_locate (cached template, search near hint first) when available;\n",
+            "    otherwise pyautogui.locateOnScreen (requires opencv-python when using confidence < 1.0).\n",
+            "    \"\"\"\n",
+            "    if LOCATOR is not None:\n",
+            "        return LOCATOR.wait(anchor_path, confidence, grayscale=grayscale, hint=hint, timeout_s=timeout_s, interval_s=interval_s)\n",
+            "    t0 = time.time()\n",
+            "    while time.time() - t0 < timeout_s:\n",
+            "        try:\n",
+            "            box = pyautogui.locateOnScreen(anchor_path, confidence=confidence, grayscale=grayscale)\n",
+            "        except TypeError:\n",
+            "            # Older pyautogui without confidence/grayscale kwargs\n",
+            "            box = pyautogui.locateOnScreen(anchor_path)\n",
+            "        if box is not None:\n",
+            "            return box\n",
+            "        time.sleep(interval_s)\n",
+            "    raise RuntimeError(f\"anchor not found within {timeout_s}s: {anchor_path}\")\n",
+        ]
+    )
+
+
+def _type_src(st: Dict[str, Any]) -> str:
+    """Source for one `type` step (mode: write = pyautogui.write, paste = clipboard Ctrl+V)."""
+    text = _py(str(st.get("text") or ""))
+    interval_s = float(st.get("interval_s") or 0.02)
+    write = f"pyautogui.write({text}, interval={interval_s})\n"
+    if str(st.get("mode") or "write").lower() != "paste":
+        return write
+    return (
+        "if paste_text is not None:\n"
+        f"    paste_text({text}, hotkey=pyautogui.hotkey)\n"
+        "else:\n"
+        f"    {write}"
+    )
+
+
 def _get_flow(doc: Dict[str, Any], flow_id: str) -> Dict[str, Any]:
     flows = doc.get("flows") or []
     for f in flows:
@@ -106,31 +220,13 @@ def generate(project_dir: str, flow_id: str, out_path: str, export_show_desktop:
             f"# flow: {flow_id}\n",
             "\n",
             "import os\n",
+            "import sys\n",
             "import time\n",
             "\n",
             "import pyautogui\n",
             "\n",
-            "\n",
-            "def locate_anchor(anchor_path: str, confidence: float, grayscale: bool, timeout_s: float = 15.0, interval_s: float = 0.5):\n",
-            "    \"\"\"Locate anchor image on screen and return bbox (left, top, width, height).\n",
-            "\n",
-            "    Requires opencv-python when using confidence < 1.0.\n",
-            "    \"\"\"\n",
-            "    t0 = time.time()\n",
-            "    last = None\n",
-            "    while time.time() - t0 < timeout_s:\n",
-            "        try:\n",
-            "            box = pyautogui.locateOnScreen(anchor_path, confidence=confidence, grayscale=grayscale)\n",
-            "        except TypeError:\n",
-            "            # Older pyautogui without confidence/grayscale kwargs\n",
-            "            box = pyautogui.locateOnScreen(anchor_path)\n",
-            "        if box is not None:\n",
-            "            return box\n",
-            "        last = box\n",
-            "        time.sleep(interval_s)\n",
-            "    raise RuntimeError(f\"anchor not found within {timeout_s}s: {anchor_path}\")\n",
-            "\n",
-            "\n",
+            _locator_src(out_path, _locate_mode(glob)),
+            "\n\n",
             "def main():\n",
             "    pyautogui.FAILSAFE = True\n",
             "    pyautogui.PAUSE = 0.0\n",
@@ -161,12 +257,12 @@ def generate(project_dir: str, flow_id: str, out_path: str, export_show_desktop:
             )
             if export_show_desktop
             else "",
-            "    box = locate_anchor(anchor_path, confidence=confidence, grayscale=grayscale)\n",
+            f"    box = locate_anchor(anchor_path, confidence=confidence, grayscale=grayscale, hint={_hint_literal(anchor)})\n",
             "    ax, ay, aw, ah = int(box.left), int(box.top), int(box.width), int(box.height)\n",
             f"    click_in_image = ({cx}, {cy})\n",
             "    anchor_click_xy = (ax + click_in_image[0], ay + click_in_image[1])\n",
             "\n",
-            "    print('anchor bbox=', (ax, ay, aw, ah))\n",
+            "    print('anchor bbox=', (ax, ay, aw, ah), 'score=', getattr(box, 'score', None))\n",
             "    print('anchor_click_xy=', anchor_click_xy)\n",
             "\n",
         ]
@@ -202,17 +298,7 @@ def generate(project_dir: str, flow_id: str, out_path: str, export_show_desktop:
             )
 
         elif action == "type":
-            text = st.get("text") or ""
-            interval_s = float(st.get("interval_s") or 0.02)
-            script += textwrap.indent(
-                textwrap.dedent(
-                    f"""
-                    pyautogui.write({_py(str(text))}, interval={interval_s})
-                    time.sleep({delay_s})
-                    """
-                ).lstrip("\n"),
-                "    ",
-            )
+            script += textwrap.indent(_type_src(st) + f"time.sleep({delay_s})\n", "    ")
 
         elif action == "hotkey":
             keys = st.get("keys") or []
@@ -276,24 +362,12 @@ def generate_multiple(project_dir: str, flow_ids: List[str], out_path: str) -> N
             f"# flows: {flow_ids}\n",
             "\n",
             "import os\n",
+            "import sys\n",
             "import time\n",
             "\n",
             "import pyautogui\n",
-            "\n\n",
-            "def locate_anchor(anchor_path: str, confidence: float, grayscale: bool, timeout_s: float = 15.0, interval_s: float = 0.5):\n",
-            "    \"\"\"Locate anchor image on screen and return bbox (left, top, width, height).\n\n",
-            "    Requires opencv-python when using confidence < 1.0.\n",
-            "    \"\"\"\n",
-            "    t0 = time.time()\n",
-            "    while time.time() - t0 < timeout_s:\n",
-            "        try:\n",
-            "            box = pyautogui.locateOnScreen(anchor_path, confidence=confidence, grayscale=grayscale)\n",
-            "        except TypeError:\n",
-            "            box = pyautogui.locateOnScreen(anchor_path)\n",
-            "        if box is not None:\n",
-            "            return box\n",
-            "        time.sleep(interval_s)\n",
-            "    raise RuntimeError(f\"anchor not found within {timeout_s}s: {anchor_path}\")\n",
+            "\n",
+            _locator_src(out_path, _locate_mode(glob)),
             "\n\n",
             "def show_desktop():\n",
             "    \"\"\"Windows: Win+D\"\"\"\n",
@@ -348,7 +422,7 @@ def generate_multiple(project_dir: str, flow_ids: List[str], out_path: str) -> N
 
         script += f"    anchor_rel = {_py(str(anchor_image_rel))}\n"
         script += "    anchor_path = os.path.join(project_dir, anchor_rel)\n"
-        script += "    box = locate_anchor(anchor_path, confidence=confidence, grayscale=grayscale)\n"
+        script += f"    box = locate_anchor(anchor_path, confidence=confidence, grayscale=grayscale, hint={_hint_literal(anchor)})\n"
         script += "    ax, ay, aw, ah = int(box.left), int(box.top), int(box.width), int(box.height)\n"
         script += f"    click_in_image = ({cx}, {cy})\n"
         script += "    anchor_click_xy = (ax + click_in_image[0], ay + click_in_image[1])\n"
@@ -383,17 +457,7 @@ def generate_multiple(project_dir: str, flow_ids: List[str], out_path: str) -> N
                 )
 
             elif action == "type":
-                text = st.get("text") or ""
-                interval_s = float(st.get("interval_s") or 0.02)
-                script += textwrap.indent(
-                    textwrap.dedent(
-                        f"""
-                        pyautogui.write({_py(str(text))}, interval={interval_s})
-                        time.sleep({delay_s})
-                        """
-                    ).lstrip("\n"),
-                    "    ",
-                )
+                script += textwrap.indent(_type_src(st) + f"time.sleep({delay_s})\n", "    ")
 
             elif action == "hotkey":
                 keys = st.get("keys") or []
@@ -423,17 +487,57 @@ def generate_multiple(project_dir: str, flow_ids: List[str], out_path: str) -> N
         f.write(script)
 
 
+def generate_launcher(project_dir: str, flow_ids: List[str], out_path: str) -> None:
+    """Generate a tiny launcher that runs flows through auto_click_runtime.
+
+    The launcher does not embed any steps: flow.yaml is loaded and compiled at
+    run time, so its size and generation cost do not depend on the flows.
+    The repo and the project are referenced relative to the launcher, so a
+    copied project (or repo) keeps working; $AUTO_CLICK_SYSTEM_ROOT overrides the repo.
+    """
+    project_dir_abs = os.path.abspath(project_dir)
+    script = "".join(
+        [
+            "#!/usr/bin/env python3\n",
+            "# -*- coding: utf-8 -*-\n",
+            "\n",
+            f"# Auto-generated launcher for: {os.path.join(project_dir_abs, 'flow.yaml')}\n",
+            f"# flows: {list(flow_ids)}\n",
+            "\n",
+            "import os\n",
+            "import sys\n",
+            "\n",
+            _repo_root_src(out_path),
+            "\n",
+            "from auto_click_runtime import run_project\n",
+            "\n",
+            f"PROJECT_DIR = {_script_relative(project_dir_abs, out_path)}\n",
+            f"FLOW_IDS = {[str(f) for f in flow_ids]!r}\n",
+            "\n",
+            "if __name__ == '__main__':\n",
+            "    raise SystemExit(run_project(PROJECT_DIR, FLOW_IDS))\n",
+        ]
+    )
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write(script)
+
+
 def parse_args() -> argparse.Namespace:
     ap = argparse.ArgumentParser()
     ap.add_argument("--project", required=True, help="project dir containing flow.yaml")
-    ap.add_argument("--flow-id", required=True, help="flow id to generate")
+    ap.add_argument("--flow-id", required=True, help="flow id to generate (comma-separated with --launcher)")
     ap.add_argument("--out", required=True, help="output python script path")
+    ap.add_argument("--launcher", action="store_true", help="generate a small launcher using auto_click_runtime")
     return ap.parse_args()
 
 
 def cli() -> int:
     ns = parse_args()
-    generate(project_dir=ns.project, flow_id=ns.flow_id, out_path=ns.out)
+    if ns.launcher:
+        flow_ids = [s.strip() for s in ns.flow_id.split(",") if s.strip()]
+        generate_launcher(project_dir=ns.project, flow_ids=flow_ids, out_path=ns.out)
+    else:
+        generate(project_dir=ns.project, flow_id=ns.flow_id, out_path=ns.out)
     print(f"generated: {ns.out}")
     return 0
 
@@ -13,6 +13,23 @@ Output:
 
 Usage:
   py tools/simple_click_recorder.py --out clicks.jsonl
+  py tools/simple_click_recorder.py --out clicks.jsonl --sync   # legacy: write+flush per event
+  py tools/simple_click_recorder.py --out clicks.bin --format bin
+
+Formats:
+- jsonl (default): one JSON object per line (meta / click / state)
+- bin: header + fixed-width click records, see tools/click_event_log.py
+
+Timestamps:
+- events are stamped with `time.perf_counter_ns()` inside the input hook (`t_ns`,
+  nanosecond resolution; `time.time()` ticks only every ~15.6 ms on some Windows setups)
+- the meta record holds the anchor pair (wall_anchor, perf_anchor_ns); `t` is still
+  written as wall-clock seconds (anchor + elapsed) so older readers keep working
+
+Writing (default):
+- the pynput callback only enqueues a dict (no JSON, no disk I/O)
+- a writer thread drains the queue in batches and flushes every --flush-interval
+  seconds and at stop
 
 Notes:
 - This is a *minimal* tool for debugging/validation.
@@ -23,11 +40,20 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
+import queue
+import sys
+import threading
 import time
 from dataclasses import asdict, dataclass
-from typing import Optional
+from typing import IO, Any, Callable, Dict, Iterable, List, Optional, Union
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
 
-from pynput import keyboard, mouse
+FLUSH_INTERVAL_S = 0.5
+BATCH_MAX = 256
 
 
 @dataclass
@@ -37,15 +63,129 @@ class ClickEvent:
     y: int
     button: str
     pressed: bool
+    t_ns: Optional[int] = None
+
+
+class EventClock:
+    """perf_counter_ns timestamps tied to one wall-clock anchor."""
+
+    def __init__(self):
+        self.wall_anchor = time.time()
+        self.perf_anchor_ns = time.perf_counter_ns()
+
+    def stamp(self) -> Dict[str, Any]:
+        t_ns = time.perf_counter_ns()
+        return {"t": self.wall_anchor + (t_ns - self.perf_anchor_ns) / 1e9, "t_ns": t_ns}
+
+    def meta(self) -> Dict[str, Any]:
+        return {
+            "t": self.wall_anchor,
+            "clock": "perf_counter_ns",
+            "wall_anchor": self.wall_anchor,
+            "perf_anchor_ns": self.perf_anchor_ns,
+        }
+
+
+def encode_jsonl(batch: Iterable[Dict[str, Any]]) -> str:
+    return "".join(json.dumps(o, ensure_ascii=False) + "\n" for o in batch)
+
+
+Encoder = Callable[[Iterable[Dict[str, Any]]], Union[str, bytes]]
 
 
-def now() -> float:
-    return time.time()
+class SyncEventWriter:
+    """Legacy behaviour: write + flush every event in the calling thread."""
+
+    def __init__(self, f: IO, encode: Encoder = encode_jsonl):
+        self._f = f
+        self._encode = encode
+
+    def put(self, obj: Dict[str, Any]) -> None:
+        data = self._encode((obj,))
+        if data:
+            self._f.write(data)
+            self._f.flush()
+
+    def close(self) -> None:
+        self._f.flush()
+
+
+class BatchedEventWriter:
+    """Write JSONL records from a background thread.
+
+    `put()` never blocks on I/O (unbounded queue); the worker writes whatever has
+    queued up (up to batch_max per write) and flushes at most every flush_interval_s.
+    `close()` drains everything and flushes.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        f: IO,
+        flush_interval_s: float = FLUSH_INTERVAL_S,
+        batch_max: int = BATCH_MAX,
+        encode: Encoder = encode_jsonl,
+    ):
+        self._f = f
+        self._encode = encode
+        self.flush_interval_s = float(flush_interval_s)
+        self.batch_max = max(1, int(batch_max))
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self.written = 0
+        self.flushes = 0
+        self.error: Optional[Exception] = None
+        self._thread = threading.Thread(target=self._worker, name="click-log-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, obj: Dict[str, Any]) -> None:
+        self._queue.put(obj)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        self._queue.put(self._STOP)
+        self._thread.join(timeout)
+
+    def _worker(self) -> None:
+        last_flush = time.monotonic()
+        dirty = False
+        stop = False
+        while not stop:
+            timeout = max(0.0, self.flush_interval_s - (time.monotonic() - last_flush)) if dirty else None
+            batch: List[Dict[str, Any]] = []
+            try:
+                item = self._queue.get(timeout=timeout)
+                while True:
+                    if item is self._STOP:
+                        stop = True
+                        break
+                    batch.append(item)
+                    if len(batch) >= self.batch_max:
+                        break
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                if batch:
+                    data = self._encode(batch)
+                    if data:
+                        self._f.write(data)
+                        dirty = True
+                    self.written += len(batch)
+                if dirty and (stop or time.monotonic() - last_flush >= self.flush_interval_s):
+                    self._f.flush()
+                    self.flushes += 1
+                    dirty = False
+                    last_flush = time.monotonic()
+            except Exception as e:  # keep draining so put() never backs up
+                self.error = e
 
 
 def parse_args() -> argparse.Namespace:
     ap = argparse.ArgumentParser()
-    ap.add_argument("--out", required=True, help="output JSONL path")
+    ap.add_argument("--out", required=True, help="output path")
+    ap.add_argument("--format", choices=["jsonl", "bin"], default="jsonl", help="output format")
+    ap.add_argument("--sync", action="store_true", help="legacy mode: write+flush each event in the hook thread")
+    ap.add_argument("--flush-interval", type=float, default=FLUSH_INTERVAL_S, help="seconds between flushes")
     return ap.parse_args()
 
 
@@ -53,21 +193,33 @@ def main() -> int:
     ns = parse_args()
     out_path = ns.out
 
+    from pynput import keyboard, mouse
+
     paused = False
     stopped = False
 
-    f = open(out_path, "w", encoding="utf-8")
+    clock = EventClock()
+    if ns.format == "bin":
+        from tools.click_event_log import encode_header, encode_records
 
-    def log(obj):
-        f.write(json.dumps(obj, ensure_ascii=False) + "\n")
-        f.flush()
+        f = open(out_path, "wb")
+        f.write(encode_header(clock.wall_anchor, clock.perf_anchor_ns))
+        encode: Encoder = encode_records
+    else:
+        f = open(out_path, "w", encoding="utf-8")
+        encode = encode_jsonl
+    if ns.sync:
+        writer = SyncEventWriter(f, encode=encode)
+    else:
+        writer = BatchedEventWriter(f, flush_interval_s=ns.flush_interval, encode=encode)
+    log = writer.put
 
     def on_click(x, y, button, pressed):
-        nonlocal paused
         if paused:
             return
+        stamp = clock.stamp()
         btn = getattr(button, "name", None) or str(button)
-        ev = ClickEvent(t=now(), x=int(x), y=int(y), button=str(btn), pressed=bool(pressed))
+        ev = ClickEvent(x=int(x), y=int(y), button=str(btn), pressed=bool(pressed), **stamp)
         log({"type": "click", **asdict(ev)})
 
     def on_press(key):
@@ -75,16 +227,16 @@ def main() -> int:
         try:
             if key == keyboard.Key.f9:
                 paused = not paused
-                log({"type": "state", "t": now(), "paused": paused})
+                log({"type": "state", **clock.stamp(), "paused": paused})
             elif key == keyboard.Key.f10:
                 stopped = True
-                log({"type": "state", "t": now(), "stopped": True})
+                log({"type": "state", **clock.stamp(), "stopped": True})
                 return False  # stop listener
         except Exception:
             pass
 
     print("Recording... (F9 pause/resume, F10 stop)")
-    log({"type": "meta", "t": now(), "out": out_path})
+    log({"type": "meta", **clock.meta(), "out": out_path})
 
     with mouse.Listener(on_click=on_click) as ml, keyboard.Listener(on_press=on_press) as kl:
         while not stopped:
@@ -95,7 +247,11 @@ def main() -> int:
     except Exception:
         pass
 
+    writer.close()
     f.close()
+    if getattr(writer, "error", None) is not None:
+        print(f"Write error: {writer.error}")
+        return 1
     print(f"Saved: {out_path}")
     return 0
 
@@ -2,92 +2,261 @@
 # -*- coding: utf-8 -*-
 """Simple click replayer (no Qt).
 
-Replays recorded clicks from the JSONL produced by simple_click_recorder.py.
+Replays recorded clicks from the JSONL (or binary click log) produced by simple_click_recorder.py.
 
 Safety:
 - FAILSAFE enabled: moving mouse to top-left may abort (pyautogui default)
 
+Timing (ReplayScheduler):
+- every event has an absolute target time on `time.perf_counter` (monotonic; wall-clock
+  jumps do not matter and per-event delays never accumulate)
+- sleep coarsely until just before the target, busy-wait only the last SPIN_S
+- each dispatch is started early by the measured (EMA) pyautogui call latency,
+  so the click lands on the target instead of one call-latency late
+- the achieved error of every event is reported (summary, or per event with --timing-report)
+
 Usage:
   py tools/simple_click_replayer.py --in clicks.jsonl --speed 1.0
+  py tools/simple_click_replayer.py --in clicks.jsonl --speed 2 --timing-report timing.jsonl
+  py tools/simple_click_replayer.py --in clicks.bin --format bin
 
 Options:
 - --speed: 2.0 means twice as fast (half the delays)
 - --dry-run: print events without clicking
+- --timing-report: write per-event timing (target / done / error_ms) as JSONL
+- --format: auto (default; detected from the file header) / jsonl / bin
+  (bin files are memory-mapped, see tools/click_event_log.py)
 """
 
 from __future__ import annotations
 
 import argparse
 import json
+import os
+import sys
 import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
-import pyautogui
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
 
+# busy-wait only this close to a target; everything before is a normal sleep
+SPIN_S = 0.0005
+# smoothing for the dispatch-latency and oversleep estimates
+LATENCY_EMA_ALPHA = 0.3
 
-def parse_args() -> argparse.Namespace:
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--in", dest="inp", required=True, help="input JSONL path")
-    ap.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier")
-    ap.add_argument("--dry-run", action="store_true", help="do not click; only print")
-    ap.add_argument("--only-press", action="store_true", help="only replay pressed=true events")
-    return ap.parse_args()
 
+@dataclass(frozen=True)
+class EventTiming:
+    """Achieved timing of one dispatched event (seconds since replay start)."""
 
-def main() -> int:
-    ns = parse_args()
+    index: int
+    target_s: float
+    start_s: float  # dispatch started (target - estimated latency, or later when behind)
+    done_s: float  # dispatch returned
+    error_ms: float  # done - target (positive = late)
 
-    speed = max(0.01, float(ns.speed))
 
-    pyautogui.FAILSAFE = True
-    pyautogui.PAUSE = 0.0
+class ReplayScheduler:
+    """Dispatch events at absolute offsets from a perf_counter start time.
+
+    clock / sleep exist for tests; by default time.perf_counter / time.sleep.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.perf_counter,
+        sleep: Callable[[float], None] = time.sleep,
+        spin_s: float = SPIN_S,
+        compensate: bool = True,
+    ):
+        self.clock = clock
+        self.sleep = sleep
+        self.spin_s = float(spin_s)
+        self.compensate = compensate
+        self.latency_s = 0.0  # EMA of dispatch duration
+        self.oversleep_s = 0.0  # EMA of how much sleep() overshoots
+
+    def _update(self, old: float, sample: float) -> float:
+        return sample if old == 0.0 else old + LATENCY_EMA_ALPHA * (sample - old)
 
+    def wait_until(self, deadline: float) -> None:
+        """Return at (or just after) clock() == deadline: coarse sleep, then spin."""
+        while True:
+            rem = deadline - self.clock()
+            if rem <= 0:
+                return
+            coarse = rem - self.spin_s - self.oversleep_s
+            if coarse > 0:
+                t0 = self.clock()
+                self.sleep(coarse)
+                over = (self.clock() - t0) - coarse
+                self.oversleep_s = max(0.0, self._update(self.oversleep_s, over))
+            # else: spin (re-read the clock)
+
+    def run(self, schedule: Sequence[Tuple[float, Any]], dispatch: Callable[[Any], None]) -> List[EventTiming]:
+        """Dispatch each (offset_s, event) pair; offsets are relative to the start of run()."""
+        start = self.clock()
+        out: List[EventTiming] = []
+        for i, (offset_s, ev) in enumerate(schedule):
+            target = start + float(offset_s)
+            lead = self.latency_s if self.compensate else 0.0
+            self.wait_until(target - lead)
+            t_start = self.clock()
+            dispatch(ev)
+            t_done = self.clock()
+            self.latency_s = self._update(self.latency_s, t_done - t_start)
+            out.append(
+                EventTiming(
+                    index=i,
+                    target_s=target - start,
+                    start_s=t_start - start,
+                    done_s=t_done - start,
+                    error_ms=(t_done - target) * 1000.0,
+                )
+            )
+        return out
+
+
+def timing_summary(timings: Sequence[EventTiming]) -> Dict[str, float]:
+    """Mean / mean-abs / p95-abs / max-abs error in milliseconds."""
+    if not timings:
+        return {"count": 0, "mean_ms": 0.0, "mean_abs_ms": 0.0, "p95_abs_ms": 0.0, "max_abs_ms": 0.0}
+    errs = [t.error_ms for t in timings]
+    abs_sorted = sorted(abs(e) for e in errs)
+    p95 = abs_sorted[min(len(abs_sorted) - 1, int(round(0.95 * (len(abs_sorted) - 1))))]
+    return {
+        "count": len(errs),
+        "mean_ms": sum(errs) / len(errs),
+        "mean_abs_ms": sum(abs_sorted) / len(abs_sorted),
+        "p95_abs_ms": p95,
+        "max_abs_ms": abs_sorted[-1],
+    }
+
+
+def normalize_button(button: Optional[str]) -> str:
+    button = str(button or "left")
+    if "right" in button:
+        return "right"
+    if "middle" in button:
+        return "middle"
+    return "left"
+
+
+def load_click_events(path: str, only_press: bool = False) -> List[Dict[str, Any]]:
     events = []
-    with open(ns.inp, "r", encoding="utf-8") as f:
+    with open(path, "r", encoding="utf-8") as f:
         for line in f:
             line = line.strip()
             if not line:
                 continue
             obj = json.loads(line)
             if obj.get("type") == "click":
-                if ns.only_press and not obj.get("pressed", False):
+                if only_press and not obj.get("pressed", False):
                     continue
                 events.append(obj)
+    return events
 
+
+def build_schedule(events: Sequence[Dict[str, Any]], speed: float) -> List[Tuple[float, Dict[str, Any]]]:
+    """(offset_s, event) relative to the first event, scaled by 1/speed.
+
+    Uses the recorder's perf_counter_ns stamps (`t_ns`) when every event has one,
+    otherwise the wall-clock `t` of older recordings.
+    """
     if not events:
+        return []
+    if all(e.get("t_ns") is not None for e in events):
+        n0 = int(events[0]["t_ns"])
+        return [((int(e["t_ns"]) - n0) / 1e9 / speed, e) for e in events]
+    t0 = float(events[0]["t"])
+    return [((float(e["t"]) - t0) / speed, e) for e in events]
+
+
+def schedule_from_click_log(path: str, speed: float, only_press: bool = False) -> List[Tuple[float, Tuple[int, int, str]]]:
+    """(offset_s, (x, y, button)) from a binary click log; offsets are computed on the memmap."""
+    from tools.click_event_log import button_name, load_click_log
+
+    _header, rec = load_click_log(path)
+    if only_press:
+        rec = rec[rec["pressed"] != 0]
+    if len(rec) == 0:
+        return []
+    t_ns = rec["t_ns"]
+    offsets = ((t_ns - t_ns[0]) / (1e9 * speed)).tolist()
+    names = [button_name(b) for b in rec["button"].tolist()]
+    return list(zip(offsets, zip(rec["x"].tolist(), rec["y"].tolist(), names)))
+
+
+def schedule_from_jsonl(path: str, speed: float, only_press: bool = False) -> List[Tuple[float, Tuple[int, int, str]]]:
+    events = load_click_events(path, only_press=only_press)
+    return [
+        (off, (int(e["x"]), int(e["y"]), normalize_button(e.get("button"))))
+        for off, e in build_schedule(events, speed)
+    ]
+
+
+def load_schedule(path: str, speed: float, only_press: bool = False, fmt: str = "auto"):
+    if fmt == "auto":
+        from tools.click_event_log import is_click_log
+
+        fmt = "bin" if is_click_log(path) else "jsonl"
+    if fmt == "bin":
+        return schedule_from_click_log(path, speed, only_press=only_press)
+    return schedule_from_jsonl(path, speed, only_press=only_press)
+
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--in", dest="inp", required=True, help="input recording path")
+    ap.add_argument("--format", choices=["auto", "jsonl", "bin"], default="auto", help="input format")
+    ap.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier")
+    ap.add_argument("--dry-run", action="store_true", help="do not click; only print")
+    ap.add_argument("--only-press", action="store_true", help="only replay pressed=true events")
+    ap.add_argument("--timing-report", default="", help="write per-event timing JSONL here")
+    return ap.parse_args()
+
+
+def main() -> int:
+    ns = parse_args()
+
+    speed = max(0.01, float(ns.speed))
+
+    schedule = load_schedule(ns.inp, speed, only_press=ns.only_press, fmt=ns.format)
+    if not schedule:
         print("No click events")
         return 1
 
-    # compute relative delays
-    t0 = float(events[0]["t"])
-    schedule = []
-    for e in events:
-        dt = (float(e["t"]) - t0) / speed
-        schedule.append((dt, e))
-
-    print(f"Replaying {len(events)} clicks... speed={speed} dry_run={ns.dry_run}")
-    start = time.time()
-
-    for dt, e in schedule:
-        while time.time() - start < dt:
-            time.sleep(0.001)
-
-        x = int(e["x"])
-        y = int(e["y"])
-        button = str(e.get("button") or "left")
-        # normalize some button strings
-        if "right" in button:
-            button = "right"
-        elif "middle" in button:
-            button = "middle"
-        else:
-            button = "left"
-
-        if ns.dry_run:
+    if ns.dry_run:
+
+        def dispatch(e):
+            x, y, button = e
             print(f"click {button} @ ({x},{y})")
-        else:
+
+    else:
+        import pyautogui
+
+        pyautogui.FAILSAFE = True
+        pyautogui.PAUSE = 0.0
+
+        def dispatch(e):
+            x, y, button = e
             pyautogui.click(x=x, y=y, button=button)
 
-    print("Done")
+    print(f"Replaying {len(schedule)} clicks... speed={speed} dry_run={ns.dry_run}")
+    timings = ReplayScheduler().run(schedule, dispatch)
+
+    if ns.timing_report:
+        with open(ns.timing_report, "w", encoding="utf-8") as f:
+            for t in timings:
+                f.write(json.dumps(asdict(t)) + "\n")
+    s = timing_summary(timings)
+    print(
+        f"Done; timing error ms: mean={s['mean_ms']:.3f} mean_abs={s['mean_abs_ms']:.3f} "
+        f"p95_abs={s['p95_abs_ms']:.3f} max_abs={s['max_abs_ms']:.3f}"
+    )
     return 0
 
 